@@ -1,9 +1,16 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import load_only
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime, UTC
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from datetime import datetime, timedelta, UTC
 import os
+import base64
+import hashlib
 import json
 import subprocess
 import sys
@@ -11,45 +18,70 @@ import time
 import requests
 import threading
 from threading import Lock
+from email.utils import parsedate_to_datetime
 
 from config import DevConfig
+import archive
+import dedup
+import digest
+import events
+import feeds
+import glossary
+import language
+import sanitize
+import health
+import leader
+import polling
+import metrics
+import profiling
+import storage
+from collectors.base import FetchTimeout, ItemStream, current_deadline, iter_result, run_with_deadline
+from models import (Base, Section, NewsItem, ItemBand, LeaderLease, FetchRun, ItemEvent, DailyDigest, GlossaryTerm,
+                    MetricSnapshot)
+
+# 以脚本方式运行（python app.py）时，让持久化任务中的 "app:函数名" 引用指向当前模块，而不是再导入一份
+if __name__ == '__main__':
+    sys.modules.setdefault('app', sys.modules[__name__])
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.config.from_object(DevConfig)
 
-db = SQLAlchemy(app)
-scheduler = BackgroundScheduler(timezone="UTC")
+# 模型定义在 models.py（不依赖 Flask，MCP 服务与脚本共用），这里接管其 metadata 并提供 Model.query
+db = SQLAlchemy(app, metadata=Base.metadata)
+Base.query = db.session.query_property(db.Query)
+# 读引擎（db.session）与单写线程各用一个引擎，SQLite 下均开启 WAL
+with app.app_context():
+    storage.configure_engine(db.engine, DevConfig.DB_BUSY_TIMEOUT_MS)
+    writer = storage.WriteQueue(
+        storage.create_writer_engine(db.engine.url, DevConfig.DB_BUSY_TIMEOUT_MS),
+        max_batch=DevConfig.WRITE_BATCH_MAX,
+        max_wait=DevConfig.WRITE_BATCH_WAIT_MS / 1000.0,
+    )
+    # 任务状态（下次运行时间、自适应后的间隔）持久化在 apscheduler_jobs 表，重启后继续沿用
+    jobstores = {}
+    if DevConfig.SCHEDULER_JOBSTORE == 'db':
+        jobstores['default'] = SQLAlchemyJobStore(
+            engine=storage.create_jobstore_engine(db.engine.url, DevConfig.DB_BUSY_TIMEOUT_MS),
+            tablename='apscheduler_jobs',
+        )
+scheduler = BackgroundScheduler(timezone="UTC", jobstores=jobstores, job_defaults={'coalesce': True})
+# 本进程持有调度租约时置位（worker.py 维护）；失去租约后调度器暂停，任务仍留在持久化表中交给新的持有者
+scheduler_lease_held = threading.Event()
+poller = polling.AdaptivePoller(path=polling.POLL_STATE_PATH)
+event_bus = events.EventBus(poll_seconds=DevConfig.EVENTS_POLL_SECONDS)
+writer.commit_listeners.append(lambda n, seconds: (
+    metrics.DB_COMMIT_DURATION.observe(seconds),
+    metrics.DB_COMMIT_BATCH.observe(n),
+))
+if DevConfig.PROFILING_ENABLED:
+    with app.app_context():
+        profiling.install(app, [db.engine, writer.engine], DevConfig)
 
 # 后台翻译锁，防止同时运行多个翻译任务
 translation_lock = Lock()
-
-# Models
-class Section(db.Model):
-    __tablename__ = 'sections'
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(80), unique=True, nullable=False)
-    description = db.Column(db.String(255), default='')
-    enabled = db.Column(db.Boolean, default=True)
-    fetch_method = db.Column(db.String(50), default='crawler')  # crawler | gemini | manual | arxiv | rss
-    update_interval_minutes = db.Column(db.Integer, default=60)
-    last_run_at = db.Column(db.DateTime, nullable=True)
-    config_json = db.Column(db.Text, default='{}')  # 保存该板块自定义配置
-
-class NewsItem(db.Model):
-    __tablename__ = 'news_items'
-    id = db.Column(db.Integer, primary_key=True)
-    section_id = db.Column(db.Integer, db.ForeignKey('sections.id'), nullable=False)
-    title = db.Column(db.String(255), nullable=False)
-    summary = db.Column(db.Text, default='')
-    url = db.Column(db.String(512), default='')
-    published_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    # 新增：译文字段
-    title_translated = db.Column(db.Text, default='')
-    summary_translated = db.Column(db.Text, default='')
-    translated_at = db.Column(db.DateTime, nullable=True)  # 翻译时间戳
-
-    section = db.relationship('Section', backref=db.backref('news_items', lazy=True, cascade="all, delete-orphan"))
+# 跨进程租约名（leader_leases 表）
+SCHEDULER_LEASE = 'scheduler'
+TRANSLATION_LEASE = 'background_translation'
 
 # 后台翻译工具函数
 def get_translation_settings():
@@ -65,13 +97,327 @@ def get_translation_settings():
     }
 
 
+def mymemory_get(params: dict, timeout: float):
+    """调用 MyMemory 并记录调用次数、429 与耗时"""
+    started = time.perf_counter()
+    try:
+        r = requests.get(DevConfig.MYMEMORY_API_URL, params=params, timeout=timeout)
+    except Exception:
+        metrics.TRANSLATION_CALLS.inc(provider='mymemory', outcome='error')
+        raise
+    finally:
+        metrics.TRANSLATION_DURATION.observe(time.perf_counter() - started, provider='mymemory')
+    if r.status_code == 429:
+        metrics.TRANSLATION_RATE_LIMITED.inc(provider='mymemory')
+        metrics.TRANSLATION_CALLS.inc(provider='mymemory', outcome='rate_limited')
+    else:
+        metrics.TRANSLATION_CALLS.inc(provider='mymemory', outcome='ok' if r.status_code == 200 else 'error')
+    return r
+
+
+def gemini_run(args: list, **kwargs):
+    """调用 Gemini CLI 翻译并记录调用次数与耗时"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        result = subprocess.run(args, **kwargs)
+        outcome = 'ok' if result.returncode == 0 else 'error'
+        return result
+    except subprocess.TimeoutExpired:
+        outcome = 'timeout'
+        raise
+    finally:
+        metrics.TRANSLATION_CALLS.inc(provider='gemini', outcome=outcome)
+        metrics.TRANSLATION_DURATION.observe(time.perf_counter() - started, provider='gemini')
+
+
+_glossary_cache = {'version': None, 'glossary': glossary.EMPTY, 'checked': 0.0}
+
+
+def current_glossary() -> glossary.Glossary:
+    """编译好的术语表（需在 app 上下文中调用）
+
+    最多每 GLOSSARY_REFRESH_SECONDS 查询一次条数与最后修改时间，有变化才重新编译，
+    其他进程（Web / worker）中的修改也会生效。
+    """
+    now = time.monotonic()
+    if now - _glossary_cache['checked'] < DevConfig.GLOSSARY_REFRESH_SECONDS:
+        return _glossary_cache['glossary']
+    try:
+        version = tuple(db.session.query(db.func.count(GlossaryTerm.id), db.func.max(GlossaryTerm.updated_at)).one())
+        if version != _glossary_cache['version']:
+            rows = db.session.query(GlossaryTerm.source, GlossaryTerm.target, GlossaryTerm.case_sensitive).all()
+            _glossary_cache['glossary'] = glossary.Glossary(rows)
+            _glossary_cache['version'] = version
+    except Exception as e:
+        print(f"[Glossary] load failed: {e}")
+    _glossary_cache['checked'] = now
+    return _glossary_cache['glossary']
+
+
 def ensure_db():
     with app.app_context():
         db.create_all()
 
 # Schedulers
 
-def run_section_fetch(section_id: int):
+def _dedup_candidates(section_id: int, prepared: list, near: bool):
+    """查询已有条目中与本批相同 URL / 相似标题的候选
+
+    返回 (同板块已有的 URL/标题键集合, 其他板块 canonical_url -> 条目, 近重复候选列表)
+    """
+    urls = list({p['canonical_url'] for p in prepared if p['canonical_url']})
+    bare_titles = list({p['title'] for p in prepared if not p['canonical_url']})
+    same_keys, other_by_url = set(), {}
+    cols = load_only(NewsItem.id, NewsItem.section_id, NewsItem.cluster_id, NewsItem.canonical_url)
+    for i in range(0, len(urls), 500):
+        for n in NewsItem.query.options(cols).filter(NewsItem.canonical_url.in_(urls[i:i + 500])):
+            if n.section_id == section_id:
+                same_keys.add(n.canonical_url)
+            else:
+                other_by_url.setdefault(n.canonical_url, n)
+    # 没有 URL 的条目（部分 Gemini 结果）仍按板块内标题完全相同去重
+    for i in range(0, len(bare_titles), 500):
+        for (t,) in db.session.query(NewsItem.title).filter(
+                NewsItem.section_id == section_id, NewsItem.canonical_url == '',
+                NewsItem.title.in_(bare_titles[i:i + 500])):
+            same_keys.add('title:' + t)
+
+    candidates = []
+    if near:
+        bands = list({b for p in prepared for b in p['bands']})
+        cutoff = datetime.utcnow() - timedelta(hours=DevConfig.DEDUP_WINDOW_HOURS)
+        ids = set()
+        for i in range(0, len(bands), 500):
+            ids.update(i for (i,) in db.session.query(ItemBand.item_id).filter(
+                ItemBand.band.in_(bands[i:i + 500]), ItemBand.created_at >= cutoff))
+        ids = list(ids)
+        for i in range(0, len(ids), 500):
+            candidates.extend(NewsItem.query.options(load_only(
+                NewsItem.id, NewsItem.section_id, NewsItem.cluster_id, NewsItem.title, NewsItem.title_sig,
+            )).filter(NewsItem.id.in_(ids[i:i + 500])))
+    return same_keys, other_by_url, candidates
+
+
+def ingest_items(section_id: int, items, cfg: dict | None = None) -> int:
+    """去重后写入新条目（经由单写线程提交），返回新增数量
+
+    - 同板块内 canonical_url 相同、或 DEDUP_WINDOW_HOURS 内标题近似的条目直接丢弃
+    - 其他板块已有的同一新闻照常入库（板块需要展示），但归入同一簇，后台翻译时复用簇内译文
+    板块 config_json 中 near_dedup=false 可关闭该板块的近重复识别（仍按 URL 去重）。
+    """
+    cfg = cfg or {}
+    near = DevConfig.DEDUP_NEAR_ENABLED and cfg.get('near_dedup', True) is not False
+    threshold = DevConfig.DEDUP_THRESHOLD
+    prepared = []
+    for it in items:
+        title = it.title[:255] if it.title else ''
+        sig = dedup.title_signature(title) if near else None
+        prepared.append({
+            'item': it, 'title': title,
+            'canonical_url': dedup.canonical_url(it.url)[:512],
+            'sig': sig, 'bands': dedup.band_keys(sig, title) if sig else [],
+        })
+    same_keys, other_by_url, candidates = _dedup_candidates(section_id, prepared, near)
+
+    # 同板块的近似条目直接丢弃，其他板块的只用于归簇，分成两个索引以便优先判断前者
+    known_same, known_other = dedup.LSHIndex(), dedup.LSHIndex()
+    for n in candidates:
+        (known_same if n.section_id == section_id else known_other).add(n.id, n.title, dedup.unpack(n.title_sig))
+    by_id = {n.id: n for n in candidates}
+    batch = dedup.LSHIndex()  # 本批内部互查
+    rows, bands, roots = [], [], set()
+    for p in prepared:
+        key = p['canonical_url'] or 'title:' + p['title']
+        if key in same_keys:
+            continue
+        cluster_id = None
+        if p['sig']:
+            if (batch.query(p['title'], p['sig'], threshold, p['bands']) is not None
+                    or known_same.query(p['title'], p['sig'], threshold, p['bands']) is not None):
+                continue
+            match = known_other.query(p['title'], p['sig'], threshold, p['bands'])
+            if match is not None:
+                m = by_id[match]
+                cluster_id = m.cluster_id or m.id
+        if cluster_id is None and p['canonical_url'] in other_by_url:
+            m = other_by_url[p['canonical_url']]
+            cluster_id = m.cluster_id or m.id
+        same_keys.add(key)
+        batch.add(len(rows), p['title'], p['sig'], p['bands'])
+        it = p['item']
+        summary_fields = sanitize.normalize_summary(it.summary, DevConfig.SUMMARY_COMPRESS_MIN_CHARS)
+        rows.append(NewsItem(
+            section_id=section_id,
+            title=p['title'],
+            url=it.url[:512] if it.url else '',
+            published_at=it.published_at or datetime.now(UTC),
+            canonical_url=p['canonical_url'],
+            title_sig=dedup.pack(p['sig']),
+            cluster_id=cluster_id,
+            # 入库时识别语言，已是目标语言的条目后台翻译直接跳过
+            lang=language.detect(f"{p['title']}\n{summary_fields['summary_preview']}"),
+            # 摘要只在入库时清洗一次：去 HTML、生成预览、可选压缩全文
+            **summary_fields,
+        ))
+        bands.append(p['bands'])
+        if cluster_id:
+            roots.add(cluster_id)
+    if rows:
+        clustered = sum(1 for r in rows if r.cluster_id)
+
+        def _insert(s):
+            s.add_all(rows)
+            s.flush()
+            now = datetime.utcnow()
+            band_rows = [{'band': b, 'item_id': r.id, 'created_at': now}
+                         for r, keys in zip(rows, bands) for b in set(keys)]
+            if band_rows:
+                s.execute(ItemBand.__table__.insert(), band_rows)
+            # 簇代表自身也标上 cluster_id，翻译时据此判断是否需要查找簇内条目
+            if roots:
+                s.query(NewsItem).filter(NewsItem.id.in_(roots), NewsItem.cluster_id.is_(None)).update(
+                    {'cluster_id': NewsItem.id}, synchronize_session=False)
+            return record_item_event(s, 'items', section_id, [r.id for r in rows])
+        event_bus.publish(writer.write(_insert))
+        invalidate_section_fragments(section_id)
+        mark_section_feeds(section_id)
+        if clustered:
+            section = db.session.get(Section, section_id)
+            metrics.ITEMS_CLUSTERED.inc(clustered, section=section.name if section else str(section_id))
+    return len(rows)
+
+
+def record_item_event(session, kind: str, section_id: int, item_ids: list) -> int:
+    """在写事务中记录事件，返回事件 id（提交后再 publish）"""
+    ev = ItemEvent(kind=kind, section_id=section_id, item_ids=json.dumps(item_ids))
+    session.add(ev)
+    session.flush()
+    return ev.id
+
+
+# 同一板块的定时/手动采集互不重叠：跨进程由 fetch:<id> 租约保证（Web 进程与 worker 之间），
+# _running_sections 只记录本进程中正在运行的采集（指标用）
+_running_sections = set()
+_running_lock = Lock()
+FETCH_LEASE_GRACE_SECONDS = 60  # 租约有效期 = 截止时间 + 宽限，采集线程每入库一块续期一次
+
+
+def fetch_lease_name(section_id: int) -> str:
+    return f'fetch:{section_id}'
+
+
+def _get_collector(fetch_method: str):
+    if fetch_method == 'arxiv':
+        from collectors.arxiv_collector import ArxivCollector
+        return ArxivCollector()
+    if fetch_method == 'gemini':
+        from collectors.gemini_collector import GeminiCollector
+        return GeminiCollector()
+    if fetch_method == 'rss':
+        from collectors.rss_collector import RSSCollector
+        return RSSCollector()
+    if fetch_method == 'crawler':
+        from collectors.crawler_collector import CrawlerCollector
+        return CrawlerCollector()
+    # manual：不自动采集
+    return None
+
+
+_gemini_batcher = None
+_gemini_batcher_lock = Lock()
+
+
+def _recruit_gemini_batch(section_name: str, key):
+    """把下次运行在 GEMINI_BATCH_PULL_AHEAD×间隔 内的同组板块提前到现在，并入本次合并调用
+
+    提前后的板块之后按新的运行时间续排，与组长保持对齐，下一轮自然同时到期。
+    """
+    if DevConfig.GEMINI_BATCH_PULL_AHEAD <= 0 or not scheduler_active():
+        return
+    now = datetime.now(UTC)
+    with app.app_context():
+        sections = Section.query.filter(Section.enabled.is_(True), Section.fetch_method == 'gemini',
+                                        Section.name != section_name).all()
+    candidates = []
+    for s in sections:
+        if _gemini_batcher.collector.batch_key(_section_config(s)) != key:
+            continue
+        job = scheduler.get_job(f"section_{s.id}")
+        if not job or not job.next_run_time or not isinstance(job.trigger, IntervalTrigger):
+            continue
+        ahead = timedelta(seconds=DevConfig.GEMINI_BATCH_PULL_AHEAD * job.trigger.interval.total_seconds())
+        if now < job.next_run_time <= now + ahead:
+            candidates.append((job.next_run_time, s.name, job))
+    candidates.sort(key=lambda c: c[0])
+    pulled = []
+    for _, name, job in candidates[:_gemini_batcher.max_sections - 1]:
+        try:
+            job.modify(next_run_time=now)
+            pulled.append(name)
+        except Exception as e:
+            print(f"[Schedule] pull ahead failed: {job.id}, {e}")
+    if pulled:
+        print(f"[Schedule] gemini batch with {section_name}: pulled ahead {pulled}")
+
+
+def _gemini_batch_fetch(section_name: str, cfg: dict):
+    """定时触发的 gemini 采集经由合并器，与同组板块共用一次 CLI 调用"""
+    global _gemini_batcher
+    if _gemini_batcher is None:
+        with _gemini_batcher_lock:
+            if _gemini_batcher is None:
+                from collectors.gemini_batch import GeminiBatcher
+                from collectors.gemini_collector import GeminiCollector
+                _gemini_batcher = GeminiBatcher(GeminiCollector(), DevConfig.GEMINI_BATCH_WINDOW_SECONDS,
+                                                DevConfig.GEMINI_BATCH_MAX_SECTIONS, recruit=_recruit_gemini_batch)
+    return _gemini_batcher.fetch(section_name, cfg)
+
+
+def record_fetch_run(section_id: int, status: str, trigger: str, started_at=None,
+                     fetched: int = 0, added: int = 0, error: str | None = None):
+    """异步记录一次采集运行（包括被跳过、超时取消的运行）"""
+    finished_at = datetime.now(UTC)
+    started_at = started_at or finished_at
+    run = dict(
+        section_id=section_id,
+        trigger=trigger,
+        status=status,
+        started_at=started_at,
+        finished_at=finished_at,
+        duration_ms=int((finished_at - started_at).total_seconds() * 1000),
+        fetched=fetched,
+        added=added,
+        error=(error or '')[:1000],
+    )
+    writer.submit(lambda s: s.add(FetchRun(**run)))
+
+
+def _stream_ingest(iterate, section_id: int, section_name: str, cfg: dict, progress: dict, lease=None):
+    """在采集线程中边读边入库：每 INGEST_CHUNK_SIZE 条去重并提交一次，返回采集器的非致命错误
+
+    progress 记录已读取/已新增的条数，超时返回后调度线程据此记录本次运行；
+    lease 为该板块的采集租约，每入库一块续期一次。
+    """
+    deadline = current_deadline()
+    items = iterate(section_name, cfg)
+    stream = ItemStream(items)
+    try:
+        with app.app_context():
+            for chunk in stream.chunks(DevConfig.INGEST_CHUNK_SIZE):
+                # 已超过截止时间：调度线程已按超时返回，剩余条目不再入库
+                deadline.check()
+                if lease is not None:
+                    lease.renew_if_due()
+                progress['fetched'] += len(chunk)
+                progress['added'] += ingest_items(section_id, chunk, cfg)
+    finally:
+        if hasattr(items, 'close'):
+            items.close()  # 提前结束时让采集器释放连接、取消后台抓取
+    return stream.error
+
+
+def run_section_fetch(section_id: int, trigger: str = 'manual'):
     with app.app_context():
         section = Section.query.get(section_id)
         if not section:
@@ -85,91 +431,358 @@ def run_section_fetch(section_id: int):
             cfg = json.loads(section.config_json or '{}')
         except Exception:
             cfg = {}
-        print(f"[Fetch] start: id={section.id}, name={section.name}, method={section.fetch_method}")
-        result = None
-        if section.fetch_method == 'arxiv':
-            from collectors.arxiv_collector import ArxivCollector
-            result = ArxivCollector().fetch(section.name, cfg)
-        elif section.fetch_method == 'gemini':
-            from collectors.gemini_collector import GeminiCollector
-            result = GeminiCollector().fetch(section.name, cfg)
-        elif section.fetch_method == 'rss':
-            from collectors.rss_collector import RSSCollector
-            result = RSSCollector().fetch(section.name, cfg)
-        else:
-            # 默认：不做任何事（可扩展crawler）
-            result = None
-
-        if result and result.items:
-            # 简单去重：基于title+url
-            existing = {(n.title or '') + '|' + (n.url or '') for n in NewsItem.query.filter_by(section_id=section.id).all()}
-            added = 0
-            for it in result.items:
-                key = f"{it.title}|{it.url}"
-                if key in existing:
-                    continue
-                db.session.add(NewsItem(
-                    section_id=section.id,
-                    title=it.title[:255] if it.title else '',
-                    url=it.url[:512] if it.url else '',
-                    summary=it.summary or '',
-                    published_at=it.published_at or datetime.now(UTC),
-                ))
-                added += 1
-            db.session.commit()
-            print(f"[Fetch] fetched={len(result.items)}, added={added}")
-        else:
-            if result and getattr(result, 'error', None):
-                print(f"[Fetch] error: {result.error}")
-            print("[Fetch] no items returned")
-        section.last_run_at = datetime.now(UTC)
-        db.session.commit()
+        # 墙钟截止时间：超时后取消采集线程，已提交的块保留，其余丢弃
+        deadline = float(cfg.get('deadline_seconds') or DevConfig.FETCH_DEADLINE_SECONDS)
+        lease = leader.Lease(writer, LeaderLease, fetch_lease_name(section_id), deadline + FETCH_LEASE_GRACE_SECONDS)
+        if not lease.acquire():
+            print(f"[Fetch] skip: previous run still in progress, id={section.id}, name={section.name}")
+            record_fetch_run(section_id, 'skipped', trigger, error='上一次采集仍在运行')
+            metrics.FETCH_RUNS.inc(section=section.name, method=section.fetch_method, status='skipped')
+            return
+        with _running_lock:
+            _running_sections.add(section_id)
 
+        def _release():
+            with _running_lock:
+                _running_sections.discard(section_id)
+            lease.release()
 
-def schedule_section(section: Section):
-    job_id = f"section_{section.id}"
+        def _ingest(*args):
+            # 在采集线程中释放：超时后调度线程先返回，线程真正退出前其他触发仍会被跳过
+            try:
+                return _stream_ingest(*args, lease=lease)
+            finally:
+                _release()
+
+        handed_off = False  # 采集线程已启动时由它负责释放
+        started = datetime.now(UTC)
+        labels = {'section': section.name, 'method': section.fetch_method}
+        status, fetched, added, error = 'ok', 0, 0, None
+        try:
+            print(f"[Fetch] start: id={section.id}, name={section.name}, method={section.fetch_method}")
+            collector = _get_collector(section.fetch_method)
+            if collector:
+                iterate = collector.iter_items
+                if trigger == 'schedule' and section.fetch_method == 'gemini' and DevConfig.GEMINI_BATCH_ENABLED:
+                    iterate = lambda name, c: iter_result(_gemini_batch_fetch(name, c))
+                progress = {'fetched': 0, 'added': 0}
+                try:
+                    handed_off = True
+                    error = run_with_deadline(_ingest, deadline, iterate, section.id, section.name, cfg, progress)
+                except FetchTimeout as e:
+                    status, error = 'timeout', str(e)
+                    print(f"[Fetch] timeout: id={section.id}, name={section.name}, {e}")
+                except Exception as e:
+                    status, error = 'error', str(e)
+                    print(f"[Fetch] error: {e}")
+                fetched, added = progress['fetched'], progress['added']
+
+            if fetched:
+                print(f"[Fetch] fetched={fetched}, added={added}")
+            elif status == 'ok':
+                if error:
+                    status = 'error'
+                    print(f"[Fetch] error: {error}")
+                print("[Fetch] no items returned")
+            now = datetime.now(UTC)
+            writer.write(lambda s: s.query(Section).filter_by(id=section_id).update({'last_run_at': now}))
+            # 超时/失败的运行不作为自适应轮询的样本
+            return added if status == 'ok' else None
+        except Exception as e:
+            status, error = 'error', str(e)
+            raise
+        finally:
+            record_fetch_run(section_id, status, trigger, started, fetched, added, error)
+            metrics.FETCH_DURATION.observe((datetime.now(UTC) - started).total_seconds(), **labels)
+            metrics.FETCH_RUNS.inc(status=status, **labels)
+            metrics.ITEMS_FETCHED.inc(fetched, section=section.name)
+            metrics.ITEMS_ADDED.inc(added, section=section.name)
+            metrics.ITEMS_DEDUPED.inc(fetched - added, section=section.name)
+            if not handed_off:
+                _release()
+
+
+def _section_config(section: Section) -> dict:
     try:
-        scheduler.remove_job(job_id)
+        return json.loads(section.config_json or '{}')
     except Exception:
-        pass
+        return {}
+
+
+def _adaptive_enabled(section: Section, cfg: dict) -> bool:
+    return bool(cfg.get('adaptive', DevConfig.ADAPTIVE_POLLING))
+
+
+def _section_trigger(interval_minutes: float):
+    return IntervalTrigger(
+        seconds=int(interval_minutes * 60),
+        jitter=poller.jitter_seconds(interval_minutes) or None,
+    )
+
+
+def run_scheduled_fetch(section_id: int):
+    """调度入口：执行采集，并根据新增条数调整下一次轮询间隔"""
+    added = run_section_fetch(section_id, trigger='schedule')
+    if added is None:
+        return
+    with app.app_context():
+        section = Section.query.get(section_id)
+        if not section:
+            return
+        cfg = _section_config(section)
+        if not _adaptive_enabled(section, cfg):
+            return
+        before = poller.current_interval(section.id, section.update_interval_minutes)
+        after = poller.observe(section.id, section.update_interval_minutes, added, cfg)
+        if after != before:
+            job_id = f"section_{section.id}"
+            try:
+                scheduler.reschedule_job(job_id, trigger=_section_trigger(after))
+                print(f"[Schedule] section={section.name} added={added} interval {before:g}min -> {after:g}min")
+            except Exception as e:
+                print(f"[Schedule] reschedule failed: {job_id}, {e}")
+
+
+def scheduler_active() -> bool:
+    """本进程的调度器正在执行任务（持有调度租约；失去租约时调度器处于暂停状态）"""
+    return scheduler.state == STATE_RUNNING
+
+
+def _section_next_run(section: Section, interval: float):
+    """下次运行时间：按 last_run_at 续排；已过期则在补跑窗口内随机安排一次"""
+    due = poller.next_due(section.last_run_at, interval)
+    if due is None:
+        return polling.spread_catchup([section.id], DevConfig.SCHEDULER_CATCHUP_WINDOW_SECONDS)[section.id]
+    return due
+
+
+def schedule_section(section: Section, next_run_time=None):
+    # 只有持有调度租约的进程才排程；其他进程的修改由 worker 定期同步
+    if not scheduler.running or not scheduler_lease_held.is_set():
+        return
+    job_id = f"section_{section.id}"
+    existing = scheduler.get_job(job_id)
+    if existing:
+        scheduler.remove_job(job_id)
     if section.enabled and section.update_interval_minutes > 0:
+        cfg = _section_config(section)
+        if _adaptive_enabled(section, cfg):
+            # 持久化任务中保存着上次学到的间隔，重启后接着用
+            if existing and isinstance(existing.trigger, IntervalTrigger):
+                poller.restore(section.id, section.update_interval_minutes,
+                               existing.trigger.interval.total_seconds() / 60, cfg)
+            interval = poller.current_interval(section.id, section.update_interval_minutes)
+        else:
+            poller.forget(section.id)
+            interval = section.update_interval_minutes
+        if next_run_time is None and section.last_run_at is None and existing and existing.next_run_time:
+            # 从未运行过的板块沿用已排好的首次运行时间，重启不会一再推迟
+            next_run_time = existing.next_run_time
         scheduler.add_job(
-            func=run_section_fetch,
-            trigger=IntervalTrigger(minutes=section.update_interval_minutes),
+            # 以字符串引用任务函数，持久化后由任意进程（python app.py / worker.py）都能还原
+            func='app:run_scheduled_fetch',
+            trigger=_section_trigger(interval),
             id=job_id,
             kwargs={'section_id': section.id},
             replace_existing=True,
+            next_run_time=next_run_time or _section_next_run(section, interval),
+            # 同一板块同时只运行一个实例，错过的多次触发合并为一次
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=DevConfig.FETCH_MISFIRE_GRACE_SECONDS,
         )
+    else:
+        poller.forget(section.id)
+
+
+def _on_fetch_job_skipped(event):
+    """APScheduler 因实例已在运行或错过触发而跳过的采集，同样记录下来"""
+    if not str(event.job_id).startswith('section_'):
+        return
+    try:
+        section_id = int(str(event.job_id).split('_', 1)[1])
+    except ValueError:
+        return
+    reason = 'max_instances: 上一次采集仍在运行' if event.code == EVENT_JOB_MAX_INSTANCES else 'misfire: 错过触发时间'
+    record_fetch_run(section_id, 'skipped', 'schedule', error=reason)
+    with app.app_context():
+        section = Section.query.get(section_id)
+        if section:
+            metrics.FETCH_RUNS.inc(section=section.name, method=section.fetch_method, status='skipped')
+
+
+scheduler.add_listener(_on_fetch_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+
+def _scheduler_job_counts():
+    """调度器队列深度：已排程任务数与已到期等待执行的任务数"""
+    if not scheduler_active():
+        return {}
+    now = datetime.now(UTC)
+    jobs = scheduler.get_jobs()
+    due = sum(1 for j in jobs if j.next_run_time and j.next_run_time <= now)
+    return {('scheduled',): len(jobs), ('due',): due}
+
+
+metrics.registry.gauge('dailynews_scheduler_jobs', '调度器任务数（scheduled=已排程，due=已到期待执行）', ('state',), callback=_scheduler_job_counts)
+metrics.registry.gauge('dailynews_fetch_in_progress', '正在运行的采集任务数', callback=lambda: len(_running_sections))
+metrics.registry.gauge('dailynews_db_write_queue_depth', '单写线程队列中等待提交的写操作数', callback=lambda: writer.depth())
+
+
+# 板块条目片段缓存：{(section_id, limit): (版本, 过期时间, html)}
+# 本进程的写入会更新版本号立即失效；TTL 兜底其他进程（如 MCP、独立 worker）的写入
+_fragment_cache = {}
+_fragment_versions = {}
+_fragment_lock = Lock()
+
+
+def invalidate_section_fragments(section_id: int | None = None):
+    """条目或译文变化后调用；section_id 为空表示所有板块"""
+    with _fragment_lock:
+        key = section_id if section_id is not None else '*'
+        _fragment_versions[key] = _fragment_versions.get(key, 0) + 1
+
+
+def _fragment_version(section_id: int) -> tuple:
+    return (_fragment_versions.get(section_id, 0), _fragment_versions.get('*', 0))
+
+
+# 列表只需要的列：摘要全文与译文全文延迟到展开时再按需加载
+LIST_COLUMNS = (NewsItem.id, NewsItem.section_id, NewsItem.title, NewsItem.url, NewsItem.published_at,
+                NewsItem.created_at, NewsItem.title_translated, NewsItem.translated_at,
+                NewsItem.summary_preview, NewsItem.summary_translated_preview)
+
+
+def latest_section_items(section_id: int, limit: int = 100) -> list:
+    items = (NewsItem.query
+             .options(load_only(*LIST_COLUMNS))
+             .filter_by(section_id=section_id)
+             .order_by(NewsItem.created_at.desc(), NewsItem.published_at.desc())
+             .limit(limit)
+             .all())
+    # 为每个条目添加翻译状态
+    now = datetime.utcnow()
+    for item in items:
+        item.has_translation = bool(item.title_translated or item.summary_translated_preview)
+        item.is_new = bool(item.created_at) and (now - item.created_at).total_seconds() <= 12*3600
+    return items
+
+
+# 板块 Atom / JSON Feed：提交后由后台线程重新生成到 data/feeds，请求只读文件
+FEED_COLUMNS = (NewsItem.id, NewsItem.title, NewsItem.url, NewsItem.published_at, NewsItem.created_at,
+                NewsItem.title_translated, NewsItem.translated_at,
+                NewsItem.summary_preview, NewsItem.summary_translated_preview)
+feed_store = feeds.FeedStore()
+
+
+def render_section_feeds(section_id: int) -> bool:
+    """重新生成一个板块的全部 feed；板块不存在时删除其文件并返回 False"""
+    with app.app_context():
+        section = db.session.get(Section, section_id)
+        if section is None:
+            feed_store.delete_section(section_id)
+            return False
+        rows = (db.session.query(*FEED_COLUMNS)
+                .filter(NewsItem.section_id == section_id)
+                .order_by(NewsItem.created_at.desc(), NewsItem.id.desc())
+                .limit(DevConfig.FEED_MAX_ITEMS)
+                .all())
+        name, description = section.name, section.description or ''
+    items = [{
+        'id': r.id, 'title': r.title, 'url': r.url or '',
+        'published_at': r.published_at, 'created_at': r.created_at, 'translated_at': r.translated_at,
+        'summary': r.summary_preview or '',
+        'title_translated': r.title_translated or '', 'summary_translated': r.summary_translated_preview or '',
+    } for r in rows]
+    settings = get_translation_settings()
+    base = DevConfig.DAILYNEWS_BASE_URL.rstrip('/')
+
+    def meta_for(fmt, translated):
+        return {
+            'id': f"{base}/feeds/{section_id}",
+            'title': f"DailyNews - {name}",
+            'description': description,
+            'html_url': f"{base}/#list-{section_id}",
+            'self_url': f"{base}/feeds/{section_id}.{fmt}" + ('?translated=1' if translated else ''),
+            'language': settings['target_lang'] if translated else settings['source_lang'],
+        }
+
+    changed = feeds.publish_section(feed_store, meta_for, section_id, items)
+    if changed:
+        print(f"[Feeds] section={name}: {changed} files updated ({len(items)} items)")
+    return True
+
+
+feed_publisher = feeds.FeedPublisher(render_section_feeds, delay=DevConfig.FEED_DEBOUNCE_SECONDS)
+
+
+def mark_section_feeds(section_id: int):
+    """入库/翻译/归档提交后调用，稍后在后台重新生成该板块的 feed"""
+    if DevConfig.FEEDS_ENABLED:
+        feed_publisher.mark(section_id)
+
 
 # Routes
 @app.route('/')
 def index():
+    # 只渲染板块外壳，条目列表滚动到可见区域后经 /sections/<id>/items 加载
     sections = Section.query.order_by(Section.name).all()
-    latest = {}
-    for s in sections:
-        items = (NewsItem.query
-                 .filter_by(section_id=s.id)
-                 .order_by(NewsItem.created_at.desc(), NewsItem.published_at.desc())
-                 .limit(100)
-                 .all())
-        # 为每个条目添加翻译状态
-        for item in items:
-            item.has_translation = bool(item.title_translated or item.summary_translated)
-            try:
-                now = datetime.utcnow()
-                if item.created_at:
-                    item.is_new = (now - item.created_at).total_seconds() <= 12*3600
-                else:
-                    item.is_new = False
-            except Exception:
-                item.is_new = False
-        latest[s.id] = items
-    return render_template('index.html', sections=sections, latest=latest)
+    return render_template('index.html', sections=sections)
+
+@app.route('/sections/<int:section_id>/items')
+def section_items_fragment(section_id):
+    """板块条目列表 HTML 片段（带缓存与 ETag）"""
+    limit = max(1, min(request.args.get('limit', 100, type=int) or 100, 200))
+    key = (section_id, limit)
+    now = time.monotonic()
+    with _fragment_lock:
+        version = _fragment_version(section_id)
+        cached = _fragment_cache.get(key)
+    if cached and cached[0] == version and cached[1] > now:
+        html = cached[2]
+    else:
+        html = render_template('_section_items.html', items=latest_section_items(section_id, limit))
+        with _fragment_lock:
+            _fragment_cache[key] = (version, now + DevConfig.FRAGMENT_CACHE_SECONDS, html)
+    resp = app.response_class(html, content_type='text/html; charset=utf-8')
+    resp.set_etag(hashlib.md5(html.encode('utf-8')).hexdigest())
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
+
+@app.route('/feeds/<int:section_id>.<fmt>')
+def section_feed(section_id, fmt):
+    """板块的预生成 feed：.atom / .json，?translated=1 为译文版；支持 ETag/Last-Modified 与 gzip"""
+    if not DevConfig.FEEDS_ENABLED or fmt not in feeds.FORMATS:
+        return jsonify({'ok': False, 'error': 'feed not found'}), 404
+    translated = request.args.get('translated', '').lower() in ('1', 'true', 'yes')
+    name = feeds.feed_name(section_id, fmt, translated)
+    meta = feed_store.meta(name)
+    # 尚未生成过（新板块、刚升级）时同步生成一次，之后都由提交触发
+    if meta is None and render_section_feeds(section_id):
+        meta = feed_store.meta(name)
+    gzipped = 'gzip' in request.accept_encodings
+    body = feed_store.read(name, gzipped) if meta else None
+    if body is None:
+        return jsonify({'ok': False, 'error': 'feed not found'}), 404
+    resp = app.response_class(body, content_type=feeds.FORMATS[fmt])
+    resp.set_etag(meta['etag'] + ('-gz' if gzipped else ''))
+    resp.last_modified = parsedate_to_datetime(meta['last_modified'])
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'public, max-age=60'
+    if gzipped:
+        resp.headers['Content-Encoding'] = 'gzip'
+    return resp.make_conditional(request)
 
 @app.route('/sections')
 def manage_sections():
     sections = Section.query.order_by(Section.id.desc()).all()
-    return render_template('sections.html', sections=sections)
+    snapshot = health.registry.snapshot()
+    source_health = {
+        s.id: [snapshot.get(k) or {'key': k, 'state': health.CLOSED}
+               for k in health.section_source_keys(s.fetch_method, _section_config(s))]
+        for s in sections
+    }
+    return render_template('sections.html', sections=sections, adaptive=poller.snapshot(), source_health=source_health)
 
 @app.route('/sections', methods=['POST'])
 def create_section():
@@ -211,11 +824,22 @@ def toggle_section(section_id):
 @app.route('/sections/<int:section_id>/delete', methods=['POST'])
 def delete_section(section_id):
     s = Section.query.get_or_404(section_id)
-    NewsItem.query.filter_by(section_id=section_id).delete()
+    # 批量删除不经过 ORM 级联：依赖这些条目/板块的行在同一事务中显式删除，
+    # 否则残留的分桶键会继续命中去重候选
+    item_ids = db.session.query(NewsItem.id).filter(NewsItem.section_id == section_id)
+    ItemBand.query.filter(ItemBand.item_id.in_(item_ids.scalar_subquery())).delete(synchronize_session=False)
+    FetchRun.query.filter_by(section_id=section_id).delete(synchronize_session=False)
+    ItemEvent.query.filter_by(section_id=section_id).delete(synchronize_session=False)
+    LeaderLease.query.filter_by(name=fetch_lease_name(section_id)).delete(synchronize_session=False)
+    # 其他板块的条目可能与本板块条目同簇，簇代表交给剩余成员
+    _repoint_clusters(db.session, item_ids.scalar_subquery())
+    NewsItem.query.filter_by(section_id=section_id).delete(synchronize_session=False)
     db.session.delete(s)
     db.session.commit()
+    feed_store.delete_section(section_id)
     try:
-        scheduler.remove_job(f"section_{section_id}")
+        if scheduler.running and scheduler_lease_held.is_set():
+            _remove_job(f"section_{section_id}")
     except Exception:
         pass
     flash('删除成功', 'success')
@@ -277,7 +901,7 @@ def test_translate():
             if mymem_de:
                 extra['de'] = mymem_de
             r = requests.get(
-                'https://api.mymemory.translated.net/get',
+                DevConfig.MYMEMORY_API_URL,
                 params={ 'q': 'hello', 'langpair': f"{source_lang}|zh-CN", **extra },
                 timeout=8
             )
@@ -348,24 +972,31 @@ def translate_text():
             extra = {}
             if mymem_de:
                 extra['de'] = mymem_de
+            terms = current_glossary()
             for text in texts:
                 try:
+                    offline = terms.translate_fully(text or '')
+                    if offline is not None:
+                        metrics.TRANSLATION_CACHE_HITS.inc(provider='glossary')
+                        results.append(offline)
+                        continue
+                    masked, slots = terms.protect(text or '')
                     # 安全截断到500字符，避免 MyMemory 的长度限制报错
-                    safe_q = (text or '')[:500]
+                    safe_q = masked[:500]
 
                     # 加入 429 指数回退重试（最多 3 次: 0.5s, 1.0s, 2.0s）
                     attempts = 0
                     wait = 0.5
                     translated = None
                     while attempts < 3 and translated is None:
-                        r = requests.get(
-                            'https://api.mymemory.translated.net/get',
-                            params={ 'q': safe_q, 'langpair': f"{source_lang}|{target_lang}", **extra },
+                        r = mymemory_get(
+                            { 'q': safe_q, 'langpair': f"{source_lang}|{target_lang}", **extra },
                             timeout=12
                         )
                         if r.status_code == 200:
                             j = r.json()
-                            translated = ((j.get('responseData') or {}).get('translatedText') or '').strip() or text
+                            translated = ((j.get('responseData') or {}).get('translatedText') or '').strip()
+                            translated = terms.restore(translated, slots) if translated else text
                             break
                         elif r.status_code == 429:
                             attempts += 1
@@ -392,10 +1023,18 @@ def translate_text():
             env = os.environ.copy()
             if DevConfig.GEMINI_API_KEY and 'GEMINI_API_KEY' not in env:
                 env['GEMINI_API_KEY'] = DevConfig.GEMINI_API_KEY
+            terms = current_glossary()
             for text in texts:
-                prompt = f"请将以下文本翻译成{target_lang}，只返回翻译结果，不要解释：\n\n{text}"
+                offline = terms.translate_fully(text or '')
+                if offline is not None:
+                    metrics.TRANSLATION_CACHE_HITS.inc(provider='glossary')
+                    results.append(offline)
+                    continue
+                hints = terms.hints(text or '')
+                prompt = (f"请将以下文本翻译成{target_lang}，只返回翻译结果，不要解释："
+                          + (f"\n{hints}" if hints else '') + f"\n\n{text}")
                 try:
-                    result = subprocess.run(
+                    result = gemini_run(
                         [cmd, '--prompt', prompt],
                         shell=False,
                         capture_output=True,
@@ -484,6 +1123,13 @@ def stop_mcp():
 
 
 
+def _translation_succeeded(original: str, translated: str) -> bool:
+    """译文与原文不同才算翻译成功；按术语表整段保持原文（如只有产品名的标题）同样算完成"""
+    if not translated:
+        return False
+    return translated != original or current_glossary().translate_fully(original) is not None
+
+
 def translate_text_background(text, settings):
     """后台翻译单条文本"""
     if not text or not text.strip():
@@ -492,9 +1138,17 @@ def translate_text_background(text, settings):
     method = settings['method']
     if method == 'none':
         return text
+    # 整段只由术语组成时离线翻译，不调用翻译服务
+    terms = current_glossary()
+    offline = terms.translate_fully(text)
+    if offline is not None:
+        metrics.TRANSLATION_CACHE_HITS.inc(provider='glossary')
+        return offline
     
     try:
         if method == 'free':
+            # 术语换成占位符，译文返回后还原为指定译名
+            masked, slots = terms.protect(text)
             # MyMemory 免费翻译
             extra = {}
             if settings['mymemory_email']:
@@ -502,7 +1156,7 @@ def translate_text_background(text, settings):
             
             # 对超长文本分段处理
             chunks = []
-            text_chunks = [text[i:i+500] for i in range(0, len(text), 500)]
+            text_chunks = [masked[i:i+500] for i in range(0, len(masked), 500)]
             
             for chunk in text_chunks:
                 attempts = 0
@@ -518,8 +1172,7 @@ def translate_text_background(text, settings):
                     params.update(extra)
                     
                     try:
-                        import requests
-                        response = requests.get('https://api.mymemory.translated.net/get', params=params, timeout=10)
+                        response = mymemory_get(params, timeout=10)
                         if response.status_code == 200:
                             data = response.json()
                             if data.get('responseStatus') == 200:
@@ -543,7 +1196,10 @@ def translate_text_background(text, settings):
                 # 请求间延时
                 time.sleep(settings['delay_seconds'])
             
-            return ''.join(chunks)
+            result = ''.join(chunks)
+            if result == masked:
+                return text  # 全部失败：保持原文，交给下一轮重试
+            return terms.restore(result, slots)
             
         elif method == 'gemini':
             # Gemini CLI 翻译
@@ -552,10 +1208,12 @@ def translate_text_background(text, settings):
             if not cmd:
                 return text
             
-            prompt = f"请将以下文本翻译为{settings['target_lang']}，只返回翻译结果，不要任何解释：\n\n{text}"
+            hints = terms.hints(text)
+            prompt = (f"请将以下文本翻译为{settings['target_lang']}，只返回翻译结果，不要任何解释："
+                      + (f"\n{hints}" if hints else '') + f"\n\n{text}")
             
             try:
-                result = subprocess.run(
+                result = gemini_run(
                     cmd.split() + [prompt],
                     capture_output=True,
                     text=True,
@@ -584,11 +1242,52 @@ def translate_text_background(text, settings):
 # 后台翻译任务锁
 translation_lock = threading.Lock()
 
+
+def save_translation(item_id: int, fields: dict):
+    """提交译文写入（返回 Future），同时更新翻译时间戳"""
+    values = dict(fields)
+    values['translated_at'] = datetime.now(UTC)
+    if 'summary_translated' in values:
+        values['summary_translated_preview'] = sanitize.preview(values['summary_translated'])
+    fut = writer.submit(lambda s: s.query(NewsItem).filter_by(id=item_id).update(values))
+    fut.add_done_callback(lambda _f: invalidate_section_fragments())
+    return fut
+
+def cluster_peers(item: NewsItem) -> list:
+    """同簇的其他条目（跨板块的同一新闻）；未归簇时为空"""
+    if not item.cluster_id:
+        return []
+    return NewsItem.query.options(load_only(
+        NewsItem.id, NewsItem.section_id, NewsItem.title, NewsItem.title_sig, NewsItem.summary_preview,
+        NewsItem.title_translated, NewsItem.summary_translated,
+    )).filter(
+        (NewsItem.id == item.cluster_id) | (NewsItem.cluster_id == item.cluster_id),
+        NewsItem.id != item.id,
+    ).all()
+
+
+def _same_source_text(a: NewsItem, b: NewsItem, field: str) -> bool:
+    """簇内两条的原文是否足够接近，可以共用该字段的译文"""
+    if field == 'title_translated':
+        if dedup.normalize_title(a.title) == dedup.normalize_title(b.title):
+            return True
+        return dedup.is_near_duplicate(a.title, dedup.unpack(a.title_sig), b.title, dedup.unpack(b.title_sig),
+                                       DevConfig.DEDUP_THRESHOLD)
+    # 摘要来自不同来源时内容往往不同，只有预览完全一致（同一篇转载）才复用
+    return bool(a.summary_preview) and a.summary_preview == b.summary_preview
+
+
 def run_background_translation():
     """后台翻译任务：定期翻译未翻译的内容"""
     if not translation_lock.acquire(blocking=False):
         print("[BackgroundTranslation] 翻译任务已在运行中，跳过本次执行")
         return
+    # 跨进程互斥：worker 的定时翻译与 Web 进程中手动触发的翻译不会同时运行
+    run_lease = leader.Lease(writer, LeaderLease, TRANSLATION_LEASE, DevConfig.TRANSLATION_LEASE_SECONDS)
+    if not run_lease.acquire():
+        translation_lock.release()
+        print("[BackgroundTranslation] 其他进程正在翻译，跳过本次执行")
+        return
     
     try:
         with app.app_context():
@@ -597,12 +1296,20 @@ def run_background_translation():
                 print("[BackgroundTranslation] 翻译已禁用")
                 return
             
-            # 查找未翻译的条目（优先处理最新的）
+            # 查找未翻译的条目（优先处理最新的），已识别为目标语言的条目视为无需翻译
+            target = language.primary(settings['target_lang'])
+            # 没有摘要的条目只需翻译标题，否则译好标题后仍会每轮被重新选中
             untranslated = NewsItem.query.filter(
                 (NewsItem.title_translated == '') | 
-                (NewsItem.summary_translated == '') |
                 (NewsItem.title_translated.is_(None)) |
-                (NewsItem.summary_translated.is_(None))
+                (((NewsItem.summary_translated == '') | (NewsItem.summary_translated.is_(None)))
+                 & (NewsItem.summary_preview != ''))
+            ).filter(
+                (NewsItem.lang.is_(None)) | (NewsItem.lang != target)
+            ).filter(
+                # 无法识别语言、译文多轮都与原文相同的条目视为无需翻译
+                (NewsItem.lang != language.UNDETERMINED) | (NewsItem.lang.is_(None)) |
+                (db.func.coalesce(NewsItem.translate_attempts, 0) < DevConfig.UND_TRANSLATE_MAX_ATTEMPTS)
             ).order_by(NewsItem.created_at.desc()).limit(settings['batch_size']).all()
             
             if not untranslated:
@@ -612,70 +1319,299 @@ def run_background_translation():
             print(f"[BackgroundTranslation] 开始翻译 {len(untranslated)} 条内容")
             
             translated_count = 0
+            pending = []
+            assigned = {}  # 条目 id -> 本轮已提交的译文字段（含从簇内复用的）
+            detected = {}  # 迁移前入库、尚未识别语言的条目 id -> 语言
+            unchanged = []  # 语言为 'und' 且本轮译文与原文相同的条目 id
             for item in untranslated:
+                if not run_lease.renew_if_due():
+                    print("[BackgroundTranslation] 翻译租约已被其他进程接管，提前结束")
+                    break
                 try:
+                    item_lang = item.lang
+                    if not item_lang:
+                        item_lang = detected[item.id] = language.detect(f"{item.title}\n{item.summary_preview or ''}")
+                        if language.is_target(item_lang, target):
+                            continue  # 记下语言后即不再进入待翻译队列
+                    done = assigned.get(item.id, {})
+                    summary = item.full_summary
+                    need = []
+                    if not item.title_translated and 'title_translated' not in done:
+                        need.append('title_translated')
+                    if not item.summary_translated and 'summary_translated' not in done and summary:
+                        need.append('summary_translated')
+                    if not need:
+                        continue
+                    # 同一簇（跨板块的同一新闻）原文相同的字段只翻译一次
+                    peers = cluster_peers(item)
+                    fields, reused = {}, {}
+                    for field in need:
+                        for p in peers:
+                            value = getattr(p, field) or assigned.get(p.id, {}).get(field)
+                            if value and _same_source_text(item, p, field):
+                                reused[field] = value
+                                break
+                    called = False
                     # 翻译标题
-                    if not item.title_translated:
+                    if 'title_translated' in need and 'title_translated' not in reused:
+                        called = True
                         translated_title = translate_text_background(item.title, settings)
-                        if translated_title != item.title:  # 只有翻译成功才保存
-                            item.title_translated = translated_title
-                            translated_count += 1
+                        if _translation_succeeded(item.title, translated_title):  # 只有翻译成功才保存
+                            fields['title_translated'] = translated_title
                     
                     # 翻译摘要
-                    if not item.summary_translated and item.summary:
-                        translated_summary = translate_text_background(item.summary, settings)
-                        if translated_summary != item.summary:  # 只有翻译成功才保存
-                            item.summary_translated = translated_summary
-                            translated_count += 1
+                    if 'summary_translated' in need and 'summary_translated' not in reused:
+                        called = True
+                        translated_summary = translate_text_background(summary, settings)
+                        if _translation_succeeded(summary, translated_summary):  # 只有翻译成功才保存
+                            fields['summary_translated'] = translated_summary
                     
-                    # 更新翻译时间戳
-                    if item.title_translated or item.summary_translated:
-                        item.translated_at = datetime.now(UTC)
+                    # 'und' 条目（符号、数字、专有名词等）译文常与原文相同，记一轮，达到上限后不再重选
+                    if called and not fields and item_lang == language.UNDETERMINED:
+                        unchanged.append(item.id)
                     
-                    # 保存到数据库
-                    db.session.commit()
+                    # 异步交给单写线程，多条译文合并为一个事务提交
+                    if fields or reused:
+                        translated_count += len(fields)
+                        if reused:
+                            metrics.TRANSLATION_CACHE_HITS.inc(len(reused), provider='cluster')
+                        values = {**reused, **fields}
+                        assigned.setdefault(item.id, {}).update(values)
+                        pending.append((item.id, item.section_id, len(fields), save_translation(item.id, values)))
+                    # 新译文同时写给簇内原文相同、还没有译文的条目
+                    for p in peers:
+                        todo = {k: v for k, v in fields.items()
+                                if not getattr(p, k) and k not in assigned.get(p.id, {}) and _same_source_text(item, p, k)}
+                        if todo:
+                            metrics.TRANSLATION_CACHE_HITS.inc(len(todo), provider='cluster')
+                            assigned.setdefault(p.id, {}).update(todo)
+                            pending.append((p.id, p.section_id, 0, save_translation(p.id, todo)))
                     
-                    # 延时避免过快请求
-                    time.sleep(settings['delay_seconds'])
+                    # 延时避免过快请求（只复用簇内译文时没有调用翻译接口）
+                    if called:
+                        time.sleep(settings['delay_seconds'])
                     
                 except Exception as e:
                     print(f"[BackgroundTranslation] 翻译条目 {item.id} 失败: {e}")
-                    db.session.rollback()
                     continue
             
+            if detected:
+                def _save_langs(s, langs=dict(detected)):
+                    for item_id, lang in langs.items():
+                        s.query(NewsItem).filter_by(id=item_id).update({'lang': lang}, synchronize_session=False)
+                try:
+                    writer.write(_save_langs)
+                except Exception as e:
+                    print(f"[BackgroundTranslation] 保存语言识别结果失败: {e}")
+                skipped = sum(1 for lang in detected.values() if language.is_target(lang, target))
+                if skipped:
+                    print(f"[BackgroundTranslation] {skipped} 条已是目标语言，跳过翻译")
+            if unchanged:
+                def _count_attempts(s, ids=tuple(unchanged)):
+                    s.query(NewsItem).filter(NewsItem.id.in_(ids)).update(
+                        {'translate_attempts': db.func.coalesce(NewsItem.translate_attempts, 0) + 1},
+                        synchronize_session=False)
+                try:
+                    writer.write(_count_attempts)
+                except Exception as e:
+                    print(f"[BackgroundTranslation] 保存翻译轮数失败: {e}")
+            saved = {}
+            for item_id, section_id, n_fields, fut in pending:
+                try:
+                    fut.result()
+                    saved.setdefault(section_id, []).append(item_id)
+                except Exception as e:
+                    translated_count -= n_fields
+                    print(f"[BackgroundTranslation] 保存条目 {item_id} 译文失败: {e}")
+            # 每个板块一条事件，推送给打开的看板
+            for section_id, ids in saved.items():
+                event_bus.publish(writer.write(lambda s, sid=section_id, ids=ids: record_item_event(s, 'translation', sid, ids)))
+                mark_section_feeds(section_id)
+            
             print(f"[BackgroundTranslation] 完成，翻译了 {translated_count} 个字段")
             
     except Exception as e:
         print(f"[BackgroundTranslation] 后台翻译任务出错: {e}")
     finally:
+        run_lease.release()
         translation_lock.release()
 
+def _glossary_term_dict(t: GlossaryTerm) -> dict:
+    return {'id': t.id, 'source': t.source, 'target': t.target or '', 'case_sensitive': bool(t.case_sensitive)}
+
+
+@app.route('/api/glossary', methods=['GET'])
+def list_glossary():
+    terms = GlossaryTerm.query.order_by(GlossaryTerm.source).all()
+    return jsonify({'ok': True, 'count': len(terms), 'terms': [_glossary_term_dict(t) for t in terms]})
+
+
+@app.route('/api/glossary', methods=['POST'])
+def save_glossary():
+    """新增/更新术语
+
+    terms 可以是 {"原文": "译名"}（译名为空表示保持原文），也可以是 [{source, target, case_sensitive}]；
+    replace=true 时整表替换（设置页保存整个词典）。
+    """
+    data = request.get_json(silent=True) or {}
+    raw = data.get('terms')
+    if isinstance(raw, dict):
+        raw = [{'source': k, 'target': v} for k, v in raw.items()]
+    if not isinstance(raw, list):
+        return jsonify({'ok': False, 'error': 'terms must be an object or a list'}), 400
+    entries = {}
+    for t in raw:
+        if not isinstance(t, dict):
+            return jsonify({'ok': False, 'error': 'invalid term'}), 400
+        source = str(t.get('source') or '').strip()
+        target = str(t.get('target') or '').strip()
+        if not source:
+            continue
+        if len(source) > 200 or len(target) > 200:
+            return jsonify({'ok': False, 'error': f'term too long: {source[:40]}'}), 400
+        entries[source] = (target, bool(t.get('case_sensitive', False)))
+    replace = bool(data.get('replace'))
+
+    def _save(s):
+        now = datetime.utcnow()
+        existing = {t.source: t for t in s.query(GlossaryTerm)}
+        for source, (target, case_sensitive) in entries.items():
+            t = existing.get(source)
+            if t is None:
+                s.add(GlossaryTerm(source=source, target=target, case_sensitive=case_sensitive, updated_at=now))
+            elif (t.target or '', bool(t.case_sensitive)) != (target, case_sensitive):
+                t.target, t.case_sensitive, t.updated_at = target, case_sensitive, now
+        if replace:
+            stale = [t.id for src, t in existing.items() if src not in entries]
+            if stale:
+                s.query(GlossaryTerm).filter(GlossaryTerm.id.in_(stale)).delete(synchronize_session=False)
+
+    try:
+        writer.write(_save)
+    except Exception as e:
+        return jsonify({'ok': False, 'error': str(e)}), 500
+    _glossary_cache['checked'] = 0.0  # 本进程立即生效
+    return jsonify({'ok': True, 'count': GlossaryTerm.query.count()})
+
+
+@app.route('/api/glossary/<int:term_id>', methods=['DELETE'])
+def delete_glossary_term(term_id: int):
+    deleted = writer.write(lambda s: s.query(GlossaryTerm).filter_by(id=term_id).delete())
+    _glossary_cache['checked'] = 0.0
+    if not deleted:
+        return jsonify({'ok': False, 'error': 'term not found'}), 404
+    return jsonify({'ok': True})
+
+
 # 获取缓存译文API
+# 译文增量同步：游标为 (translated_at, id)，与 /api/items 的游标编码相同
+TRANSLATIONS_DEFAULT_LIMIT = 200
+TRANSLATIONS_MAX_LIMIT = 500
+
+
 @app.route('/api/cached_translations')
 def get_cached_translations():
-    """获取指定板块的缓存译文"""
+    """获取指定板块的缓存译文（增量同步）
+
+    - ids=1,2,3：只返回这些条目的译文，cursor 为板块当前的同步位置（首次同步时用）
+    - since=<cursor>：只返回该位置之后新增或重译的译文，按翻译时间升序，has_more 时带新游标继续取
+    - 两者都不带时返回最近翻译的 limit 条
+    空字段不返回；响应带 ETag，没有变化时返回 304。
+    """
     section_id = request.args.get('section_id', type=int)
     if not section_id:
         return jsonify({'ok': False, 'error': 'section_id is required'}), 400
+    limit = max(1, min(request.args.get('limit', TRANSLATIONS_DEFAULT_LIMIT, type=int)
+                       or TRANSLATIONS_DEFAULT_LIMIT, TRANSLATIONS_MAX_LIMIT))
+    ids = None
+    raw_ids = request.args.get('ids', '').strip()
+    if raw_ids:
+        try:
+            ids = sorted({int(x) for x in raw_ids.split(',') if x.strip()})
+        except ValueError:
+            return jsonify({'ok': False, 'error': 'ids must be comma-separated integers'}), 400
+        if len(ids) > TRANSLATIONS_MAX_LIMIT:
+            return jsonify({'ok': False, 'error': f'at most {TRANSLATIONS_MAX_LIMIT} ids'}), 400
+    since = None
+    if request.args.get('since'):
+        try:
+            since = _decode_cursor(request.args['since'])
+        except ValueError as e:
+            return jsonify({'ok': False, 'error': str(e)}), 400
     
     # 查询该板块下有译文的条目
-    items = NewsItem.query.filter_by(section_id=section_id).filter(
+    columns = (NewsItem.id, NewsItem.title_translated, NewsItem.summary_translated, NewsItem.translated_at)
+    base = db.session.query(*columns).filter(NewsItem.section_id == section_id).filter(
         (NewsItem.title_translated != '') | (NewsItem.summary_translated != '')
-    ).all()
+    )
+    q = base.filter(NewsItem.id.in_(ids)) if ids is not None else base
+    newest = (NewsItem.translated_at.desc(), NewsItem.id.desc())
+    if since:
+        t_at, t_id = since
+        q = q.filter(NewsItem.translated_at >= t_at).filter(
+            (NewsItem.translated_at > t_at) | (NewsItem.id > t_id)
+        ).order_by(NewsItem.translated_at, NewsItem.id)
+    else:
+        q = q.order_by(*newest)
+    rows = q.limit(limit + 1).all() if ids is None or since else q.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    # 同步位置：增量时为本次最后一条；否则为整个板块最新的一条译文
+    cursor = request.args.get('since') or None
+    if since:
+        if rows:
+            cursor = _encode_cursor(rows[-1].translated_at, rows[-1].id)
+    else:
+        top = rows[0] if rows and ids is None else base.filter(NewsItem.translated_at.isnot(None)).order_by(*newest).first()
+        if top is not None and top.translated_at:
+            cursor = _encode_cursor(top.translated_at, top.id)
     
     translations = []
-    for item in items:
-        translation = {
-            'item_id': item.id,
-            'title_translated': item.title_translated if item.title_translated else None,
-            'summary_translated': item.summary_translated if item.summary_translated else None,
-            'translated_at': item.translated_at.isoformat() if item.translated_at else None
-        }
-        translations.append(translation)
+    for r in rows:
+        t = {'item_id': r.id}
+        if r.title_translated:
+            t['title_translated'] = r.title_translated
+        if r.summary_translated:
+            t['summary_translated'] = r.summary_translated
+        translations.append(t)
+    metrics.TRANSLATION_CACHE_HITS.inc(len(translations), provider='db')
     
+    resp = jsonify({'ok': True, 'translations': translations, 'cursor': cursor, 'has_more': has_more})
+    resp.set_etag(hashlib.md5(resp.get_data()).hexdigest())
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
+
+def _persisted_next_run(job_id: str):
+    """任务的下次运行时间：本进程调度器中的任务，或持久化任务表（调度器在其他进程时）"""
+    if scheduler_active():
+        job = scheduler.get_job(job_id)
+        return job.next_run_time if job else None
+    if DevConfig.SCHEDULER_JOBSTORE != 'db':
+        return None
+    try:
+        ts = db.session.execute(db.text('SELECT next_run_time FROM apscheduler_jobs WHERE id = :id'),
+                                {'id': job_id}).scalar()
+    except Exception:
+        db.session.rollback()
+        return None
+    return datetime.fromtimestamp(ts, UTC) if ts else None
+
+
+def _lease_active(name: str) -> bool:
+    lease = db.session.get(LeaderLease, name)
+    return bool(lease and lease.expires_at and lease.expires_at > datetime.utcnow())
+
+
+@app.route('/api/worker/status')
+def worker_status():
+    """调度租约与任务租约的持有情况"""
+    leases = leader.lease_status(db.session, LeaderLease)
     return jsonify({
         'ok': True,
-        'translations': translations
+        'mode': DevConfig.SCHEDULER_MODE,
+        'scheduler_local': scheduler_active(),
+        'leases': leases,
     })
 
 # 后台翻译控制API
@@ -689,13 +1625,16 @@ def start_background_translation():
             if settings['method'] == 'none':
                 return jsonify({'ok': False, 'error': '翻译功能已禁用，请在设置中启用'}), 400
         
-        # 手动触发一次后台翻译任务
-        scheduler.add_job(
-            func=run_background_translation,
-            trigger='date',  # 立即执行一次
-            id='manual_background_translation',
-            replace_existing=True
-        )
+        # 手动触发一次后台翻译任务；本进程没有运行调度器时直接起线程执行（跨进程互斥由租约保证）
+        if scheduler_active():
+            scheduler.add_job(
+                func='app:run_background_translation',
+                trigger='date',  # 立即执行一次
+                id='manual_background_translation',
+                replace_existing=True
+            )
+        else:
+            threading.Thread(target=run_background_translation, daemon=True).start()
         
         return jsonify({'ok': True, 'message': '后台翻译任务已启动'})
     except Exception as e:
@@ -708,9 +1647,13 @@ def get_background_translation_status():
         with app.app_context():
             # 统计待翻译和已翻译的数量
             total_items = NewsItem.query.count()
+            target = language.primary(get_translation_settings()['target_lang'])
             translated_items = NewsItem.query.filter(
-                (NewsItem.title_translated != '') & 
-                (NewsItem.summary_translated != '')
+                ((NewsItem.title_translated != '') & 
+                 ((NewsItem.summary_translated != '') | (NewsItem.summary_preview == ''))) |
+                (NewsItem.lang == target) |  # 原文已是目标语言
+                ((NewsItem.lang == language.UNDETERMINED) &
+                 (NewsItem.translate_attempts >= DevConfig.UND_TRANSLATE_MAX_ATTEMPTS))  # 多轮译文与原文相同
             ).count()
             
             # 检查是否有翻译任务正在运行
@@ -718,10 +1661,11 @@ def get_background_translation_status():
             if not is_running:
                 translation_lock.release()
             
-            # 获取调度器状态
-            scheduler_running = scheduler.running
-            translation_job = scheduler.get_job('background_translation')
-            job_active = translation_job is not None
+            # 获取调度器状态（调度器可能运行在独立 worker 进程中，以租约是否有效为准）
+            scheduler_running = scheduler_active() or _lease_active(SCHEDULER_LEASE)
+            next_run = _persisted_next_run('background_translation')
+            job_active = next_run is not None
+            is_running = is_running or _lease_active(TRANSLATION_LEASE)
             
             return jsonify({
                 'ok': True,
@@ -732,29 +1676,674 @@ def get_background_translation_status():
                     'is_running': is_running,
                     'scheduler_active': scheduler_running,
                     'job_scheduled': job_active,
-                    'next_run': translation_job.next_run_time.isoformat() if translation_job and translation_job.next_run_time else None
+                    'next_run': next_run.isoformat() if next_run else None
                 }
             })
     except Exception as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
 
-# Bootstrap
-if __name__ == '__main__':
-    ensure_db()
-    # schedule all existing sections
+# 指标
+def publish_metrics(process: str):
+    """worker 进程调用：把本进程指标快照写入 metric_snapshots，顺带清理已退出进程的旧快照"""
+    payload = json.dumps(metrics.registry.snapshot(), ensure_ascii=False)
+
+    def _save(s):
+        now = datetime.utcnow()
+        row = s.get(MetricSnapshot, process)
+        if row is None:
+            s.add(MetricSnapshot(process=process, updated_at=now, payload=payload))
+        else:
+            row.updated_at, row.payload = now, payload
+        s.query(MetricSnapshot).filter(MetricSnapshot.updated_at < now - timedelta(days=1)).delete(synchronize_session=False)
+
+    writer.write(_save)
+
+
+def _worker_metric_snapshots() -> list:
+    """仍在运行的 worker 写入的指标快照（超过 4 个发布周期未更新的视为已退出）"""
+    cutoff = datetime.utcnow() - timedelta(seconds=4 * DevConfig.WORKER_METRICS_SECONDS)
+    try:
+        rows = db.session.query(MetricSnapshot.payload).filter(MetricSnapshot.updated_at >= cutoff).all()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[Metrics] load worker snapshots failed: {e}")
+        return []
+    return [json.loads(r.payload or '{}') for r in rows]
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 文本格式指标；?format=json 返回 JSON 快照
+
+    SCHEDULER_MODE=worker 时采集、翻译等计数发生在 worker 进程中，这里与其写入数据库的快照合并后输出。
+    """
+    remote = _worker_metric_snapshots()
+    if request.args.get('format') == 'json':
+        snapshot = metrics.merge([metrics.registry.snapshot()] + remote) if remote else metrics.registry.snapshot()
+        return jsonify({'ok': True, 'metrics': snapshot})
+    body = metrics.render_snapshot(metrics.merge([metrics.registry.snapshot()] + remote)) if remote \
+        else metrics.registry.render()
+    return app.response_class(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# 事件推送（SSE）
+def _latest_event_id() -> int:
+    with app.app_context():
+        return db.session.query(db.func.max(ItemEvent.id)).scalar() or 0
+
+
+def _event_payload(ev: ItemEvent) -> dict:
+    ids = json.loads(ev.item_ids or '[]')
+    data = {'section_id': ev.section_id, 'item_ids': ids}
+    if ev.kind == 'translation' and ids:
+        rows = (db.session.query(NewsItem.id, NewsItem.title_translated, NewsItem.summary_translated)
+                .filter(NewsItem.id.in_(ids)).all())
+        data['translations'] = [{
+            'item_id': r.id,
+            'title_translated': r.title_translated or None,
+            'summary_translated': r.summary_translated or None,
+        } for r in rows]
+    return data
+
+
+@app.route('/api/events')
+def event_stream():
+    """新条目与新译文的 SSE 流；支持 Last-Event-ID（或 ?last_event_id=）断线续传"""
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('last_event_id', type=int)
+    section_filter = {int(x) for x in request.args.get('section_id', '').split(',') if x.strip().isdigit()}
+
+    def generate():
+        nonlocal last_id
+        latest = _latest_event_id()
+        event_bus.publish(latest)
+        started = time.monotonic()
+        if last_id is None:
+            # 新连接从当前位置开始，不回放历史
+            last_id = latest
+            yield events.format_sse({'latest_id': latest}, event='hello', event_id=latest,
+                                    retry_ms=DevConfig.EVENTS_RETRY_MS)
+        else:
+            with app.app_context():
+                oldest = db.session.query(db.func.min(ItemEvent.id)).scalar()
+            if oldest is not None and last_id < oldest - 1:
+                # 续传位置早于已保留的事件：让客户端整体刷新
+                yield events.format_sse({'latest_id': latest}, event='reset', event_id=latest,
+                                        retry_ms=DevConfig.EVENTS_RETRY_MS)
+                last_id = latest
+        while time.monotonic() - started < DevConfig.EVENTS_MAX_STREAM_SECONDS:
+            latest = event_bus.wait(last_id, DevConfig.EVENTS_KEEPALIVE_SECONDS, _latest_event_id)
+            if latest <= last_id:
+                yield ': keepalive\n\n'
+                continue
+            with app.app_context():
+                rows = (ItemEvent.query.filter(ItemEvent.id > last_id)
+                        .order_by(ItemEvent.id).limit(200).all())
+                out = []
+                for ev in rows:
+                    last_id = ev.id
+                    if section_filter and ev.section_id not in section_filter:
+                        continue
+                    out.append(events.format_sse(_event_payload(ev), event=ev.kind, event_id=ev.id))
+            if out:
+                yield ''.join(out)
+        # 到达最长连接时间后关闭，浏览器按 retry 自动重连并带上 Last-Event-ID
+
+    resp = app.response_class(stream_with_context(generate()), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
+# 条目 JSON API（按 (created_at, id) 键集分页）
+ITEM_FIELDS = ('id', 'section_id', 'title', 'summary', 'summary_preview', 'url', 'published_at', 'created_at',
+               'title_translated', 'summary_translated', 'summary_translated_preview', 'translated_at', 'cluster_id')
+ITEMS_MAX_LIMIT = 500
+
+
+def _encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str):
+    """游标 -> (created_at, id)；格式错误抛 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except Exception:
+        raise ValueError('invalid cursor')
+
+
+def _parse_time_arg(name: str):
+    """解析 ISO8601 时间参数，统一为 naive UTC（与库中 created_at 一致）"""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'invalid {name}: {value}')
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC).replace(tzinfo=None)
+    return dt
+
+
+def _item_value(v):
+    return v.isoformat() if isinstance(v, datetime) else v
+
+
+@app.route('/api/items')
+def list_items():
+    """条目列表：section_id / since / until / translated 过滤，fields 投影，cursor 翻页"""
+    try:
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or list(ITEM_FIELDS)
+        unknown = [f for f in fields if f not in ITEM_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown fields: {','.join(unknown)}")
+        since = _parse_time_arg('since')
+        until = _parse_time_arg('until')
+        cursor = request.args.get('cursor', '').strip()
+        after = _decode_cursor(cursor) if cursor else None
+        section_ids = [int(x) for x in ','.join(request.args.getlist('section_id')).split(',') if x.strip()]
+    except ValueError as e:
+        return jsonify({'ok': False, 'error': str(e)}), 400
+    order = request.args.get('order', 'desc').lower()
+    if order not in ('asc', 'desc'):
+        return jsonify({'ok': False, 'error': 'order must be asc or desc'}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int) or 50, ITEMS_MAX_LIMIT))
+
+    # 游标需要 created_at/id，即使未请求也一并查询
+    columns = list(dict.fromkeys(fields + ['created_at', 'id'] + (['summary_zip'] if 'summary' in fields else [])))
+    q = db.session.query(*[getattr(NewsItem, c) for c in columns]).filter(NewsItem.created_at.isnot(None))
+    if section_ids:
+        q = q.filter(NewsItem.section_id.in_(section_ids))
+    if since:
+        q = q.filter(NewsItem.created_at >= since)
+    if until:
+        q = q.filter(NewsItem.created_at < until)
+    translated = request.args.get('translated', '').strip().lower()
+    if translated in ('1', 'true', 'yes'):
+        q = q.filter(NewsItem.title_translated.isnot(None), NewsItem.title_translated != '')
+    elif translated in ('0', 'false', 'no'):
+        q = q.filter((NewsItem.title_translated.is_(None)) | (NewsItem.title_translated == ''))
+    if after:
+        c_at, c_id = after
+        # 写成 created_at <= c AND (...) 形式，便于走 (created_at, id) 索引范围扫描
+        if order == 'desc':
+            q = q.filter(NewsItem.created_at <= c_at, (NewsItem.created_at < c_at) | (NewsItem.id < c_id))
+        else:
+            q = q.filter(NewsItem.created_at >= c_at, (NewsItem.created_at > c_at) | (NewsItem.id > c_id))
+    if order == 'desc':
+        q = q.order_by(NewsItem.created_at.desc(), NewsItem.id.desc())
+    else:
+        q = q.order_by(NewsItem.created_at.asc(), NewsItem.id.asc())
+
+    rows = q.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = []
+    for r in rows:
+        item = {f: _item_value(getattr(r, f)) for f in fields}
+        if 'summary' in item and r.summary_zip:
+            item['summary'] = sanitize.decompress(r.summary_zip)
+        items.append(item)
+    next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id) if has_more and rows else None
+    return jsonify({'ok': True, 'items': items, 'count': len(items), 'next_cursor': next_cursor})
+
+@app.route('/api/items/<int:item_id>/summary')
+def item_summary(item_id):
+    """单条摘要全文与译文全文（列表页只带预览，展开时再加载）"""
+    item = NewsItem.query.options(load_only(
+        NewsItem.id, NewsItem.summary, NewsItem.summary_zip, NewsItem.summary_translated,
+    )).get(item_id)
+    if not item:
+        return jsonify({'ok': False, 'error': 'item not found'}), 404
+    return jsonify({'ok': True, 'item_id': item.id, 'summary': item.full_summary,
+                    'summary_translated': item.summary_translated or None})
+
+# 采集运行记录
+@app.route('/api/fetch_runs')
+def list_fetch_runs():
+    """最近的采集运行记录，可按板块与状态（ok/error/timeout/skipped）过滤"""
+    q = FetchRun.query
+    section_id = request.args.get('section_id', type=int)
+    if section_id:
+        q = q.filter_by(section_id=section_id)
+    status = request.args.get('status', '').strip()
+    if status:
+        q = q.filter(FetchRun.status.in_(status.split(',')))
+    limit = min(request.args.get('limit', 50, type=int) or 50, 500)
+    runs = q.order_by(FetchRun.started_at.desc(), FetchRun.id.desc()).limit(limit).all()
+    return jsonify({'ok': True, 'runs': [{
+        'id': r.id,
+        'section_id': r.section_id,
+        'trigger': r.trigger,
+        'status': r.status,
+        'started_at': r.started_at.isoformat() if r.started_at else None,
+        'finished_at': r.finished_at.isoformat() if r.finished_at else None,
+        'duration_ms': r.duration_ms,
+        'fetched': r.fetched,
+        'added': r.added,
+        'error': r.error or None,
+    } for r in runs]})
+
+# 数据源健康状态
+@app.route('/api/health/sources')
+def source_health_status():
+    """所有数据源的熔断器状态"""
+    return jsonify({'ok': True, 'sources': health.registry.snapshot()})
+
+@app.route('/api/health/sources/reset', methods=['POST'])
+def reset_source_health():
+    """手动关闭熔断器（如确认源已恢复）"""
+    data = request.get_json(silent=True) or {}
+    key = (data.get('key') or '').strip()
+    if not key:
+        return jsonify({'ok': False, 'error': 'key is required'}), 400
+    health.registry.get(key).reset()
+    return jsonify({'ok': True, 'source': health.registry.get(key).to_dict()})
+
+# 数据保留、归档与压缩
+MAINTENANCE_REPORT_PATH = DevConfig.MAINTENANCE_REPORT_PATH
+RETENTION_BATCH_SIZE = 500
+
+maintenance_lock = threading.Lock()
+
+
+def _sqlite_db_path():
+    """返回主库文件路径（非 SQLite 时为 None）"""
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return url.database
+
+
+def _db_file_bytes() -> int:
+    path = _sqlite_db_path()
+    if not path:
+        return 0
+    total = 0
+    for p in (path, path + '-wal'):
+        if os.path.exists(p):
+            total += os.path.getsize(p)
+    return total
+
+
+def _retention_policy(section: Section):
+    try:
+        cfg = json.loads(section.config_json or '{}')
+    except Exception:
+        cfg = {}
+    days = int(cfg.get('retention_days', DevConfig.RETENTION_DAYS) or 0)
+    max_items = int(cfg.get('retention_max_items', DevConfig.RETENTION_MAX_ITEMS_PER_SECTION) or 0)
+    return days, max_items
+
+
+def _repoint_clusters(s, ids):
+    """删除 ids（id 列表或子查询）之前调用：簇代表被删除时，由剩余成员中最早入库的一条接替，避免 cluster_id 指向不存在的条目"""
+    roots = [r for (r,) in s.query(NewsItem.cluster_id).filter(
+        NewsItem.cluster_id.in_(ids), NewsItem.id.notin_(ids)).distinct()]
+    for root in roots:
+        survivors = s.query(NewsItem).filter(NewsItem.cluster_id == root, NewsItem.id.notin_(ids))
+        heir = survivors.with_entities(NewsItem.id).order_by(NewsItem.created_at, NewsItem.id).first()
+        survivors.update({'cluster_id': heir.id}, synchronize_session=False)
+
+
+def _archive_ids(section: Section, ids: list) -> int:
+    """分批把指定条目写入归档库并从热表删除"""
+    moved = 0
+    for i in range(0, len(ids), RETENTION_BATCH_SIZE):
+        chunk = ids[i:i + RETENTION_BATCH_SIZE]
+        rows = NewsItem.query.filter(NewsItem.id.in_(chunk)).all()
+        archive.write_items([{
+            'id': n.id,
+            'section_id': n.section_id,
+            'section_name': section.name,
+            'title': n.title,
+            'url': n.url,
+            'summary': n.full_summary,
+            'title_translated': n.title_translated,
+            'summary_translated': n.summary_translated,
+            'published_at': n.published_at,
+            'created_at': n.created_at,
+            'translated_at': n.translated_at,
+        } for n in rows])
+        # 归档写入成功后再删除热表数据
+        writer.write(lambda s: (
+            _repoint_clusters(s, chunk),
+            s.query(ItemBand).filter(ItemBand.item_id.in_(chunk)).delete(synchronize_session=False),
+            s.query(NewsItem).filter(NewsItem.id.in_(chunk)).delete(synchronize_session=False),
+        ))
+        invalidate_section_fragments(section.id)
+        mark_section_feeds(section.id)
+        moved += len(rows)
+    return moved
+
+
+def compact_database() -> dict:
+    """ANALYZE + VACUUM（VACUUM 仅 SQLite，且必须在事务外执行）"""
+    vacuum = bool(_sqlite_db_path())
+
+    def _compact(engine):
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.exec_driver_sql('ANALYZE')
+            if vacuum:
+                conn.exec_driver_sql('VACUUM')
+                # WAL 模式下截断 -wal 文件，回收的空间才会体现在磁盘上
+                conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        return {'analyze': True, 'vacuum': vacuum}
+
+    # 放到写线程执行，避免与批量写入争用锁
+    return writer.call(_compact)
+
+
+def load_maintenance_report():
+    try:
+        with open(MAINTENANCE_REPORT_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def run_retention(compact: bool = True):
+    """归档过期条目并压缩数据库，返回报告"""
+    if not maintenance_lock.acquire(blocking=False):
+        print("[Retention] 维护任务已在运行中，跳过本次执行")
+        return None
+    try:
+        with app.app_context():
+            started = datetime.now(UTC)
+            bytes_before = _db_file_bytes()
+            now = datetime.utcnow()
+            sections_report = []
+            for section in Section.query.order_by(Section.id).all():
+                days, max_items = _retention_policy(section)
+                expired = set()
+                if days > 0:
+                    cutoff = now - timedelta(days=days)
+                    expired.update(i for (i,) in db.session.query(NewsItem.id)
+                                   .filter(NewsItem.section_id == section.id, NewsItem.created_at < cutoff))
+                if max_items > 0:
+                    # 超出上限的最旧条目同样归档，保证热表有界
+                    expired.update(i for (i,) in db.session.query(NewsItem.id)
+                                   .filter(NewsItem.section_id == section.id)
+                                   .order_by(NewsItem.created_at.desc(), NewsItem.id.desc())
+                                   .offset(max_items))
+                if not expired:
+                    continue
+                moved = _archive_ids(section, sorted(expired))
+                sections_report.append({'section_id': section.id, 'name': section.name, 'archived': moved})
+                print(f"[Retention] section={section.name} archived={moved}")
+            # 采集运行记录只保留最近 RETENTION_DAYS 天（至少 7 天）
+            runs_cutoff = now - timedelta(days=max(7, DevConfig.RETENTION_DAYS or 30))
+            pruned_runs = writer.write(lambda s: s.query(FetchRun).filter(FetchRun.started_at < runs_cutoff).delete(synchronize_session=False))
+            # SSE 事件只用于断线续传，保留 EVENTS_RETENTION_HOURS 小时
+            events_cutoff = now - timedelta(hours=DevConfig.EVENTS_RETENTION_HOURS)
+            pruned_events = writer.write(lambda s: s.query(ItemEvent).filter(ItemEvent.created_at < events_cutoff).delete(synchronize_session=False))
+            # 近重复识别只在 DEDUP_WINDOW_HOURS 窗口内查找，更早的分桶键不再需要
+            bands_cutoff = now - timedelta(hours=DevConfig.DEDUP_WINDOW_HOURS)
+            pruned_bands = writer.write(lambda s: s.query(ItemBand).filter(ItemBand.created_at < bands_cutoff).delete(synchronize_session=False))
+            compacted = compact_database() if compact else {'analyze': False, 'vacuum': False}
+            bytes_after = _db_file_bytes()
+            report = {
+                'started_at': started.isoformat(),
+                'finished_at': datetime.now(UTC).isoformat(),
+                'archived_total': sum(s['archived'] for s in sections_report),
+                'sections': sections_report,
+                'pruned_fetch_runs': pruned_runs,
+                'pruned_item_events': pruned_events,
+                'pruned_item_bands': pruned_bands,
+                'db_bytes_before': bytes_before,
+                'db_bytes_after': bytes_after,
+                'reclaimed_bytes': max(0, bytes_before - bytes_after),
+                'hot_items': NewsItem.query.count(),
+                'archives': [{k: a[k] for k in ('month', 'bytes', 'items')} for a in archive.list_archives()],
+                **compacted,
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(MAINTENANCE_REPORT_PATH)), exist_ok=True)
+            with open(MAINTENANCE_REPORT_PATH, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"[Retention] 完成：归档 {report['archived_total']} 条，回收 {report['reclaimed_bytes']} 字节")
+            return report
+    except Exception as e:
+        print(f"[Retention] 维护任务出错: {e}")
+        return None
+    finally:
+        maintenance_lock.release()
+
+
+@app.route('/api/maintenance/report')
+def maintenance_report():
+    """最近一次归档/压缩报告"""
+    report = load_maintenance_report()
+    return jsonify({'ok': True, 'report': report, 'archives': archive.list_archives()})
+
+
+@app.route('/api/maintenance/run', methods=['POST'])
+def run_maintenance():
+    """手动执行一次归档与压缩"""
+    data = request.get_json(silent=True) or {}
+    report = run_retention(compact=bool(data.get('compact', True)))
+    if report is None:
+        return jsonify({'ok': False, 'error': '维护任务正在运行或执行失败'}), 409
+    return jsonify({'ok': True, 'report': report})
+
+
+@app.route('/api/archive/search')
+def search_archive():
+    """按需检索冷数据归档"""
+    keyword = request.args.get('q', '').strip()
+    if not keyword:
+        return jsonify({'ok': False, 'error': 'q is required'}), 400
+    section_id = request.args.get('section_id', type=int)
+    months = [m for m in request.args.get('months', '').split(',') if m]
+    limit = min(request.args.get('limit', 50, type=int) or 50, 200)
+    return jsonify({'ok': True, 'items': archive.search(keyword, section_id=section_id, months=months or None, limit=limit)})
+
+# 每日摘要快照（digest.py）：历史日期只读 daily_digests，不再扫描 news_items
+DIGEST_COLUMNS = (NewsItem.id, NewsItem.section_id, NewsItem.title, NewsItem.url, NewsItem.published_at,
+                  NewsItem.created_at, NewsItem.title_translated, NewsItem.cluster_id,
+                  NewsItem.summary_preview, NewsItem.summary_translated_preview)
+
+
+def build_daily_digest(day, store: bool = True) -> dict:
+    """汇总某一天各板块的重点条目；store=True 时写入 daily_digests 并导出静态文件"""
+    tz_name = DevConfig.DIGEST_TIMEZONE
+    start, end = digest.day_bounds(day, tz_name)
     with app.app_context():
-        for s in Section.query.all():
-            schedule_section(s)
+        in_day = (NewsItem.created_at >= start, NewsItem.created_at < end)
+        # 同簇条目数 = 当天有多少个板块/来源报道了同一新闻
+        cluster_sizes = dict(db.session.query(NewsItem.cluster_id, db.func.count(NewsItem.id))
+                             .filter(*in_day, NewsItem.cluster_id.isnot(None))
+                             .group_by(NewsItem.cluster_id))
+        sections = []
+        for section in Section.query.order_by(Section.name).all():
+            rows = db.session.query(*DIGEST_COLUMNS).filter(NewsItem.section_id == section.id, *in_day).all()
+            if not rows:
+                continue
+            sections.append({
+                'id': section.id,
+                'name': section.name,
+                'description': section.description or '',
+                'total': len(rows),
+                'items': digest.rank_items(rows, cluster_sizes, DevConfig.DIGEST_ITEMS_PER_SECTION),
+            })
+        payload = digest.build_payload(day, tz_name, sections)
+        if store:
+            blob = digest.encode(payload)
+            writer.write(lambda s: s.merge(DailyDigest(
+                day=payload['date'], generated_at=datetime.utcnow(), item_count=payload['item_count'],
+                section_count=len(sections), payload=blob)))
+            try:
+                digest.export(DevConfig.DIGESTS_DIR, payload, render_template('digest_static.html', digest=payload))
+            except Exception as e:
+                print(f"[Digest] {payload['date']}: export failed: {e}")
+            print(f"[Digest] {payload['date']}: {payload['item_count']} items in {len(sections)} sections")
+    return payload
+
+
+def run_daily_digest():
+    """定时任务：生成昨天的快照，并补齐最近 DIGEST_BACKFILL_DAYS 天内缺失的日期"""
+    try:
+        yesterday = digest.today(DevConfig.DIGEST_TIMEZONE) - timedelta(days=1)
+        days = [yesterday - timedelta(days=i) for i in range(max(1, DevConfig.DIGEST_BACKFILL_DAYS))]
+        with app.app_context():
+            existing = {d for (d,) in db.session.query(DailyDigest.day)
+                        .filter(DailyDigest.day >= days[-1].isoformat())}
+        for day in reversed(days):
+            if day == yesterday or day.isoformat() not in existing:
+                build_daily_digest(day)
+    except Exception as e:
+        print(f"[Digest] 生成每日摘要出错: {e}")
+
+
+def load_digest(day):
+    """返回 (payload, 是否为当天未完成的预览)；只读，历史日期缺快照或未来日期返回 None
+
+    快照只由每日任务和 POST /api/digests/<day> 生成：GET 时现场补建会让任意日期（包括条目已归档的
+    日期）写入一份永久的空快照。"""
+    today = digest.today(DevConfig.DIGEST_TIMEZONE)
+    if day > today:
+        return None, False
+    if day == today:
+        return build_daily_digest(day, store=False), True
+    row = db.session.get(DailyDigest, day.isoformat())
+    if row is not None:
+        return digest.decode(row.payload), False
+    return None, False
+
+
+def _digest_list(limit: int = 366) -> list:
+    rows = (db.session.query(DailyDigest.day, DailyDigest.item_count, DailyDigest.section_count, DailyDigest.generated_at)
+            .order_by(DailyDigest.day.desc()).limit(limit).all())
+    return [{'date': r.day, 'item_count': r.item_count, 'section_count': r.section_count,
+             'generated_at': r.generated_at.isoformat() if r.generated_at else None} for r in rows]
+
+
+@app.route('/digests')
+def digest_archive():
+    """每日摘要归档浏览"""
+    return render_template('digests.html', digests=_digest_list(), today=digest.today(DevConfig.DIGEST_TIMEZONE))
+
+
+@app.route('/digests/<day>')
+def digest_page(day):
+    parsed = digest.parse_day(day)
+    payload, partial = load_digest(parsed) if parsed else (None, False)
+    if payload is None:
+        flash(f'没有 {day} 的每日摘要', 'warning')
+        return redirect(url_for('digest_archive'))
+    return render_template('digest.html', digest=payload, partial=partial)
+
+
+@app.route('/api/digests')
+def list_digests():
+    limit = max(1, min(request.args.get('limit', 30, type=int) or 30, 366))
+    return jsonify({'ok': True, 'digests': _digest_list(limit)})
+
+
+@app.route('/api/digests/<day>', methods=['GET', 'POST'])
+def get_digest_api(day):
+    """GET 读取快照（当天为实时预览，不保存）；POST 重新生成并保存历史日期的快照"""
+    parsed = digest.parse_day(day)
+    if parsed is None:
+        return jsonify({'ok': False, 'error': 'date must be YYYY-MM-DD'}), 400
+    if request.method == 'POST':
+        if parsed >= digest.today(DevConfig.DIGEST_TIMEZONE):
+            return jsonify({'ok': False, 'error': 'only past days can be materialized'}), 400
+        return jsonify({'ok': True, 'partial': False, 'digest': build_daily_digest(parsed)})
+    payload, partial = load_digest(parsed)
+    if payload is None:
+        return jsonify({'ok': False, 'error': f'no digest for {day}; POST to build one'}), 404
+    resp = jsonify({'ok': True, 'partial': partial, 'digest': payload})
+    if not partial:
+        # 历史快照只在手动重建时变化
+        resp.set_etag(hashlib.md5(resp.get_data()).hexdigest())
+        resp.headers['Cache-Control'] = 'public, max-age=3600'
+        return resp.make_conditional(request)
+    return resp
+
+
+def _ensure_interval_job(job_id: str, func: str, interval: timedelta):
+    """间隔未变的持久化任务保留原有的下次运行时间；错过的触发合并为一次并且不设补跑期限"""
+    job = scheduler.get_job(job_id)
+    if job and isinstance(job.trigger, IntervalTrigger) and job.trigger.interval == interval:
+        return job
+    return scheduler.add_job(
+        func=func,
+        trigger=IntervalTrigger(seconds=int(interval.total_seconds())),
+        id=job_id,
+        replace_existing=True,
+        coalesce=True,
+        misfire_grace_time=None,
+    )
+
+
+def _ensure_cron_job(job_id: str, func: str, trigger: CronTrigger):
+    """与 _ensure_interval_job 相同，时间点与时区都未变时保留持久化的任务"""
+    job = scheduler.get_job(job_id)
+    if job and str(job.trigger) == str(trigger) and str(job.trigger.timezone) == str(trigger.timezone):
+        return job
+    return scheduler.add_job(func=func, trigger=trigger, id=job_id, replace_existing=True,
+                             coalesce=True, misfire_grace_time=None)
+
+
+def schedule_all_jobs():
+    """排程全部定时任务（板块采集、后台翻译、每日摘要、归档维护），由持有调度租约的进程调用
+
+    板块按 last_run_at 续排；停机期间已过期的板块只补跑一次，
+    按过期先后均匀分散在 SCHEDULER_CATCHUP_WINDOW_SECONDS 内，避免重启后集中采集。
+    """
+    with app.app_context():
+        sections = Section.query.all()
+        overdue = []
+        for s in sections:
+            if s.enabled and s.update_interval_minutes > 0 and s.last_run_at is not None:
+                interval = poller.current_interval(s.id, s.update_interval_minutes)
+                if poller.next_due(s.last_run_at, interval) is None:
+                    overdue.append(s)
+        overdue.sort(key=lambda s: s.last_run_at)
+        catchup = polling.spread_catchup([s.id for s in overdue], DevConfig.SCHEDULER_CATCHUP_WINDOW_SECONDS)
+        for s in sections:
+            schedule_section(s, next_run_time=catchup.get(s.id))
+        if overdue:
+            print(f"[Schedule] catch-up: {len(overdue)} overdue sections spread over "
+                  f"{DevConfig.SCHEDULER_CATCHUP_WINDOW_SECONDS:g}s")
     
     # 添加后台翻译调度器（每10分钟运行一次）
     translation_interval = int(os.environ.get('AUTO_TRANSLATE_INTERVAL_MINUTES', '10'))
     if translation_interval > 0:
-        scheduler.add_job(
-            func=run_background_translation,
-            trigger=IntervalTrigger(minutes=translation_interval),
-            id='background_translation',
-            replace_existing=True,
-        )
-    
-    scheduler.start()
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+        _ensure_interval_job('background_translation', 'app:run_background_translation',
+                             timedelta(minutes=translation_interval))
+    else:
+        _remove_job('background_translation')
+
+    # 每日摘要快照（在归档之前固化前一天的条目）
+    if DevConfig.DIGEST_ENABLED:
+        _ensure_cron_job('daily_digest', 'app:run_daily_digest',
+                         CronTrigger(hour=DevConfig.DIGEST_HOUR, minute=DevConfig.DIGEST_MINUTE,
+                                     timezone=DevConfig.DIGEST_TIMEZONE))
+    else:
+        _remove_job('daily_digest')
+
+    # 定期归档过期条目并执行 ANALYZE/VACUUM
+    if DevConfig.MAINTENANCE_INTERVAL_HOURS > 0:
+        _ensure_interval_job('maintenance', 'app:run_retention', timedelta(hours=DevConfig.MAINTENANCE_INTERVAL_HOURS))
+    else:
+        _remove_job('maintenance')
+
+
+def _remove_job(job_id: str):
+    if scheduler.get_job(job_id):
+        scheduler.remove_job(job_id)
+
+# Bootstrap
+if __name__ == '__main__':
+    ensure_db()
+    # 定时任务只由持有调度租约的进程执行：SCHEDULER_MODE=worker 时交给独立的 python worker.py，
+    # embedded 时在本进程内参与选举（debug 重载器的父进程不参与）
+    if DevConfig.SCHEDULER_MODE == 'embedded' and (not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+        import worker
+        worker.start_background(sys.modules[__name__])
+    app.run(host='0.0.0.0', port=5000, debug=True)
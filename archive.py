@@ -0,0 +1,170 @@
+"""
+冷数据归档：按月将 news_items 的过期条目写入独立的 SQLite 归档库
+
+每个月一个文件（news_YYYY_MM.db），标题/链接保持明文以便检索，
+摘要与译文以 zlib 压缩后的 JSON 存储，按需解压。
+"""
+import glob
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime
+
+from config import DevConfig
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_items (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER NOT NULL,
+    section_name TEXT DEFAULT '',
+    title TEXT NOT NULL,
+    url TEXT DEFAULT '',
+    published_at TEXT,
+    created_at TEXT,
+    translated_at TEXT,
+    payload BLOB
+);
+CREATE INDEX IF NOT EXISTS ix_archived_section_created ON archived_items (section_id, created_at);
+"""
+
+
+def archive_dir() -> str:
+    path = DevConfig.ARCHIVE_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def month_key(dt) -> str:
+    """返回条目所属月份，如 2025_08"""
+    if isinstance(dt, str):
+        try:
+            dt = datetime.fromisoformat(dt)
+        except Exception:
+            dt = None
+    if not dt:
+        dt = datetime.utcnow()
+    return dt.strftime('%Y_%m')
+
+
+def archive_path(month: str) -> str:
+    return os.path.join(archive_dir(), f"news_{month}.db")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.executescript(SCHEMA)
+    return con
+
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+def _pack(row: dict) -> bytes:
+    body = {
+        'summary': row.get('summary') or '',
+        'title_translated': row.get('title_translated') or '',
+        'summary_translated': row.get('summary_translated') or '',
+    }
+    return zlib.compress(json.dumps(body, ensure_ascii=False).encode('utf-8'), 6)
+
+
+def _unpack(blob) -> dict:
+    if not blob:
+        return {}
+    try:
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+    except Exception:
+        return {}
+
+
+def write_items(rows: list) -> dict:
+    """将一批条目写入对应月份的归档库，返回 {month: 条数}"""
+    by_month = {}
+    for r in rows:
+        by_month.setdefault(month_key(r.get('created_at')), []).append(r)
+    written = {}
+    for month, group in by_month.items():
+        con = _connect(archive_path(month))
+        try:
+            con.executemany(
+                "INSERT OR REPLACE INTO archived_items "
+                "(id, section_id, section_name, title, url, published_at, created_at, translated_at, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(
+                    r['id'], r['section_id'], r.get('section_name') or '',
+                    r.get('title') or '', r.get('url') or '',
+                    _iso(r.get('published_at')), _iso(r.get('created_at')), _iso(r.get('translated_at')),
+                    _pack(r),
+                ) for r in group]
+            )
+            con.commit()
+        finally:
+            con.close()
+        written[month] = len(group)
+    return written
+
+
+def list_archives() -> list:
+    """列出所有归档库及其大小、条目数"""
+    out = []
+    for p in sorted(glob.glob(os.path.join(archive_dir(), 'news_*.db'))):
+        month = os.path.basename(p)[len('news_'):-len('.db')]
+        count = 0
+        try:
+            con = sqlite3.connect(p)
+            count = con.execute("SELECT COUNT(*) FROM archived_items").fetchone()[0]
+            con.close()
+        except Exception:
+            pass
+        out.append({'month': month, 'path': p, 'bytes': os.path.getsize(p), 'items': count})
+    return out
+
+
+def search(keyword: str, section_id: int | None = None, months: list | None = None, limit: int = 50) -> list:
+    """按需检索归档：标题/链接走 SQL，摘要与译文解压后匹配"""
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return []
+    low = keyword.lower()
+    targets = [a for a in list_archives() if not months or a['month'] in months]
+    # 新的月份优先
+    targets.sort(key=lambda a: a['month'], reverse=True)
+    results = []
+    for a in targets:
+        con = sqlite3.connect(a['path'])
+        try:
+            sql = "SELECT id, section_id, section_name, title, url, published_at, created_at, translated_at, payload FROM archived_items"
+            params = []
+            if section_id:
+                sql += " WHERE section_id = ?"
+                params.append(section_id)
+            sql += " ORDER BY created_at DESC"
+            for row in con.execute(sql, params):
+                title, url = row[3] or '', row[4] or ''
+                body = None
+                if low not in title.lower() and low not in url.lower():
+                    body = _unpack(row[8])
+                    hay = ' '.join([body.get('summary', ''), body.get('title_translated', ''), body.get('summary_translated', '')])
+                    if low not in hay.lower():
+                        continue
+                body = body if body is not None else _unpack(row[8])
+                results.append({
+                    'id': row[0],
+                    'section_id': row[1],
+                    'section': row[2],
+                    'title': title,
+                    'url': url,
+                    'summary': body.get('summary', ''),
+                    'title_translated': body.get('title_translated', ''),
+                    'summary_translated': body.get('summary_translated', ''),
+                    'published_at': row[5],
+                    'created_at': row[6],
+                    'archive': a['month'],
+                })
+                if len(results) >= limit:
+                    return results
+        finally:
+            con.close()
+    return results
@@ -0,0 +1,5 @@
+"""
+离线基准测试：本地 RSS/Atom 源、模拟 MyMemory 接口与模拟 gemini 命令，全程不访问外网
+
+python -m benchmarks.run --sizes 10k,100k,1m
+"""
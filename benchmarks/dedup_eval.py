@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+近重复识别评测：URL 归一化用例、标题聚类的精确率/召回率，以及签名与 LSH 查询吞吐
+
+用法：
+  python -m benchmarks.dedup_eval
+  python -m benchmarks.dedup_eval --threshold 0.6 --stories 400 --n 50000 --out dedup.json
+
+语料由固定种子生成：每条新闻有若干“转载”变体（来源后缀、大小写与标点、跟踪参数 URL、
+增删一两个词），并混入只差主语或数字的“困难负例”。条目按顺序流经 LSHIndex，
+与 app.ingest_items 一样只和已入库条目比较：
+  精确率 = 判为重复且确属同一新闻的条目 / 判为重复的条目
+  召回率 = 判为重复且确属同一新闻的条目 / 之前已出现过同一新闻的条目
+精确率或召回率低于 --min-precision / --min-recall，或 URL 用例失败时退出码为 1。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import dedup  # noqa: E402
+from benchmarks.run import git_rev  # noqa: E402
+
+# (原始 URL, 应归一为与之相同的另一写法)；第三项为 False 表示两者应保持不同
+URL_CASES = [
+    ('https://www.example.com/news/a?utm_source=rss&utm_medium=feed', 'https://example.com/news/a', True),
+    ('http://example.com/news/a/', 'https://example.com/news/a', True),
+    ('https://example.com/news/a#comments', 'https://example.com/news/a', True),
+    ('https://EXAMPLE.com/news/a?b=2&a=1', 'https://example.com/news/a?a=1&b=2', True),
+    ('https://example.com/news/a?fbclid=xyz&id=7', 'https://example.com/news/a?id=7', True),
+    ('https://m.example.com/news/a', 'https://example.com/news/a', True),
+    ('https://example.com:443/news/a', 'https://example.com/news/a', True),
+    ('https://example.com/news/index.html', 'https://example.com/news', True),
+    ('http://arxiv.org/abs/2401.01234v2', 'https://arxiv.org/abs/2401.01234', True),
+    ('https://arxiv.org/pdf/2401.01234v1.pdf', 'https://arxiv.org/abs/2401.01234', True),
+    ('https://export.arxiv.org/abs/2401.01234', 'https://arxiv.org/abs/2401.01234', True),
+    ('https://example.com/news/a?id=7', 'https://example.com/news/a?id=8', False),
+    ('https://example.com/news/a', 'https://example.com/news/b', False),
+    ('https://arxiv.org/abs/2401.01234', 'https://arxiv.org/abs/2401.01235', False),
+    ('https://example.com/news/a', 'https://example.org/news/a', False),
+]
+
+COMPANIES = ['OpenAI', 'Google', 'Microsoft', 'Nvidia', 'Apple', 'Meta', 'Amazon', 'Anthropic', 'Intel', 'AMD',
+             'Samsung', 'TSMC', 'Tesla', 'Baidu', 'Alibaba', 'IBM', 'Oracle', 'Qualcomm', 'Arm', 'Mistral']
+TEMPLATES = [
+    '{c} unveils new {p} model with longer context window',
+    '{c} reports record quarterly revenue of ${n} billion',
+    '{c} to invest ${n} billion in new data centers across Europe',
+    'Regulators open antitrust probe into {c} over {p} deals',
+    '{c} cuts {n} jobs as it restructures its {p} division',
+    '{c} releases open-source {p} toolkit for developers',
+    'Researchers find security flaw affecting {c} {p} chips',
+    '{c} partners with universities to train {p} researchers',
+    '{c} shares jump {n}% after strong {p} demand',
+    'Court rules against {c} in long-running {p} patent dispute',
+]
+PRODUCTS = ['AI', 'cloud', 'chip', 'robotics', 'search', 'smartphone', 'quantum', 'autonomous driving']
+SOURCES = ['Reuters', 'The Verge', 'TechCrunch', 'Bloomberg', 'Ars Technica', 'BBC News']
+FILLERS = ['report says', 'sources say', 'update', 'exclusive']
+
+
+def make_story(rnd):
+    tpl = rnd.choice(TEMPLATES)
+    fields = {'c': rnd.choice(COMPANIES), 'p': rnd.choice(PRODUCTS), 'n': rnd.randint(2, 90)}
+    return tpl, fields
+
+
+def render(tpl, fields) -> str:
+    return tpl.format(**fields)
+
+
+def variant(rnd, title: str) -> str:
+    """同一新闻的转载写法"""
+    out = title
+    kind = rnd.random()
+    if kind < 0.3:
+        out = f'{out} - {rnd.choice(SOURCES)}'
+    elif kind < 0.45:
+        out = out.upper() if rnd.random() < 0.3 else out.title()
+    elif kind < 0.6:
+        out = out.replace(' ', '  ', 1) + rnd.choice(['.', '!', ' |', ''])
+    elif kind < 0.75:
+        out = f'{out}, {rnd.choice(FILLERS)}'
+    elif kind < 0.9:
+        words = out.split()
+        drop = rnd.randrange(1, len(words))
+        if not any(ch.isdigit() for ch in words[drop]):
+            del words[drop]
+        out = ' '.join(words)
+    else:
+        out = f'{rnd.choice(["Breaking", "Update", "Exclusive"])}: {out}'
+    return out
+
+
+def build_corpus(stories: int, seed: int):
+    """返回 [(title, url, story_id)]，按“发布时间”打乱"""
+    rnd = random.Random(seed)
+    corpus = []
+    seen = set()
+    sid = 0
+    while sid < stories:
+        tpl, fields = make_story(rnd)
+        base = render(tpl, fields)
+        if base in seen:
+            continue
+        seen.add(base)
+        host = rnd.choice(['news.example.com', 'tech.example.org', 'daily.example.net'])
+        url = f'https://{host}/{sid}'
+        corpus.append((base, url, sid))
+        for _ in range(rnd.randint(0, 3)):
+            # 转载多为不同站点的 URL，部分带跟踪参数的同一 URL
+            if rnd.random() < 0.3:
+                vurl = f'{url}?utm_source=rss&utm_campaign={rnd.randint(1, 99)}'
+            else:
+                vurl = f'https://mirror{rnd.randint(1, 9)}.example.com/story/{sid}-{rnd.randint(1, 999)}'
+            corpus.append((variant(rnd, base), vurl, sid))
+        # 困难负例：同一模板，只换公司或数字
+        if rnd.random() < 0.5:
+            other = dict(fields)
+            if rnd.random() < 0.5:
+                other['c'] = rnd.choice([c for c in COMPANIES if c != fields['c']])
+            else:
+                other['n'] = fields['n'] + rnd.randint(1, 9)
+            neg = render(tpl, other)
+            if neg not in seen:
+                seen.add(neg)
+                sid += 1
+                corpus.append((neg, f'https://{host}/{sid}', sid))
+        sid += 1
+    rnd.shuffle(corpus)
+    return corpus
+
+
+def check_urls() -> list:
+    failures = []
+    for a, b, same in URL_CASES:
+        ca, cb = dedup.canonical_url(a), dedup.canonical_url(b)
+        if (ca == cb) != same:
+            failures.append(f"{a} -> {ca} / {b} -> {cb} (expected {'same' if same else 'different'})")
+    return failures
+
+
+def evaluate(corpus, threshold: float) -> dict:
+    """按顺序入库，统计判为重复的条目的精确率与召回率"""
+    index = dedup.LSHIndex()
+    by_url = {}
+    truth = {}
+    seen_story = set()
+    tp = fp = fn = 0
+    short = 0
+    for i, (title, url, story) in enumerate(corpus):
+        canon = dedup.canonical_url(url)
+        sig = dedup.title_signature(title)
+        match = by_url.get(canon)
+        if match is None and sig:
+            match = index.query(title, sig, threshold)
+        if not sig:
+            short += 1
+        had_earlier = story in seen_story
+        if match is not None:
+            if truth[match] == story:
+                tp += 1
+            else:
+                fp += 1
+        elif had_earlier:
+            fn += 1
+        truth[i] = story
+        seen_story.add(story)
+        by_url.setdefault(canon, i)
+        index.add(i, title, sig)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    return {
+        'items': len(corpus), 'stories': len(seen_story), 'duplicates': tp + fn,
+        'true_positives': tp, 'false_positives': fp, 'false_negatives': fn, 'unsigned_titles': short,
+        'precision': round(precision, 4), 'recall': round(recall, 4),
+        'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+    }
+
+
+def throughput(n: int, threshold: float, seed: int) -> dict:
+    # 互不相同的新闻标题：从约 3000 个词中随机取 6~12 个
+    rnd = random.Random(seed + 1)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocab = [''.join(rnd.choice(letters) for _ in range(rnd.randint(3, 9))) for _ in range(3000)]
+    titles = [' '.join(rnd.choice(vocab) for _ in range(rnd.randint(6, 12))).capitalize() for _ in range(n)]
+    t = time.perf_counter()
+    sigs = [dedup.title_signature(x) for x in titles]
+    sig_seconds = time.perf_counter() - t
+    bands = [dedup.band_keys(s, x) for s, x in zip(sigs, titles)]
+    index = dedup.LSHIndex()
+    t = time.perf_counter()
+    for k, (title, sig, b) in enumerate(zip(titles, sigs, bands)):
+        index.query(title, sig, threshold, b)
+        index.add(k, title, sig, b)
+    lsh_seconds = time.perf_counter() - t
+    t = time.perf_counter()
+    for x in titles:
+        dedup.canonical_url(f'https://www.example.com/a/{x[:8]}?utm_source=x&id=1')
+    url_seconds = time.perf_counter() - t
+    return {
+        'titles': n,
+        'signatures_per_s': round(n / sig_seconds, 1),
+        'lsh_query_insert_per_s': round(n / lsh_seconds, 1),
+        'canonical_urls_per_s': round(n / url_seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DailyNews near-duplicate detection evaluation')
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('DEDUP_THRESHOLD', '0.7')))
+    parser.add_argument('--stories', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--n', type=int, default=20000, help='吞吐测试的标题数量，0 跳过')
+    parser.add_argument('--min-precision', type=float, default=0.95)
+    parser.add_argument('--min-recall', type=float, default=0.85)
+    parser.add_argument('--out', help='结果 JSON 路径')
+    args = parser.parse_args()
+
+    failures = [f'url: {f}' for f in check_urls()]
+    print(f"URL 归一化用例：{len(URL_CASES) - len(failures)}/{len(URL_CASES)} 通过")
+    for f in failures:
+        print(f"  {f}")
+
+    quality = evaluate(build_corpus(args.stories, args.seed), args.threshold)
+    print(f"聚类（阈值 {args.threshold}）：{quality['items']} 条 / {quality['stories']} 条新闻 / "
+          f"{quality['duplicates']} 条重复，precision={quality['precision']:.3f} recall={quality['recall']:.3f} "
+          f"f1={quality['f1']:.3f} (fp={quality['false_positives']}, fn={quality['false_negatives']})")
+    if quality['precision'] < args.min_precision:
+        failures.append(f"precision {quality['precision']} < {args.min_precision}")
+    if quality['recall'] < args.min_recall:
+        failures.append(f"recall {quality['recall']} < {args.min_recall}")
+
+    speed = throughput(args.n, args.threshold, args.seed) if args.n else {}
+    if speed:
+        print(f"吞吐：签名 {speed['signatures_per_s']:.0f}/s，LSH 查询+插入 {speed['lsh_query_insert_per_s']:.0f}/s，"
+              f"URL 归一化 {speed['canonical_urls_per_s']:.0f}/s（{speed['titles']} 条）")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'schema': 1,
+                'created_at': datetime.now(UTC).isoformat(),
+                'git_rev': git_rev(),
+                'params': vars(args),
+                'quality': quality,
+                'throughput': speed,
+                'failures': failures,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.out}")
+
+    if failures:
+        print("未通过：")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+模拟 gemini CLI：不访问网络，按提示词输出结果
+
+- 采集提示词（要求输出 JSON 数组）：输出 N 条新闻的 JSON，N 取自提示词中的"返回N条"
+- 合并采集提示词（含主题列表）：输出 {"sections": {key: [...]}}；FAKE_GEMINI_BATCH=garbage 时输出无法解析的文本，
+  partial 时漏掉最后一个主题，用于验证逐个板块回退
+- 其他提示词（翻译）：输出 "[译] " + 提示词最后一段
+支持 --prompt <text>、位置参数或 stdin 三种传参方式；FAKE_GEMINI_LATENCY_MS 控制延迟，
+FAKE_GEMINI_CALL_LOG 指定文件时每次调用追加一行（batch / fetch / translate）。
+"""
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, UTC
+
+
+def read_prompt(argv):
+    if '--prompt' in argv:
+        i = argv.index('--prompt')
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    # 跳过 -p/-m/--proxy 等选项及其取值，剩下的位置参数即提示词
+    positional = []
+    skip = False
+    for a in argv:
+        if skip:
+            skip = False
+            continue
+        if a.startswith('-'):
+            skip = a in ('-p', '--provider', '-m', '--model', '--proxy')
+            continue
+        positional.append(a)
+    if positional:
+        return positional[-1]
+    return sys.stdin.read() if not sys.stdin.isatty() else ''
+
+
+BATCH_MARKER = '主题列表（JSON）：'  # 与 collectors/gemini_collector.py 一致
+
+
+def fake_items(topic: str, n: int) -> list:
+    stamp = int(time.time() * 1000)
+    now = datetime.now(UTC)
+    return [{
+        'title': f'{topic} update {stamp}-{i}',
+        'url': f'https://gemini.example.com/{stamp}/{topic}/{i}',
+        'summary': f'Synthetic summary {i} for {topic}.',
+        'published_at': (now - timedelta(hours=i)).isoformat().replace('+00:00', 'Z'),
+    } for i in range(n)]
+
+
+def log_call(kind: str):
+    path = os.environ.get('FAKE_GEMINI_CALL_LOG')
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(kind + '\n')
+
+
+def main():
+    delay = float(os.environ.get('FAKE_GEMINI_LATENCY_MS', '0')) / 1000.0
+    if delay:
+        time.sleep(delay)
+    prompt = read_prompt(sys.argv[1:])
+    if BATCH_MARKER in prompt:
+        log_call('batch')
+        mode = os.environ.get('FAKE_GEMINI_BATCH', 'ok')
+        if mode == 'garbage':
+            print('抱歉，我无法按要求的格式整理这些主题。')
+            return 0
+        topics = json.loads(prompt.split(BATCH_MARKER, 1)[1])
+        if mode == 'partial':
+            topics = topics[:-1]
+        sections = {t['key']: fake_items(t['key'], int(t.get('max_items', 10))) for t in topics}
+        print(json.dumps({'sections': sections}, ensure_ascii=False))
+        return 0
+    if 'JSON' in prompt:
+        log_call('fetch')
+        m = re.search(r'返回(\d+)条', prompt)
+        n = int(m.group(1)) if m else 10
+        topic = (re.search(r'与(.+?)相关', prompt) or [None, 'news'])[1]
+        print(json.dumps(fake_items(topic, n), ensure_ascii=False))
+        return 0
+    log_call('translate')
+    text = prompt.split('\n\n')[-1]
+    print(f'[译] {text}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+基准测试用的本地替身服务
+
+- FeedServer：生成 RSS 2.0 / Atom 源，/rss/<feed>?n=50 与 /atom/<feed>?n=50，
+  每次请求有 fresh 比例的条目是新的，用于覆盖去重与写入路径
+- FakeMyMemory：兼容 MyMemory /get 接口，可配置延迟与 429 比例
+- make_gemini_cmd：生成调用 fake_gemini.py 的可执行包装脚本
+"""
+import json
+import os
+import random
+import stat
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+FAKE_GEMINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_gemini.py')
+
+
+class _Server:
+    """在后台线程运行的 ThreadingHTTPServer，端口由系统分配"""
+
+    handler = BaseHTTPRequestHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        outer = self
+
+        class Handler(self.handler):
+            server_ref = outer
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _send(handler, status: int, body: str, content_type: str):
+    data = body.encode('utf-8')
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server_ref
+        u = urlparse(self.path)
+        parts = [p for p in u.path.split('/') if p]
+        if len(parts) != 2 or parts[0] not in ('rss', 'atom'):
+            return _send(self, 404, 'not found', 'text/plain')
+        qs = parse_qs(u.query)
+        n = int(qs.get('n', [srv.items_per_feed])[0])
+        seq = srv.count()
+        body = srv.render(parts[0], parts[1], n, seq)
+        ctype = 'application/rss+xml' if parts[0] == 'rss' else 'application/atom+xml'
+        _send(self, 200, body, ctype + '; charset=utf-8')
+
+
+class FeedServer(_Server):
+    handler = _FeedHandler
+
+    def __init__(self, items_per_feed: int = 50, fresh: float = 0.2, summary_words: int = 60, **kw):
+        super().__init__(**kw)
+        self.items_per_feed = items_per_feed
+        self.fresh = fresh
+        self.summary_words = summary_words
+
+    def feed_url(self, feed: str, kind: str = 'rss') -> str:
+        return f'{self.url}/{kind}/{feed}'
+
+    def _entries(self, feed: str, n: int, seq: int):
+        # 每次请求推进 fresh*n 个新条目，其余与上次重叠
+        step = max(0, int(round(n * self.fresh)))
+        top = seq * step + n
+        now = datetime.now(UTC)
+        rnd = random.Random(feed)
+        words = ['market', 'model', 'release', 'open', 'source', 'update', 'research', 'data', 'chip', 'cloud']
+        for k in range(top, top - n, -1):
+            summary = ' '.join(rnd.choice(words) for _ in range(self.summary_words))
+            yield {
+                'title': f'{feed} story {k}: {words[k % len(words)]} news',
+                'link': f'https://news.example.com/{feed}/{k}',
+                'summary': f'<p>{summary}</p>',
+                'published': now - timedelta(minutes=top - k),
+            }
+
+    def render(self, kind: str, feed: str, n: int, seq: int) -> str:
+        entries = list(self._entries(feed, n, seq))
+        if kind == 'rss':
+            items = ''.join(
+                f"<item><title>{escape(e['title'])}</title><link>{escape(e['link'])}</link>"
+                f"<description>{escape(e['summary'])}</description>"
+                f"<pubDate>{format_datetime(e['published'])}</pubDate><guid>{escape(e['link'])}</guid></item>"
+                for e in entries)
+            return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                    f'<title>{escape(feed)}</title><link>https://news.example.com/</link>'
+                    f'<description>synthetic</description>{items}</channel></rss>')
+        items = ''.join(
+            f"<entry><title>{escape(e['title'])}</title><link href=\"{escape(e['link'])}\"/>"
+            f"<id>{escape(e['link'])}</id><updated>{e['published'].isoformat()}</updated>"
+            f"<published>{e['published'].isoformat()}</published>"
+            f"<summary type=\"html\">{escape(e['summary'])}</summary></entry>"
+            for e in entries)
+        return (f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                f'<title>{escape(feed)}</title><id>urn:{escape(feed)}</id>'
+                f'<updated>{datetime.now(UTC).isoformat()}</updated>{items}</feed>')
+
+
+class _MyMemoryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server_ref
+        srv.count()
+        if srv.latency:
+            time.sleep(srv.latency)
+        if srv.rate_limit and srv.rnd.random() < srv.rate_limit:
+            with srv._lock:
+                srv.rate_limited += 1
+            return _send(self, 429, json.dumps({'responseStatus': 429, 'responseDetails': 'TOO MANY REQUESTS'}),
+                         'application/json')
+        qs = parse_qs(urlparse(self.path).query)
+        q = qs.get('q', [''])[0]
+        pair = qs.get('langpair', ['en|zh-CN'])[0]
+        body = {
+            'responseStatus': 200,
+            'responseDetails': '',
+            'responseData': {'translatedText': f'[{pair.split("|")[-1]}] {q}', 'match': 1},
+        }
+        _send(self, 200, json.dumps(body, ensure_ascii=False), 'application/json; charset=utf-8')
+
+
+class FakeMyMemory(_Server):
+    handler = _MyMemoryHandler
+
+    def __init__(self, latency_ms: float = 0, rate_limit: float = 0.0, seed: int = 0, **kw):
+        super().__init__(**kw)
+        self.latency = latency_ms / 1000.0
+        self.rate_limit = rate_limit
+        self.rate_limited = 0
+        self.rnd = random.Random(seed)
+
+    @property
+    def api_url(self) -> str:
+        return self.url + '/get'
+
+
+def make_gemini_cmd(directory: str) -> str:
+    """生成调用 fake_gemini.py 的可执行文件，返回其路径（可直接作为 GEMINI_CLI_CMD）"""
+    os.makedirs(directory, exist_ok=True)
+    if os.name == 'nt':
+        path = os.path.join(directory, 'gemini.cmd')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'@"{sys.executable}" "{FAKE_GEMINI}" %*\r\n')
+        return path
+    path = os.path.join(directory, 'gemini')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_GEMINI}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+HTTP 压测：模拟多个看板用户并发访问首页、板块片段、缓存译文、翻译状态与翻译接口
+
+用法：
+  python -m benchmarks.loadtest                       # 自动启动本地服务 + 10k 行种子库
+  python -m benchmarks.loadtest --users 50 --duration 60 --rows 100k
+  python -m benchmarks.loadtest --url http://127.0.0.1:5000   # 压测已运行的服务
+  python -m benchmarks.loadtest --budgets benchmarks/budgets.json --out load.json
+
+默认会在子进程中启动应用（多线程 WSGI 服务，MyMemory 指向本地模拟接口），
+压测端与服务端不共享 GIL。输出各接口 p50/p95/p99 与吞吐；
+任一接口超过延迟预算、错误率超过 --max-error-rate 时退出码为 1。
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.run import git_rev, percentile  # noqa: E402
+
+DEFAULT_MIX = 'index=2,section=4,cached=4,status=2,translate=1,feed=2'
+DEFAULT_BUDGETS = os.path.join(ROOT, 'benchmarks', 'budgets.json')
+SAMPLE_TEXTS = ['OpenAI releases a new model', 'Chip makers report strong quarterly results',
+                'Researchers publish an open dataset for code generation']
+
+
+def endpoints(section_ids):
+    """接口名 -> (方法, 路径生成函数, JSON 请求体)"""
+    return {
+        'index': ('GET', lambda: '/', None),
+        'section': ('GET', lambda: f'/sections/{random.choice(section_ids)}/items', None),
+        'cached': ('GET', lambda: f'/api/cached_translations?section_id={random.choice(section_ids)}', None),
+        'status': ('GET', lambda: '/api/translate/background/status', None),
+        'feed': ('GET', lambda: f'/feeds/{random.choice(section_ids)}.atom', None),
+        'translate': ('POST', lambda: '/api/translate',
+                      {'texts': random.sample(SAMPLE_TEXTS, 2), 'method': 'free', 'target_lang': 'zh-CN'}),
+    }
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(','):
+        if '=' in part:
+            k, v = part.split('=', 1)
+            mix[k.strip()] = float(v)
+    return mix
+
+
+# ---- 服务端（子进程） ----
+
+def serve(args):
+    from benchmarks.fakes import FakeMyMemory
+    from benchmarks.seed import ensure_sections, parse_size, seed_items
+
+    mm = FakeMyMemory(latency_ms=args.mm_latency_ms, rate_limit=args.mm_429_rate).start()
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.db)}'
+    os.environ['MYMEMORY_API_URL'] = mm.api_url
+    os.environ['AUTO_TRANSLATE_INTERVAL_MINUTES'] = '0'
+    os.environ['FEEDS_DIR'] = os.path.abspath(args.db) + '.feeds'
+    os.environ['DIGESTS_DIR'] = os.path.abspath(args.db) + '.digests'
+
+    import app as dn
+    from werkzeug.serving import make_server
+
+    dn.ensure_db()
+    ids = ensure_sections(dn, [f'load-{i}' for i in range(args.sections)])
+    seed_items(dn, ids, parse_size(args.rows))
+    # 与正式启动一致：调度器在运行（状态接口会读取），但不添加采集任务
+    dn.scheduler.start()
+    server = make_server('127.0.0.1', 0, dn.app, threaded=True)
+    print(f"READY http://127.0.0.1:{server.server_port} {','.join(map(str, ids))}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        dn.scheduler.shutdown(wait=False)
+        mm.stop()
+
+
+def start_server(args):
+    db = args.db or os.path.join(tempfile.mkdtemp(prefix='dn_load_'), 'load.db')
+    cmd = [sys.executable, '-m', 'benchmarks.loadtest', '--serve', '--db', db, '--rows', args.rows,
+           '--sections', str(args.sections), '--mm-latency-ms', str(args.mm_latency_ms),
+           '--mm-429-rate', str(args.mm_429_rate)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    deadline = time.time() + 600
+    while time.time() < deadline:
+        line = proc.stdout.readline()
+        if not line:
+            if proc.poll() is not None:
+                raise RuntimeError(f'服务启动失败，退出码 {proc.returncode}')
+            continue
+        if line.startswith('READY '):
+            _, url, ids = line.split()
+            # 继续读取并丢弃服务端输出，避免管道写满阻塞
+            threading.Thread(target=lambda: [None for _ in proc.stdout], daemon=True).start()
+            return proc, url, [int(i) for i in ids.split(',')]
+    proc.kill()
+    raise RuntimeError('服务启动超时')
+
+
+# ---- 压测端 ----
+
+def run_load(base_url, section_ids, mix, users, duration, warmup, think_ms, timeout):
+    import requests
+
+    eps = endpoints(section_ids)
+    names = [n for n in mix if n in eps and mix[n] > 0]
+    weights = [mix[n] for n in names]
+    samples = {n: [] for n in names}
+    errors = {n: 0 for n in names}
+    lock = threading.Lock()
+    start_at = time.perf_counter()
+    measure_from = start_at + warmup
+    stop_at = measure_from + duration
+
+    def user(seed):
+        rnd = random.Random(seed)
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            name = rnd.choices(names, weights)[0]
+            method, path, body = eps[name]
+            t = time.perf_counter()
+            try:
+                r = session.request(method, base_url + path(), json=body, timeout=timeout)
+                ok = r.status_code == 200
+            except Exception:
+                ok = False
+            done = time.perf_counter()
+            if done >= measure_from and t < stop_at:
+                with lock:
+                    samples[name].append((done - t) * 1000)
+                    if not ok:
+                        errors[name] += 1
+            if think_ms:
+                time.sleep(rnd.uniform(0, 2 * think_ms) / 1000.0)
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(time.perf_counter() - measure_from, 1e-9)
+    return summarize(samples, errors, min(elapsed, duration + timeout))
+
+
+def summarize(samples, errors, elapsed) -> dict:
+    out = {}
+    every = []
+    for name, ms in samples.items():
+        every.extend(ms)
+        out[name] = _stats(ms, errors[name], elapsed)
+    out['all'] = _stats(every, sum(errors.values()), elapsed)
+    return out
+
+
+def _stats(ms, errors, elapsed) -> dict:
+    return {
+        'requests': len(ms),
+        'errors': errors,
+        'error_rate': round(errors / len(ms), 4) if ms else 0.0,
+        'throughput': round(len(ms) / elapsed, 2),
+        'p50_ms': round(percentile(ms, 50), 2),
+        'p95_ms': round(percentile(ms, 95), 2),
+        'p99_ms': round(percentile(ms, 99), 2),
+        'max_ms': round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def check_budgets(stats, budgets, max_error_rate) -> list:
+    """返回超出预算的描述列表；预算格式 {"index": {"p95_ms": 800, "min_throughput": 5}, ...}"""
+    failures = []
+    for name, s in stats.items():
+        if s['requests'] and s['error_rate'] > max_error_rate:
+            failures.append(f"{name}: 错误率 {s['error_rate']:.2%} > {max_error_rate:.2%}")
+        for key, limit in (budgets.get(name) or {}).items():
+            if key == 'min_throughput':
+                if s['throughput'] < limit:
+                    failures.append(f"{name}: 吞吐 {s['throughput']}/s < {limit}/s")
+            elif key in s and s['requests'] and s[key] > limit:
+                failures.append(f"{name}: {key} {s[key]} > {limit}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DailyNews HTTP load test')
+    parser.add_argument('--url', help='压测已运行的服务；不指定则自动启动本地服务')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20, help='计入统计的压测时长（秒）')
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--think-ms', type=float, default=100, help='用户两次请求间的平均思考时间')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='接口权重：index,section,cached,status,translate,feed')
+    parser.add_argument('--rows', default='10k')
+    parser.add_argument('--sections', type=int, default=10)
+    parser.add_argument('--section-ids', default='', help='配合 --url 使用的板块 id（逗号分隔）')
+    parser.add_argument('--db', help='种子库路径（可复用）；默认临时文件')
+    parser.add_argument('--mm-latency-ms', type=float, default=50)
+    parser.add_argument('--mm-429-rate', type=float, default=0.0)
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='延迟预算 JSON；传空字符串则不检查')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--out', help='结果 JSON 路径')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    proc = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+        section_ids = [int(i) for i in args.section_ids.split(',') if i.strip()] or [1]
+    else:
+        print(f"启动本地服务并生成 {args.rows} 行种子数据...")
+        proc, base_url, section_ids = start_server(args)
+    print(f"压测 {base_url}: {args.users} 个用户, {args.duration:g}s (+{args.warmup:g}s 预热), 权重 {args.mix}")
+    try:
+        stats = run_load(base_url, section_ids, parse_mix(args.mix), args.users, args.duration,
+                         args.warmup, args.think_ms, args.timeout)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(f"\n{'endpoint':<12}{'reqs':>8}{'err':>6}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, s in stats.items():
+        print(f"{name:<12}{s['requests']:>8}{s['errors']:>6}{s['throughput']:>9.1f}"
+              f"{s['p50_ms']:>9.1f}ms{s['p95_ms']:>8.1f}ms{s['p99_ms']:>8.1f}ms")
+
+    budgets = {}
+    if args.budgets:
+        with open(args.budgets, 'r', encoding='utf-8') as f:
+            budgets = json.load(f)
+    failures = check_budgets(stats, budgets, args.max_error_rate)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                'schema': 1,
+                'created_at': datetime.now(UTC).isoformat(),
+                'git_rev': git_rev(),
+                'params': {k: v for k, v in vars(args).items() if k not in ('serve', 'out')},
+                'budgets': budgets,
+                'results': stats,
+                'failures': failures,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.out}")
+
+    if failures:
+        print("\n超出预算：")
+        for f in failures:
+            print(f"  {f}")
+        return 1
+    print("\n全部接口在预算内")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+离线流水线基准：采集（RSS/Atom/Gemini）、去重、后台翻译、首页与板块片段渲染
+
+用法：
+  python -m benchmarks.run                              # 默认 10k 行
+  python -m benchmarks.run --sizes 10k,100k,1m --out results.json
+  python -m benchmarks.run --compare benchmarks/results/base.json --max-regression 20
+
+数据库从小到大逐级补足行数（同一个库），每个规模下依次运行各项基准；
+结果写成 JSON（schema=1），--compare 与旧结果按 (benchmark, size) 对比吞吐，
+下降超过 --max-regression 百分比时退出码为 1。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, UTC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fakes import FakeMyMemory, FeedServer, make_gemini_cmd  # noqa: E402
+from benchmarks.seed import ensure_sections, parse_size, seed_items  # noqa: E402
+
+SCHEMA = 1
+PLAIN_SECTIONS = [f'bench-{i}' for i in range(8)]
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+def result(name, size, durations, ops, unit, **extra) -> dict:
+    total = sum(durations)
+    ms = [d * 1000 for d in durations]
+    return {
+        'benchmark': name,
+        'size': size,
+        'iterations': len(durations),
+        'ops': ops,
+        'unit': unit,
+        'seconds': round(total, 4),
+        'throughput': round(ops / total, 2) if total > 0 else 0.0,
+        'p50_ms': round(percentile(ms, 50), 2),
+        'p95_ms': round(percentile(ms, 95), 2),
+        'max_ms': round(max(ms), 2) if ms else 0.0,
+        'extra': extra,
+    }
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ''
+
+
+# ---- 各项基准 ----
+
+def bench_index(dn, size, iterations):
+    client = dn.app.test_client()
+    client.get('/')  # 预热模板与连接
+    durations = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        r = client.get('/')
+        durations.append(time.perf_counter() - t)
+        assert r.status_code == 200, r.status_code
+    return result('index', size, durations, iterations, 'requests', bytes=len(r.data))
+
+
+def bench_section_items(dn, size, iterations):
+    """首页按需加载的板块片段；每轮先失效缓存，测量未命中时的渲染"""
+    client = dn.app.test_client()
+    with dn.app.app_context():
+        ids = [s.id for s in dn.Section.query.all()]
+    durations = []
+    for _ in range(iterations):
+        dn.invalidate_section_fragments()
+        t = time.perf_counter()
+        for sid in ids:
+            r = client.get(f'/sections/{sid}/items')
+            assert r.status_code == 200, r.status_code
+        durations.append(time.perf_counter() - t)
+    return result('section_items', size, durations, iterations * len(ids), 'fragments', sections=len(ids))
+
+
+def bench_dedup(dn, size, iterations, batch):
+    from collectors.base import CollectorItem
+    sid = ensure_sections(dn, PLAIN_SECTIONS[:1])[0]
+    with dn.app.app_context():
+        existing = (dn.db.session.query(dn.NewsItem.title, dn.NewsItem.url)
+                    .filter_by(section_id=sid).limit(batch // 2).all())
+        section_rows = dn.NewsItem.query.filter_by(section_id=sid).count()
+    durations = []
+    added = 0
+    for it in range(iterations):
+        items = [CollectorItem(title=t, url=u) for t, u in existing]
+        items += [CollectorItem(title=f'dedup {size}-{it}-{k}', url=f'https://dedup.example.com/{size}/{it}/{k}',
+                                summary='fresh item') for k in range(batch - len(items))]
+        t = time.perf_counter()
+        with dn.app.app_context():
+            added += dn.ingest_items(sid, items)
+        durations.append(time.perf_counter() - t)
+    return result('dedup', size, durations, iterations * batch, 'items', added=added, section_rows=section_rows)
+
+
+def _fetch_runs_since(dn, last_id):
+    dn.writer.flush()
+    with dn.app.app_context():
+        runs = dn.FetchRun.query.filter(dn.FetchRun.id > last_id).all()
+        return runs
+
+
+def _last_run_id(dn):
+    dn.writer.flush()
+    with dn.app.app_context():
+        return dn.db.session.query(dn.db.func.max(dn.FetchRun.id)).scalar() or 0
+
+
+def bench_fetch(dn, size, name, section_name, iterations):
+    sid = ensure_sections(dn, [section_name])[0]
+    last = _last_run_id(dn)
+    durations = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        dn.run_section_fetch(sid)
+        durations.append(time.perf_counter() - t)
+    runs = _fetch_runs_since(dn, last)
+    fetched = sum(r.fetched or 0 for r in runs)
+    errors = [r.error for r in runs if r.status != 'ok']
+    return result(name, size, durations, fetched, 'items', added=sum(r.added or 0 for r in runs),
+                  runs=len(runs), errors=errors[:3])
+
+
+def bench_translation(dn, size, provider, batch, fake_mm=None):
+    os.environ['AUTO_TRANSLATE_METHOD'] = provider
+    os.environ['AUTO_TRANSLATE_BATCH_SIZE'] = str(batch)
+    os.environ['AUTO_TRANSLATE_DELAY'] = '0'
+    with dn.app.app_context():
+        before = dn.NewsItem.query.filter(dn.NewsItem.translated_at.isnot(None)).count()
+    limited = fake_mm.rate_limited if fake_mm else 0
+    t = time.perf_counter()
+    dn.run_background_translation()
+    elapsed = time.perf_counter() - t
+    with dn.app.app_context():
+        after = dn.NewsItem.query.filter(dn.NewsItem.translated_at.isnot(None)).count()
+    extra = {'items_translated': after - before}
+    if fake_mm:
+        extra['rate_limited'] = fake_mm.rate_limited - limited
+    return result(f'translation_{provider}', size, [elapsed], max(after - before, 0), 'items', **extra)
+
+
+# ---- 对比 ----
+
+def compare(current: dict, baseline_path: str, max_regression: float) -> list:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    base = {(r['benchmark'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\n对比基线 {baseline_path} (commit {baseline.get('git_rev') or '?'})")
+    print(f"{'benchmark':<22}{'size':>9}{'base/s':>12}{'now/s':>12}{'change':>9}")
+    for r in current['results']:
+        b = base.get((r['benchmark'], r['size']))
+        if not b or not b.get('throughput'):
+            continue
+        change = (r['throughput'] - b['throughput']) / b['throughput'] * 100
+        flag = ''
+        if change < -max_regression:
+            regressions.append((r['benchmark'], r['size'], change))
+            flag = '  <-- 回退'
+        print(f"{r['benchmark']:<22}{r['size']:>9}{b['throughput']:>12.1f}{r['throughput']:>12.1f}{change:>8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DailyNews offline pipeline benchmarks')
+    parser.add_argument('--sizes', default='10k', help='逗号分隔的库规模，如 10k,100k,1m')
+    parser.add_argument('--db', help='SQLite 文件路径（可复用已生成的大库）；默认使用临时文件')
+    parser.add_argument('--only', default='', help='只运行这些基准（逗号分隔）：index,section_items,dedup,fetch,translation')
+    parser.add_argument('--iterations', type=int, default=20, help='index/dedup 每个规模的重复次数')
+    parser.add_argument('--fetch-iterations', type=int, default=5)
+    parser.add_argument('--feeds', type=int, default=4, help='RSS/Atom 板块各自的源数量')
+    parser.add_argument('--feed-items', type=int, default=50)
+    parser.add_argument('--dedup-batch', type=int, default=500)
+    parser.add_argument('--translate-batch', type=int, default=30)
+    parser.add_argument('--translators', default='free,gemini')
+    parser.add_argument('--mm-latency-ms', type=float, default=20)
+    parser.add_argument('--mm-429-rate', type=float, default=0.02)
+    parser.add_argument('--gemini-latency-ms', type=float, default=0)
+    parser.add_argument('--out', help='结果 JSON 路径；默认 benchmarks/results/bench-<时间>.json')
+    parser.add_argument('--compare', help='与该 JSON 结果对比吞吐')
+    parser.add_argument('--max-regression', type=float, default=20.0, help='允许的吞吐下降百分比')
+    args = parser.parse_args()
+
+    sizes = sorted(parse_size(s) for s in args.sizes.split(',') if s.strip())
+    only = {s.strip() for s in args.only.split(',') if s.strip()}
+    tmpdir = tempfile.mkdtemp(prefix='dn_bench_')
+
+    feeds = FeedServer(items_per_feed=args.feed_items).start()
+    mm = FakeMyMemory(latency_ms=args.mm_latency_ms, rate_limit=args.mm_429_rate).start()
+    gemini_cmd = make_gemini_cmd(os.path.join(tmpdir, 'bin'))
+
+    # 必须在导入 app 之前设置：数据库与外部服务地址都在导入时读取
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(tmpdir, 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['MYMEMORY_API_URL'] = mm.api_url
+    os.environ['GEMINI_CLI_CMD'] = gemini_cmd
+    os.environ['FAKE_GEMINI_LATENCY_MS'] = str(args.gemini_latency_ms)
+    os.environ['ARCHIVE_DIR'] = os.path.join(tmpdir, 'archive')
+    os.environ['FEEDS_DIR'] = os.path.join(tmpdir, 'feeds')
+    # 熔断与自适应轮询状态写到临时目录，不影响 data/source_health.json / data/poll_state.json
+    os.environ['SOURCE_HEALTH_PATH'] = os.path.join(tmpdir, 'source_health.json')
+    os.environ['POLL_STATE_PATH'] = os.path.join(tmpdir, 'poll_state.json')
+
+    import app as dn
+    dn.ensure_db()
+
+    rss = json.dumps({'rss_urls': [feeds.feed_url(f'rss{i}', 'rss') for i in range(args.feeds)],
+                      'max_items': args.feed_items})
+    atom = json.dumps({'rss_urls': [feeds.feed_url(f'atom{i}', 'atom') for i in range(args.feeds)],
+                       'max_items': args.feed_items})
+    gem = json.dumps({'cmd': gemini_cmd, 'max_items': args.feed_items})
+    ensure_sections(dn, ['bench-rss'], 'rss', {'bench-rss': rss})
+    ensure_sections(dn, ['bench-atom'], 'rss', {'bench-atom': atom})
+    ensure_sections(dn, ['bench-gemini'], 'gemini', {'bench-gemini': gem})
+    all_ids = ensure_sections(dn, PLAIN_SECTIONS + ['bench-rss', 'bench-atom', 'bench-gemini'])
+
+    def wanted(name):
+        return not only or name in only
+
+    report = {
+        'schema': SCHEMA,
+        'created_at': datetime.now(UTC).isoformat(),
+        'git_rev': git_rev(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in vars(args).items() if k not in ('out', 'compare', 'db')},
+        'results': [],
+    }
+    for size in sizes:
+        t = time.perf_counter()
+        inserted = seed_items(dn, all_ids, size)
+        print(f"\n== {size} 行（本次补充 {inserted} 行，用时 {time.perf_counter() - t:.1f}s）==")
+        runs = []
+        if wanted('index'):
+            runs.append(lambda: bench_index(dn, size, args.iterations))
+        if wanted('section_items'):
+            runs.append(lambda: bench_section_items(dn, size, args.iterations))
+        if wanted('dedup'):
+            runs.append(lambda: bench_dedup(dn, size, args.iterations, args.dedup_batch))
+        if wanted('fetch'):
+            runs.append(lambda: bench_fetch(dn, size, 'fetch_rss', 'bench-rss', args.fetch_iterations))
+            runs.append(lambda: bench_fetch(dn, size, 'fetch_atom', 'bench-atom', args.fetch_iterations))
+            runs.append(lambda: bench_fetch(dn, size, 'fetch_gemini', 'bench-gemini', args.fetch_iterations))
+        if wanted('translation'):
+            for provider in [p.strip() for p in args.translators.split(',') if p.strip()]:
+                runs.append(lambda p=provider: bench_translation(dn, size, p, args.translate_batch,
+                                                                 mm if p == 'free' else None))
+        for run in runs:
+            r = run()
+            dn.writer.flush()
+            report['results'].append(r)
+            print(f"  {r['benchmark']:<20} {r['throughput']:>10.1f} {r['unit']}/s  "
+                  f"p50={r['p50_ms']}ms p95={r['p95_ms']}ms  {r['extra'] or ''}")
+
+    out = args.out or os.path.join(ROOT, 'benchmarks', 'results',
+                                   f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {out}")
+
+    feeds.stop()
+    mm.stop()
+    if args.compare:
+        regressions = compare(report, args.compare, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} 项吞吐下降超过 {args.max_regression}%")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+批量生成测试数据：按板块均匀分布的 news_items，部分已有译文
+"""
+import random
+from datetime import datetime, timedelta
+
+SEED_URL = 'https://seed.example.com/'
+SEED_SUMMARY = 'Seed summary text for benchmarking. ' * 4
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000"""
+    s = str(text).strip().lower()
+    mult = 1
+    if s.endswith('k'):
+        mult, s = 1000, s[:-1]
+    elif s.endswith('m'):
+        mult, s = 1000000, s[:-1]
+    return int(float(s) * mult)
+
+
+def ensure_sections(dn, names, fetch_method: str = 'manual', configs=None) -> list:
+    """按名称创建板块（已存在则复用），返回 id 列表"""
+    configs = configs or {}
+    with dn.app.app_context():
+        ids = []
+        for name in names:
+            s = dn.Section.query.filter_by(name=name).first()
+            if s is None:
+                s = dn.Section(name=name, fetch_method=fetch_method,
+                               config_json=configs.get(name, '{}'), enabled=True)
+                dn.db.session.add(s)
+                dn.db.session.commit()
+            ids.append(s.id)
+        return ids
+
+
+def seed_items(dn, section_ids, target_rows: int, translated_ratio: float = 0.5,
+               chunk: int = 20000, seed: int = 42) -> int:
+    """把种子条目补足到 target_rows 行（不计基准运行中新增的条目），返回本次插入数量"""
+    rnd = random.Random(seed)
+    table = dn.NewsItem.__table__
+    with dn.app.app_context():
+        current = dn.db.session.query(dn.NewsItem).filter(dn.NewsItem.url.like(SEED_URL + '%')).count()
+        missing = max(0, target_rows - current)
+        now = datetime.utcnow()
+        inserted = 0
+        while inserted < missing:
+            rows = []
+            for _ in range(min(chunk, missing - inserted)):
+                n = current + inserted + len(rows)
+                created = now - timedelta(minutes=rnd.randint(0, 30 * 24 * 60))
+                translated = rnd.random() < translated_ratio
+                rows.append({
+                    'section_id': section_ids[n % len(section_ids)],
+                    'title': f'Seed headline {n} about markets and models',
+                    'summary': SEED_SUMMARY,
+                    'summary_preview': SEED_SUMMARY,
+                    'url': f'{SEED_URL}{n}',
+                    'canonical_url': f'{SEED_URL}{n}',
+                    'published_at': created,
+                    'created_at': created,
+                    'title_translated': f'种子标题 {n}' if translated else '',
+                    'summary_translated': '种子摘要' if translated else '',
+                    'summary_translated_preview': '种子摘要' if translated else '',
+                    'translated_at': created if translated else None,
+                })
+            dn.db.session.execute(table.insert(), rows)
+            dn.db.session.commit()
+            inserted += len(rows)
+        return inserted
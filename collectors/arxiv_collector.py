@@ -1,49 +1,77 @@
 import feedparser
 import requests
 from urllib.parse import urlencode
-from .base import Collector, CollectorResult, CollectorItem
+from .base import Collector, CollectorItem, current_deadline
 from datetime import datetime
+import time
 import xml.etree.ElementTree as ET
+import health
 
 BASE = "http://export.arxiv.org/api/query?"
+PAGE_DELAY_SECONDS = 3
 
 class ArxivCollector(Collector):
-    def fetch(self, section_name: str, config: dict) -> CollectorResult:
+    def iter_items(self, section_name: str, config: dict):
+        """按页请求（config.page_size，默认 100），每页解析完即产出条目；翻页间隔 PAGE_DELAY_SECONDS"""
         query = config.get('query', 'cat:cs.CL')  # 默认计算语言学
         max_results = int(config.get('max_results', 20))
         order = config.get('order', 'lastUpdatedDate')
         timeout = config.get('timeout', 30)
-        
-        params = {
-            'search_query': query,
-            'start': 0,
-            'max_results': max_results,
-            'sortBy': order
+        page_size = max(1, min(int(config.get('page_size', 100)), max_results or 1))
+
+        breaker = health.registry.get(health.arxiv_key())
+        if not breaker.allow():
+            print(f"[ArxivCollector] 熔断中，跳过本次请求: {breaker.key}")
+            return f"熔断中: {breaker.key}"
+        deadline = current_deadline()
+        # 使用 requests 先获取内容，带自定义 User-Agent 和超时
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        url = BASE + urlencode(params)
-        print(f"[ArxivCollector] 正在访问: {url}")
-        
-        try:
-            # 使用 requests 先获取内容，带自定义 User-Agent 和超时
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        total = 0
+        for start in range(0, max_results, page_size):
+            if start:
+                # arXiv API 要求连续请求之间间隔约 3 秒
+                deadline.check()
+                time.sleep(min(PAGE_DELAY_SECONDS, deadline.remaining() or PAGE_DELAY_SECONDS))
+            params = {
+                'search_query': query,
+                'start': start,
+                'max_results': min(page_size, max_results - start),
+                'sortBy': order
             }
-            response = requests.get(url, headers=headers, timeout=timeout)
-            response.raise_for_status()
-            
-            print(f"[ArxivCollector] HTTP 状态: {response.status_code}, 内容长度: {len(response.content)}")
-            
-            # 使用 feedparser 解析
-            d = feedparser.parse(response.content)
-            
-            print(f"[ArxivCollector] feedparser 状态: {getattr(d, 'status', 'unknown')}")
-            print(f"[ArxivCollector] 解析到条目数: {len(getattr(d, 'entries', []))}")
-            
-            if hasattr(d, 'bozo') and d.bozo:
-                print(f"[ArxivCollector] 警告: feedparser 报告解析异常: {getattr(d, 'bozo_exception', 'unknown')}")
-            
-            items = []
-            for i, entry in enumerate(d.entries):
+            url = BASE + urlencode(params)
+            print(f"[ArxivCollector] 正在访问: {url}")
+            try:
+                response = requests.get(url, headers=headers, timeout=deadline.timeout(timeout))
+                response.raise_for_status()
+
+                print(f"[ArxivCollector] HTTP 状态: {response.status_code}, 内容长度: {len(response.content)}")
+
+                # 使用 feedparser 解析
+                d = feedparser.parse(response.content)
+                del response
+
+                print(f"[ArxivCollector] feedparser 状态: {getattr(d, 'status', 'unknown')}")
+                print(f"[ArxivCollector] 解析到条目数: {len(getattr(d, 'entries', []))}")
+
+                if hasattr(d, 'bozo') and d.bozo:
+                    print(f"[ArxivCollector] 警告: feedparser 报告解析异常: {getattr(d, 'bozo_exception', 'unknown')}")
+            except requests.RequestException as e:
+                print(f"[ArxivCollector] 网络请求失败: {e}")
+                if deadline.cancelled:
+                    breaker.release_probe()  # 截止时间导致的中断不计入数据源失败
+                else:
+                    breaker.record_failure(f"网络请求失败: {e}")
+                return f"网络请求失败: {e}"
+            except Exception as e:
+                print(f"[ArxivCollector] 未知错误: {e}")
+                breaker.record_failure(f"解析失败: {e}")
+                return f"解析失败: {e}"
+            if start == 0:
+                breaker.record_success()
+
+            for i, entry in enumerate(d.entries, start):
                 try:
                     # 处理发布时间
                     published = None
@@ -52,41 +80,36 @@ class ArxivCollector(Collector):
                             published = datetime(*entry.published_parsed[:6])
                         except (ValueError, TypeError) as e:
                             print(f"[ArxivCollector] 条目 {i} 时间解析失败: {e}")
-                    
+
                     # 获取摘要
                     summary = ''
                     if hasattr(entry, 'summary'):
                         summary = entry.summary
                     elif hasattr(entry, 'description'):
                         summary = entry.description
-                    
+
                     # 获取标题和链接
                     title = getattr(entry, 'title', '').strip()
                     url = getattr(entry, 'link', '').strip()
-                    
+
                     if not title:
                         print(f"[ArxivCollector] 条目 {i} 无标题，跳过")
                         continue
-                    
-                    items.append(CollectorItem(
+
+                    item = CollectorItem(
                         title=title,
                         url=url,
                         summary=summary,
                         published_at=published
-                    ))
-                    
+                    )
                     print(f"[ArxivCollector] 成功解析条目 {i}: {title[:50]}...")
-                    
                 except Exception as e:
                     print(f"[ArxivCollector] 条目 {i} 解析失败: {e}")
                     continue
-            
-            print(f"[ArxivCollector] 最终获取 {len(items)} 条有效数据")
-            return CollectorResult(items=items)
-            
-        except requests.RequestException as e:
-            print(f"[ArxivCollector] 网络请求失败: {e}")
-            return CollectorResult(items=[], error=f"网络请求失败: {e}")
-        except Exception as e:
-            print(f"[ArxivCollector] 未知错误: {e}")
-            return CollectorResult(items=[], error=f"解析失败: {e}")
\ No newline at end of file
+                total += 1
+                yield item
+            if len(d.entries) < params['max_results']:
+                break  # 结果已取完
+
+        print(f"[ArxivCollector] 最终获取 {total} 条有效数据")
+        return None
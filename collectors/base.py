@@ -1,6 +1,8 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Generator, Iterable, Iterator, List, Optional
 from datetime import datetime
+import threading
+import time
 
 @dataclass
 class CollectorItem:
@@ -15,5 +17,132 @@ class CollectorResult:
     error: Optional[str] = None
 
 class Collector:
+    """采集器：实现 fetch()（一次性返回）或 iter_items()（流式产出）其一即可，另一个由基类适配
+
+    iter_items 是生成器，逐条 yield CollectorItem；生成器的返回值（return '...'）是非致命的错误信息，
+    对应 CollectorResult.error。入库时按块读取（见 ItemStream），边采集边去重提交。
+    """
+
     def fetch(self, section_name: str, config: dict) -> CollectorResult:
-        raise NotImplementedError
\ No newline at end of file
+        if type(self).iter_items is Collector.iter_items:
+            raise NotImplementedError
+        return collect(self.iter_items(section_name, config))
+
+    def iter_items(self, section_name: str, config: dict) -> Generator[CollectorItem, None, Optional[str]]:
+        return (yield from iter_result(self.fetch(section_name, config)))
+
+
+def iter_result(result: CollectorResult) -> Generator[CollectorItem, None, Optional[str]]:
+    """把一次性结果转成 iter_items 形式的生成器"""
+    yield from result.items
+    return result.error
+
+
+def collect(items: Iterator[CollectorItem]) -> CollectorResult:
+    """读完 iter_items 生成器，合成 CollectorResult"""
+    stream = ItemStream(items)
+    collected = [it for chunk in stream.chunks(256) for it in chunk]
+    return CollectorResult(items=collected, error=stream.error)
+
+
+class ItemStream:
+    """按固定大小分块读取 iter_items 生成器；读完后 error 为生成器的返回值，count 为读到的条数"""
+
+    def __init__(self, items: Iterable[CollectorItem]):
+        self._it = iter(items)
+        self.error = None
+        self.count = 0
+
+    def chunks(self, size: int) -> Iterator[List[CollectorItem]]:
+        size = max(1, int(size))
+        chunk = []
+        while True:
+            try:
+                item = next(self._it)
+            except StopIteration as e:
+                self.error = e.value
+                break
+            self.count += 1
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class FetchCancelled(Exception):
+    """采集已超过截止时间或被取消"""
+
+
+class FetchTimeout(TimeoutError):
+    """采集任务超过墙钟截止时间"""
+
+
+class Deadline:
+    """采集截止时间 + 取消标记；采集器在阻塞调用前用它收紧超时"""
+
+    def __init__(self, seconds: float | None = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def check(self):
+        if self.cancelled:
+            raise FetchCancelled('采集已超时或被取消')
+
+    def timeout(self, default: float) -> float:
+        """取默认超时与剩余时间的较小值（至少 1 秒，交给底层调用报超时）"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(1.0, min(float(default), remaining))
+
+
+_local = threading.local()
+_NO_DEADLINE = Deadline()
+
+
+def current_deadline() -> Deadline:
+    """当前线程的采集截止时间；未设置时返回不限时的空对象"""
+    return getattr(_local, 'deadline', None) or _NO_DEADLINE
+
+
+def run_with_deadline(fn, seconds: float, *args, **kwargs):
+    """在独立线程中运行 fn，超过 seconds 后标记取消并抛出 FetchTimeout
+
+    Python 线程无法被强制终止：超时后采集线程会在下一个检查点或
+    被收紧的网络/子进程超时处退出，结果被丢弃，调度线程立即返回。
+    """
+    deadline = Deadline(seconds)
+    box = {}
+
+    def target():
+        _local.deadline = deadline
+        try:
+            box['result'] = fn(*args, **kwargs)
+        except BaseException as e:
+            box['error'] = e
+        finally:
+            _local.deadline = None
+
+    t = threading.Thread(target=target, name='fetch-worker', daemon=True)
+    t.start()
+    t.join(seconds)
+    if t.is_alive():
+        deadline.cancel()
+        raise FetchTimeout(f'采集超过 {seconds:g}s 截止时间，已取消')
+    if 'error' in box:
+        raise box['error']
+    return box['result']
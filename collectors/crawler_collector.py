@@ -0,0 +1,399 @@
+"""
+网页爬虫采集器（fetch_method='crawler'）
+
+板块 config_json 示例：
+  {"start_urls": ["https://example.com/news"],
+   "list_selector": "h2.title a",           # 列表页中指向文章的链接（CSS 选择器）
+   "title_selector": "h1",                  # 以下为文章页，均可省略，回退到 og:/meta 标签与链接文字
+   "summary_selector": "article p",
+   "date_selector": "time", "date_attr": "datetime",
+   "follow": true,                          # false 时只用列表页的链接文字作标题，不抓文章页
+   "same_domain": true, "max_items": 20, "timeout": 20}
+
+所有爬虫板块共用一个后台事件循环线程和一个 httpx.AsyncClient，几十个站点不需要几十个线程：
+- 全局并发 CRAWLER_CONCURRENCY；同一域名串行，间隔不小于 CRAWLER_DOMAIN_DELAY_SECONDS，
+  robots.txt 的 Crawl-delay 更大时从之（最多 CRAWLER_MAX_CRAWL_DELAY_SECONDS）
+- robots.txt 按域名缓存 CRAWLER_ROBOTS_TTL_SECONDS；4xx 视为全部允许，5xx/无法访问视为全部禁止（RFC 9309）
+- 列表页与文章页都带 If-None-Match / If-Modified-Since：列表页 304 时跳过，文章页 304 时复用上次提取的结果
+- 单页最多读取 CRAWLER_MAX_PAGE_BYTES，文章下载完立即解析并丢弃 HTML；验证器缓存按 LRU 限量
+- iter_items 按文章完成顺序逐条产出，入库不必等整个板块抓完
+"""
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, UTC
+from email.utils import parsedate_to_datetime
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from bs4 import BeautifulSoup
+
+import health
+from config import DevConfig
+from .base import Collector, CollectorResult, CollectorItem, FetchCancelled, current_deadline
+from .rss_collector import USER_AGENT
+
+SUMMARY_MAX_CHARS = 1000
+_DONE = object()
+
+
+class _LRU:
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self._data = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.limit:
+            self._data.popitem(last=False)
+
+
+class _Page:
+    def __init__(self, url: str, status: int = 0, body: bytes = b'', encoding: str | None = None, error: str = '',
+                 etag: str | None = None, last_modified: str | None = None):
+        self.url = url
+        self.status = status  # 0 表示请求未发出或失败（见 error）
+        self.body = body
+        self.encoding = encoding  # 响应头中的字符集；None 时由 BeautifulSoup 按 <meta charset> 识别
+        self.error = error
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class _Domain:
+    def __init__(self):
+        self.lock = asyncio.Lock()  # 同一域名串行
+        self.robots_lock = asyncio.Lock()
+        self.next_at = 0.0  # 下一次允许请求的 loop.time()
+
+
+def _parse_date(text: str | None) -> datetime | None:
+    text = (text or '').strip()
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    # 与 RSS 采集器一致：无时区的 UTC
+    return dt.astimezone(UTC).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def _meta(soup, *names) -> str:
+    for name in names:
+        tag = soup.find('meta', attrs={'property': name}) or soup.find('meta', attrs={'name': name})
+        if tag and tag.get('content'):
+            return tag['content'].strip()
+    return ''
+
+
+def _select_text(soup, selector: str | None, limit: int = 1) -> str:
+    if not selector:
+        return ''
+    parts = [el.get_text(' ', strip=True) for el in soup.select(selector, limit=limit)]
+    return ' '.join(p for p in parts if p)
+
+
+def extract_links(html: bytes, base_url: str, config: dict, encoding: str | None = None) -> list:
+    """列表页 -> [(文章 URL, 链接文字)]，按页面顺序去重"""
+    soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+    selector = config.get('list_selector') or 'a[href]'
+    attr = config.get('link_attr', 'href')
+    same_domain = config.get('same_domain', True)
+    host = urlparse(base_url).netloc.lower()
+    links, seen = [], set()
+    for el in soup.select(selector):
+        if el.name != 'a' and not el.get(attr):
+            el = el.find('a', href=True) or el  # 选中的是包裹链接的容器
+        href = (el.get(attr) or '').strip()
+        if not href or href.startswith(('javascript:', 'mailto:', '#')):
+            continue
+        url = urldefrag(urljoin(base_url, href))[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or (same_domain and parsed.netloc.lower() != host):
+            continue
+        if url in seen:
+            continue
+        seen.add(url)
+        links.append((url, el.get_text(' ', strip=True)))
+    soup.decompose()
+    return links
+
+
+def extract_article(html: bytes, url: str, link_text: str, config: dict,
+                    encoding: str | None = None) -> CollectorItem | None:
+    soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+    try:
+        title = (_select_text(soup, config.get('title_selector', 'h1')) or _meta(soup, 'og:title', 'twitter:title')
+                 or link_text or (soup.title.get_text(strip=True) if soup.title else ''))
+        if not title:
+            return None
+        summary = (_select_text(soup, config.get('summary_selector'), int(config.get('summary_paragraphs', 2)))
+                   or _meta(soup, 'og:description', 'description', 'twitter:description'))
+        published = None
+        if config.get('date_selector'):
+            el = soup.select_one(config['date_selector'])
+            if el is not None:
+                attr = config.get('date_attr', 'datetime')
+                published = _parse_date(el.get(attr) or el.get_text(strip=True))
+        if published is None:
+            published = _parse_date(_meta(soup, 'article:published_time', 'og:published_time', 'date'))
+        return CollectorItem(title=title[:255], url=url, summary=summary[:SUMMARY_MAX_CHARS], published_at=published)
+    finally:
+        soup.decompose()
+
+
+class CrawlerEngine:
+    """后台事件循环：所有爬虫板块的请求、域名礼貌间隔、robots.txt 与验证器缓存都在这里"""
+
+    def __init__(self, concurrency: int | None = None, domain_delay: float | None = None):
+        self.concurrency = concurrency or DevConfig.CRAWLER_CONCURRENCY
+        self.domain_delay = DevConfig.CRAWLER_DOMAIN_DELAY_SECONDS if domain_delay is None else domain_delay
+        self.max_bytes = DevConfig.CRAWLER_MAX_PAGE_BYTES
+        self._robots = _LRU(1024)  # host -> (RobotFileParser | None, expires_at)；None 表示全部允许
+        self._validators = _LRU(DevConfig.CRAWLER_CACHE_ENTRIES)  # url -> {etag, last_modified, item}
+        self._domains = {}
+        self._client = None
+        self._sem = None
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='crawler-loop', daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _domain(self, host: str) -> _Domain:
+        d = self._domains.get(host)
+        if d is None:
+            d = self._domains[host] = _Domain()
+        return d
+
+    def _ensure_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5'},
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            )
+            self._sem = asyncio.Semaphore(self.concurrency)
+
+    async def _robots_for(self, url: str, timeout: float):
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        cached = self._robots.get(host)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        async with self._domain(host).robots_lock:
+            cached = self._robots.get(host)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            page = await self._request(f"{parsed.scheme}://{parsed.netloc}/robots.txt", timeout, conditional=False)
+            if 400 <= page.status < 500:
+                rp = None
+            elif page.status == 200:
+                rp = RobotFileParser()
+                rp.parse(page.body.decode(page.encoding or 'utf-8', errors='replace').splitlines())
+            else:
+                rp = RobotFileParser()
+                rp.disallow_all = True
+                print(f"[Crawler] robots.txt unavailable for {host} ({page.error or page.status}), treating as disallowed")
+            self._robots.put(host, (rp, time.time() + DevConfig.CRAWLER_ROBOTS_TTL_SECONDS))
+            return rp
+
+    async def get(self, url: str, timeout: float) -> _Page:
+        """遵守 robots.txt 的条件请求；被禁止时返回 status=0、error='robots.txt'"""
+        rp = await self._robots_for(url, timeout)
+        if rp is not None and not rp.can_fetch(USER_AGENT, url):
+            return _Page(url, error='robots.txt')
+        return await self._request(url, timeout, crawl_delay=rp.crawl_delay(USER_AGENT) if rp else None)
+
+    async def _request(self, url: str, timeout: float, conditional: bool = True, crawl_delay=None) -> _Page:
+        self._ensure_client()
+        domain = self._domain(urlparse(url).netloc.lower())
+        delay = max(self.domain_delay, min(float(crawl_delay or 0), DevConfig.CRAWLER_MAX_CRAWL_DELAY_SECONDS))
+        headers = {}
+        cached = self._validators.get(url) if conditional else None
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        async with domain.lock:
+            wait = domain.next_at - self.loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                async with self._sem:
+                    async with self._client.stream('GET', url, headers=headers, timeout=timeout) as resp:
+                        if resp.status_code != 200:
+                            return _Page(str(resp.url), resp.status_code)
+                        body = bytearray()
+                        async for chunk in resp.aiter_bytes():
+                            body += chunk
+                            if len(body) >= self.max_bytes:
+                                del body[self.max_bytes:]  # 超长页面只解析开头部分
+                                break
+                        return _Page(str(resp.url), 200, bytes(body), resp.charset_encoding,
+                                     etag=resp.headers.get('etag'), last_modified=resp.headers.get('last-modified'))
+            except httpx.HTTPError as e:
+                return _Page(url, error=f"{type(e).__name__}: {e}")
+            finally:
+                domain.next_at = self.loop.time() + delay
+
+    def remember(self, url: str, page: _Page, item: CollectorItem | None = None):
+        """成功处理后才保存验证器，下次请求才会带条件头"""
+        if page.etag or page.last_modified:
+            self._validators.put(url, {'etag': page.etag, 'last_modified': page.last_modified, 'item': item})
+
+    def cached_item(self, url: str) -> CollectorItem | None:
+        cached = self._validators.get(url)
+        return cached.get('item') if cached else None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def engine() -> CrawlerEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = CrawlerEngine()
+    return _engine
+
+
+class CrawlerCollector(Collector):
+    def fetch(self, section_name: str, config: dict) -> CollectorResult:
+        deadline = current_deadline()
+        future = engine().submit(self._crawl(config or {}, deadline))
+        try:
+            return future.result(deadline.remaining())
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise FetchCancelled(f"爬虫采集已取消: {section_name}")
+
+    def iter_items(self, section_name: str, config: dict):
+        """文章页按完成顺序逐条产出，不等整个板块抓完"""
+        deadline = current_deadline()
+        q = queue.SimpleQueue()
+        future = engine().submit(self._crawl(config or {}, deadline, emit=q.put))
+        future.add_done_callback(lambda _f: q.put(_DONE))
+        try:
+            while True:
+                try:
+                    item = q.get(timeout=deadline.remaining())
+                except queue.Empty:
+                    raise FetchCancelled(f"爬虫采集已取消: {section_name}")
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # 提前关闭（入库失败、截止时间到）时取消事件循环中的抓取
+            if not future.done():
+                future.cancel()
+        return future.result().error
+
+    async def _crawl(self, config: dict, deadline, emit=None) -> CollectorResult:
+        """emit 不为空时每得到一条就回调（在事件循环线程中），返回结果不再保留条目"""
+        eng = engine()
+        start_urls = config.get('start_urls') or []
+        if isinstance(start_urls, str):
+            start_urls = [start_urls]
+        max_items = int(config.get('max_items', 20))
+        timeout = float(config.get('timeout', 20))
+        follow = config.get('follow', True)
+        errors, links, lists = [], [], []
+        failed = False  # 有文章页失败
+        for url in start_urls:
+            if deadline.cancelled:
+                raise FetchCancelled(f"爬虫采集已取消，剩余列表页未处理: {url}")
+            breaker = health.registry.get(health.crawler_key(url))
+            if not breaker.allow():
+                errors.append(f"{url}: 熔断中")
+                continue
+            try:
+                page = await eng.get(url, deadline.timeout(timeout))
+            except BaseException:
+                breaker.release_probe()
+                raise
+            if page.error == 'robots.txt':
+                breaker.release_probe()
+                errors.append(f"{url}: robots.txt 禁止抓取")
+                continue
+            if page.status == 304:
+                breaker.record_success()
+                continue  # 列表页没有变化
+            if page.status != 200:
+                err = page.error or f"HTTP {page.status}"
+                if deadline.cancelled:
+                    breaker.release_probe()
+                else:
+                    breaker.record_failure(err)
+                errors.append(f"{url}: {err}")
+                continue
+            breaker.record_success()
+            lists.append((url, page))
+            known = {u for u, _ in links}
+            links.extend(link for link in extract_links(page.body, page.url, config, page.encoding)
+                         if link[0] not in known)
+            page.body = b''
+        links = links[:max_items] if max_items > 0 else links
+
+        if not follow:
+            items = [CollectorItem(title=text[:255], url=u) for u, text in links if text]
+            if emit:
+                for it in items:
+                    emit(it)
+                items = []
+        else:
+            async def one(u, text):
+                res = await self._article(eng, u, text, config, deadline, timeout)
+                if emit and isinstance(res, CollectorItem):
+                    emit(res)
+                    return None
+                return res
+
+            results = await asyncio.gather(*(one(u, text) for u, text in links))
+            items = []
+            for (u, _), res in zip(links, results):
+                if isinstance(res, str):
+                    errors.append(f"{u}: {res}")
+                    failed = True
+                elif res is not None:
+                    items.append(res)
+        if not failed:
+            # 文章都处理完才记住列表页的验证器，失败的文章下次还能从列表页重新发现
+            for url, page in lists:
+                eng.remember(url, page)
+        return CollectorResult(items=items, error='; '.join(errors[:10]) or None)
+
+    async def _article(self, eng: CrawlerEngine, url: str, link_text: str, config: dict, deadline, timeout: float):
+        """返回 CollectorItem、None（无可用内容/被 robots 禁止）或错误描述字符串"""
+        if deadline.cancelled:
+            return '采集已超时'
+        page = await eng.get(url, deadline.timeout(timeout))
+        if page.status == 304:
+            return eng.cached_item(url)
+        if page.error == 'robots.txt':
+            return None
+        if page.status != 200:
+            return page.error or f"HTTP {page.status}"
+        item = extract_article(page.body, page.url, link_text, config, page.encoding)
+        if item is not None:
+            eng.remember(url, page, item)
+        return item
@@ -0,0 +1,83 @@
+"""
+Gemini 合并采集
+
+同一时刻到期、CLI 配置相同（GeminiCollector.batch_key）的板块合并为一次 CLI 调用：
+第一个到达的板块作为组长，等待 window_seconds（或凑满 max_sections）后发出一个结构化提示词，
+输出按板块拆分后交给各自的采集线程入库。合并调用失败、输出无法解析或缺少某个板块时，
+相应板块回退为单独调用，行为与未开启合并时一致。
+"""
+import threading
+
+import metrics
+from .base import CollectorResult, current_deadline
+
+
+class _Group:
+    def __init__(self):
+        self.members = []  # [(section_name, config)]
+        self.results = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class GeminiBatcher:
+    def __init__(self, collector, window_seconds: float = 10, max_sections: int = 5, recruit=None):
+        self.collector = collector
+        self.window = float(window_seconds)
+        self.max_sections = max(1, int(max_sections))
+        # recruit(section_name, key)：组长开组时调用，可把即将到期的同组板块提前唤起
+        self.recruit = recruit
+        self._open = {}  # batch_key -> 正在收集成员的 _Group
+        self._lock = threading.Lock()
+
+    def fetch(self, section_name: str, config: dict) -> CollectorResult:
+        key = self.collector.batch_key(config)
+        if key is None or self.max_sections < 2:
+            return self.collector.fetch(section_name, config)
+        with self._lock:
+            group = self._open.get(key)
+            leader = group is None
+            if leader:
+                group = self._open[key] = _Group()
+            group.members.append((section_name, config))
+            if len(group.members) >= self.max_sections:
+                self._open.pop(key, None)
+                group.full.set()
+        if leader:
+            self._lead(key, group, section_name)
+        else:
+            group.done.wait(current_deadline().remaining())
+        result = group.results.get(section_name)
+        if result is None:
+            if len(group.members) > 1:
+                metrics.GEMINI_BATCH_SECTIONS.inc(outcome='fallback')
+            return self.collector.fetch(section_name, config)
+        metrics.GEMINI_BATCH_SECTIONS.inc(outcome='merged')
+        return result
+
+    def _lead(self, key, group: _Group, section_name: str):
+        try:
+            if self.recruit:
+                try:
+                    self.recruit(section_name, key)
+                except Exception as e:
+                    print(f"[GeminiBatch] recruit failed: {e}")
+            # 等待同组板块加入，最多占用截止时间的一半，留出回退为单独调用的时间
+            remaining = current_deadline().remaining()
+            group.full.wait(self.window if remaining is None else min(self.window, remaining / 2))
+            with self._lock:
+                if self._open.get(key) is group:
+                    del self._open[key]
+                members = list(group.members)
+            if len(members) < 2:
+                return
+            results = self.collector.fetch_batch(members)
+            if results is None:
+                outcome = 'failed'
+            else:
+                group.results = results
+                outcome = 'ok' if len(results) == len(members) else 'partial'
+            metrics.GEMINI_BATCH_CALLS.inc(outcome=outcome)
+            print(f"[GeminiBatch] {outcome}: {len(members)} sections, merged={len(group.results)}")
+        finally:
+            group.done.set()
@@ -4,9 +4,14 @@ import json
 import re
 import tempfile
 import glob
-from .base import Collector, CollectorResult, CollectorItem
+from .base import Collector, CollectorResult, CollectorItem, current_deadline
 from datetime import datetime
 from config import DevConfig
+import health
+
+# 合并采集提示词中主题列表的标记（benchmarks/fake_gemini.py 据此识别合并请求）
+BATCH_MARKER = '主题列表（JSON）：'
+
 
 class GeminiCollector(Collector):
     def _resolve_cmd(self, config: dict) -> str:
@@ -168,6 +173,9 @@ class GeminiCollector(Collector):
 
     # 新增：使用 google-generativeai 的 Python SDK 作为回退方案
     def _sdk_generate(self, prompt: str, model: str, timeout: int, env: dict) -> str | None:
+        if current_deadline().cancelled:
+            print("[GeminiCollector] 已超过采集截止时间，跳过 Python SDK 回退")
+            return None
         try:
             import google.generativeai as genai
         except Exception:
@@ -205,6 +213,7 @@ class GeminiCollector(Collector):
 
     def _run_gemini(self, prompt: str, cmd_args: list, timeout: int = 120, env: dict | None = None) -> str:
         """运行 Gemini CLI，先尝试 --prompt，失败则回退到 stdin"""
+        deadline = current_deadline()
         try:
             # 尝试使用 --prompt 参数
             full_args = cmd_args + ['--prompt', prompt]
@@ -214,7 +223,7 @@ class GeminiCollector(Collector):
                 text=True,
                 encoding='utf-8',
                 errors='replace',
-                timeout=timeout,
+                timeout=deadline.timeout(timeout),
                 check=True,
                 env=env
             )
@@ -231,6 +240,8 @@ class GeminiCollector(Collector):
                 print(f"  4. 可在板块配置中覆盖: {{\"cmd\": \"C:\\path\\to\\gemini.exe\"}}")
                 raise Exception(f"Gemini CLI 未找到: {' '.join(cmd_args)}")
             # --prompt 参数可能不支持或执行过慢，回退到 stdin
+            if deadline.cancelled:
+                raise Exception(f"Gemini CLI 已超过采集截止时间，不再回退到 stdin: {e}")
             print(f"[GeminiCollector] --prompt 失败或超时，回退到 stdin: {e}")
             try:
                 result = subprocess.run(
@@ -240,7 +251,7 @@ class GeminiCollector(Collector):
                     text=True,
                     encoding='utf-8',
                     errors='replace',
-                    timeout=timeout,
+                    timeout=deadline.timeout(timeout),
                     check=True,
                     env=env
                 )
@@ -270,24 +281,8 @@ class GeminiCollector(Collector):
                 print("  - 在板块配置中提升 timeout（单位秒），如: {\"timeout\": 180}")
                 raise Exception(f"Gemini CLI 执行超时: {e3}")
 
-    # 解析输出为JSON的辅助函数保持不变
-    def fetch(self, section_name: str, config: dict) -> CollectorResult:
-        cmd = self._resolve_cmd(config or {})
-        print(f"[GeminiCollector] using cmd: {cmd}")
-        # 默认参数：10条新闻，聚焦最近3天
-        max_items = config.get('max_items', 10)
-        days_back = config.get('days_back', 3)
-        # 强化提示词，严格要求输出纯JSON数组
-        base_prompt = (
-            f"你是新闻聚合助手。请整理与{section_name}相关的最新动态，"
-            f"聚焦最近{days_back}天内的重要新闻，返回{max_items}条最有价值的内容。"
-            "内容应涵盖创新技术、产品发布、行业动态、开源项目等热门话题。"
-            "按条目给出标题、相关链接（若有）和一句话摘要，以及发布时间。"
-            "必须只输出严格的JSON数组，不要输出任何解释、前后缀或Markdown围栏。"
-            "每个元素为对象，字段固定为: title, url, summary, published_at(ISO8601格式)。"
-            "示例格式: [{\"title\":\"标题\",\"url\":\"https://...\",\"summary\":\"摘要\",\"published_at\":\"2024-01-15T10:30:00Z\"}]"
-        )
-        prompt = config.get('prompt', base_prompt)
+    def _prepare_cli(self, config: dict) -> tuple:
+        """CLI 参数与环境变量：去掉 generate 子命令、补充 API Key、代理与 provider"""
         args = config.get('args', [])
         # 兼容不同版本的 Gemini CLI：有的不支持 "generate" 子命令
         if isinstance(args, list) and args:
@@ -322,6 +317,49 @@ class GeminiCollector(Collector):
                     print("[GeminiCollector] enforce provider: local")
         except Exception:
             pass
+        return args, env
+
+    def fetch(self, section_name: str, config: dict) -> CollectorResult:
+        # 熔断：CLI 不可用时不再每次都等满超时（含 stdin 重试）
+        breaker = health.registry.get(health.gemini_key(config))
+        if not breaker.allow():
+            print(f"[GeminiCollector] 熔断中，跳过本次调用: {breaker.key}")
+            return CollectorResult(items=[], error=f"熔断中: {breaker.key}")
+        try:
+            result = self._fetch(section_name, config)
+        except BaseException:
+            breaker.release_probe()
+            raise
+        if current_deadline().cancelled:
+            # 被采集截止时间取消，不计入数据源健康，只交还半开探测
+            breaker.release_probe()
+            return result
+        # 只有出错才计入熔断；调用成功但没有新闻（冷门主题）属于正常结果
+        if result.error:
+            breaker.record_failure(result.error)
+        else:
+            breaker.record_success()
+        return result
+
+    # 解析输出为JSON的辅助函数保持不变
+    def _fetch(self, section_name: str, config: dict) -> CollectorResult:
+        cmd = self._resolve_cmd(config or {})
+        print(f"[GeminiCollector] using cmd: {cmd}")
+        # 默认参数：10条新闻，聚焦最近3天
+        max_items = config.get('max_items', 10)
+        days_back = config.get('days_back', 3)
+        # 强化提示词，严格要求输出纯JSON数组
+        base_prompt = (
+            f"你是新闻聚合助手。请整理与{section_name}相关的最新动态，"
+            f"聚焦最近{days_back}天内的重要新闻，返回{max_items}条最有价值的内容。"
+            "内容应涵盖创新技术、产品发布、行业动态、开源项目等热门话题。"
+            "按条目给出标题、相关链接（若有）和一句话摘要，以及发布时间。"
+            "必须只输出严格的JSON数组，不要输出任何解释、前后缀或Markdown围栏。"
+            "每个元素为对象，字段固定为: title, url, summary, published_at(ISO8601格式)。"
+            "示例格式: [{\"title\":\"标题\",\"url\":\"https://...\",\"summary\":\"摘要\",\"published_at\":\"2024-01-15T10:30:00Z\"}]"
+        )
+        prompt = config.get('prompt', base_prompt)
+        args, env = self._prepare_cli(config)
         try:
             # 组装命令与参数
             cmd_args = [cmd] + (args or [])
@@ -344,7 +382,7 @@ class GeminiCollector(Collector):
                         data = self._force_json(self._clean_output(sdk_out) or sdk_out)
                     except Exception as e3:
                         print(f"[GeminiCollector] SDK JSON parse failed: {e3}")
-                        return CollectorResult(items=[])
+                        return CollectorResult(items=[], error='SDK 输出无法解析为 JSON')
                     else:
                         # 正确构建返回 items
                         items = []
@@ -352,7 +390,7 @@ class GeminiCollector(Collector):
                             data = data['items']
                         if not isinstance(data, list):
                             print(f"[GeminiCollector] SDK parsed JSON is not a list: type={type(data)}")
-                            return CollectorResult(items=[])
+                            return CollectorResult(items=[], error='SDK 输出不是 JSON 数组')
                         for it in data:
                             if not isinstance(it, dict):
                                 continue
@@ -396,9 +434,9 @@ class GeminiCollector(Collector):
                         data = self._force_json(self._clean_output(sdk_out) or sdk_out)
                     except Exception as e3:
                         print(f"[GeminiCollector] SDK JSON parse failed: {e3}")
-                        return CollectorResult(items=[])
+                        return CollectorResult(items=[], error='SDK 输出无法解析为 JSON')
                 else:
-                    return CollectorResult(items=[])
+                    return CollectorResult(items=[], error='CLI 只输出了提示信息，SDK 回退也无结果')
             try:
                 data = self._force_json(cleaned or out)
             except Exception as e:
@@ -420,15 +458,15 @@ class GeminiCollector(Collector):
                         data = self._force_json(self._clean_output(sdk_out) or sdk_out)
                     except Exception as e3:
                         print(f"[GeminiCollector] SDK JSON parse failed: {e3}")
-                        return CollectorResult(items=[])
+                        return CollectorResult(items=[], error='输出无法解析为 JSON')
                 else:
-                    return CollectorResult(items=[])
+                    return CollectorResult(items=[], error='输出无法解析为 JSON，SDK 回退也无结果')
             items = []
             if isinstance(data, dict) and 'items' in data:
                 data = data['items']
             if not isinstance(data, list):
                 print(f"[GeminiCollector] parsed JSON is not a list: type={type(data)}")
-                return CollectorResult(items=[])
+                return CollectorResult(items=[], error='输出不是 JSON 数组')
             for it in data:
                 if not isinstance(it, dict):
                     continue
@@ -456,4 +494,127 @@ class GeminiCollector(Collector):
         except Exception as e:
             # 常见情况：命令不存在
             print(f"[GeminiCollector] exception: {e}")
-            return CollectorResult(items=[])
\ No newline at end of file
+            return CollectorResult(items=[], error=str(e))
+    # ---- 合并采集：同一时刻到期、CLI 配置相同的多个板块共用一次调用（见 collectors/gemini_batch.py） ----
+
+    def batch_key(self, config: dict):
+        """可合并的板块返回分组键（命令、参数、代理、超时相同才合并）；自定义 prompt 或 batch=false 时返回 None"""
+        config = config or {}
+        if config.get('prompt') or config.get('batch', True) is False:
+            return None
+        args = config.get('args', [])
+        if not isinstance(args, list):
+            return None
+        if args and isinstance(args[0], str) and args[0].lower() == 'generate':
+            args = args[1:]
+        try:
+            timeout = int(config.get('timeout', 120))
+        except (TypeError, ValueError):
+            timeout = 120
+        return (self._resolve_cmd(config), tuple(str(a) for a in args), (config.get('proxy') or '').strip(), timeout)
+
+    def _batch_prompt(self, sections: list) -> str:
+        topics = [{'key': name, 'max_items': cfg.get('max_items', 10), 'days_back': cfg.get('days_back', 3)}
+                  for name, cfg in sections]
+        return (
+            "你是新闻聚合助手。请分别整理下列每个主题的最新动态，"
+            "每个主题只收录最近 days_back 天内的重要新闻，最多 max_items 条最有价值的内容。"
+            "按条目给出标题、相关链接（若有）和一句话摘要，以及发布时间。"
+            "必须只输出严格的JSON对象，不要输出任何解释、前后缀或Markdown围栏。"
+            "格式: {\"sections\": {\"<主题key>\": [{\"title\":\"标题\",\"url\":\"https://...\",\"summary\":\"摘要\",\"published_at\":\"2024-01-15T10:30:00Z\"}]}}，"
+            "sections 的键必须与主题列表中的 key 完全一致。"
+            + BATCH_MARKER + json.dumps(topics, ensure_ascii=False)
+        )
+
+    def _parse_batch(self, text: str) -> dict | None:
+        """解析合并调用的输出，返回 {key: [item, ...]}；无法解析时返回 None"""
+        s = (text or '').strip()
+        candidates = [s]
+        m = re.search(r"```(?:json)?\s*([\s\S]*?)```", s, flags=re.IGNORECASE)
+        if m:
+            candidates.append(m.group(1).strip())
+        l, r = s.find('{'), s.rfind('}')
+        if l != -1 and r > l:
+            candidates.append(s[l:r + 1])
+        for c in candidates:
+            try:
+                obj = json.loads(c)
+            except ValueError:
+                continue
+            if isinstance(obj, dict) and isinstance(obj.get('sections'), dict):
+                return {str(k): v for k, v in obj['sections'].items() if isinstance(v, list)}
+        return None
+
+    def _to_items(self, data: list, max_items) -> list:
+        items = []
+        for it in data:
+            if not isinstance(it, dict) or not it.get('title'):
+                continue
+            published = None
+            ts = it.get('published_at')
+            if isinstance(ts, str) and ts:
+                try:
+                    published = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+                except ValueError:
+                    published = None
+            items.append(CollectorItem(
+                title=str(it.get('title', '')),
+                url=str(it.get('url') or ''),
+                summary=str(it.get('summary') or ''),
+                published_at=published
+            ))
+        try:
+            mi = int(max_items)
+            if mi > 0:
+                items = items[:mi]
+        except (TypeError, ValueError):
+            pass
+        return items
+
+    def fetch_batch(self, sections: list) -> dict | None:
+        """sections: [(section_name, config)]，返回 {section_name: CollectorResult}
+
+        包含输出中出现的所有板块（没有新闻的板块为空结果，不再单独调用）；输出中缺少的板块不在结果中，
+        整次调用失败或输出无法解析时返回 None，由调用方逐个回退。
+        """
+        if not sections:
+            return {}
+        first = sections[0][1] or {}
+        breaker = health.registry.get(health.gemini_key(first))
+        if not breaker.allow():
+            print(f"[GeminiCollector] 熔断中，跳过合并调用: {breaker.key}")
+            return None
+        cmd = self._resolve_cmd(first)
+        args, env = self._prepare_cli(first)
+        names = [name for name, _ in sections]
+        print(f"[GeminiCollector] batch call for {len(sections)} sections: {names}")
+        try:
+            out = self._run_gemini(self._batch_prompt(sections), [cmd] + (args or []),
+                                   timeout=first.get('timeout', 120), env=env)
+        except Exception as e:
+            print(f"[GeminiCollector] batch call failed: {e}")
+            if current_deadline().cancelled:
+                breaker.release_probe()
+            else:
+                breaker.record_failure(str(e))
+            return None
+        out = (out or '').strip()
+        parsed = self._parse_batch(self._clean_output(out) or out)
+        if parsed is None:
+            # CLI 本身可用，只是没按格式输出：不计入熔断，交给逐个板块调用
+            print(f"[GeminiCollector] batch output not parseable, head: {out[:120]}")
+            breaker.release_probe()
+            return None
+        # 键先精确匹配，再忽略大小写与首尾空白
+        loose = {k.strip().lower(): v for k, v in parsed.items()}
+        results = {}
+        for name, cfg in sections:
+            data = parsed.get(name)
+            if data is None:
+                data = loose.get(name.strip().lower())
+            if data is None:
+                continue
+            results[name] = CollectorResult(items=self._to_items(data, (cfg or {}).get('max_items', 10)))
+        # 输出能解析说明 CLI 可用，即使某些板块没有新闻
+        breaker.record_success()
+        return results
@@ -1,23 +1,59 @@
 import feedparser
-from .base import Collector, CollectorResult, CollectorItem
+import requests
+from .base import Collector, CollectorItem, FetchCancelled, current_deadline
 from datetime import datetime
-from typing import List
+import health
+
+USER_AGENT = 'Mozilla/5.0 (compatible; DailyNews/0.1; +https://github.com/EngelsVon/DailyNews)'
 
 class RSSCollector(Collector):
-    def fetch(self, section_name: str, config: dict) -> CollectorResult:
+    def iter_items(self, section_name: str, config: dict):
+        """逐个源下载解析，每个源解析完即产出其条目（fetch() 由基类汇总）"""
         urls = config.get('rss_urls', [])
         max_items = int(config.get('max_items', 20))
-        items: List[CollectorItem] = []
+        timeout = float(config.get('timeout', 20))
+        deadline = current_deadline()
+        errors = []
         for url in urls:
-            d = feedparser.parse(url)
+            if deadline.cancelled:
+                raise FetchCancelled(f"RSS 采集已取消，剩余源未处理: {url}")
+            breaker = health.registry.get(health.rss_key(url))
+            # 熔断中的源直接跳过，不再占用采集线程
+            if not breaker.allow():
+                errors.append(f"{url}: 熔断中")
+                continue
+            try:
+                # feedparser.parse(url) 没有超时，先用 requests 限时下载再解析
+                resp = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=deadline.timeout(timeout))
+                d = feedparser.parse(resp.content, response_headers={
+                    'content-location': resp.url,
+                    'content-type': resp.headers.get('content-type', ''),
+                })
+                d['status'] = resp.status_code
+            except Exception as e:
+                if deadline.cancelled:
+                    # 截止时间导致的中断不计入数据源失败，只交还半开探测
+                    breaker.release_probe()
+                    raise FetchCancelled(f"RSS 采集已取消: {url}")
+                breaker.record_failure(str(e))
+                errors.append(f"{url}: {e}")
+                continue
+            status = getattr(d, 'status', 200)
+            if (status and status >= 400) or (getattr(d, 'bozo', False) and not d.entries):
+                err = f"HTTP {status}" if status and status >= 400 else str(getattr(d, 'bozo_exception', 'parse error'))
+                breaker.record_failure(err)
+                errors.append(f"{url}: {err}")
+                continue
+            breaker.record_success()
             for entry in d.entries[:max_items]:
                 published = None
                 if hasattr(entry, 'published_parsed') and entry.published_parsed:
                     published = datetime(*entry.published_parsed[:6])
-                items.append(CollectorItem(
+                yield CollectorItem(
                     title=getattr(entry, 'title', ''),
                     url=getattr(entry, 'link', ''),
                     summary=getattr(entry, 'summary', ''),
                     published_at=published
-                ))
-        return CollectorResult(items=items)
\ No newline at end of file
+                )
+            del d, resp  # 下一个源下载前释放上一个源的响应与解析结果
+        return '; '.join(errors) or None
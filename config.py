@@ -18,18 +18,112 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(DATA_DIR, 'dailynews.db')}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # 存储层：SQLite WAL + 单写线程批量提交
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+    WRITE_BATCH_MAX = int(os.environ.get('WRITE_BATCH_MAX', '200'))  # 每个事务最多合并的写操作数
+    WRITE_BATCH_WAIT_MS = int(os.environ.get('WRITE_BATCH_WAIT_MS', '50'))  # 等待凑批的最长时间
+    DB_READONLY_POOL_SIZE = int(os.environ.get('DB_READONLY_POOL_SIZE', '4'))  # MCP 等只读进程的连接池大小
+
     # Scheduler settings
     SCHEDULER_API_ENABLED = True
+    # 定时任务由持有 scheduler 租约的进程执行：embedded=python app.py 进程内参与选举，worker=只由 python worker.py 执行
+    SCHEDULER_MODE = os.environ.get('SCHEDULER_MODE', 'embedded').strip().lower()
+    LEADER_LEASE_SECONDS = float(os.environ.get('LEADER_LEASE_SECONDS', '30'))  # 租约有效期，持有者每 1/3 有效期续期一次
+    WORKER_SYNC_SECONDS = float(os.environ.get('WORKER_SYNC_SECONDS', '30'))  # 同步其他进程对板块配置的修改
+    WORKER_METRICS_SECONDS = float(os.environ.get('WORKER_METRICS_SECONDS', '15'))  # worker 把指标快照写入数据库的间隔
+    TRANSLATION_LEASE_SECONDS = float(os.environ.get('TRANSLATION_LEASE_SECONDS', '900'))  # 后台翻译跨进程互斥租约
+    UND_TRANSLATE_MAX_ATTEMPTS = int(os.environ.get('UND_TRANSLATE_MAX_ATTEMPTS', '3'))  # 语言无法识别且译文与原文相同的条目最多重试次数
+    GLOSSARY_REFRESH_SECONDS = float(os.environ.get('GLOSSARY_REFRESH_SECONDS', '10'))  # 检查术语表是否被修改的间隔
+    SCHEDULER_JOBSTORE = os.environ.get('SCHEDULER_JOBSTORE', 'db').strip().lower()  # db=任务状态持久化到数据库，memory=不持久化
+    SCHEDULER_CATCHUP_WINDOW_SECONDS = float(os.environ.get('SCHEDULER_CATCHUP_WINDOW_SECONDS', '300'))  # 启动时补跑过期任务的分散窗口
 
     # News settings
     DEFAULT_UPDATE_INTERVAL_MINUTES = int(os.environ.get('DEFAULT_UPDATE_INTERVAL_MINUTES', '60'))
+    FRAGMENT_CACHE_SECONDS = float(os.environ.get('FRAGMENT_CACHE_SECONDS', '30'))  # 首页板块条目片段缓存时长
+    FEEDS_ENABLED = os.environ.get('FEEDS_ENABLED', '1') not in ('0', 'false', 'False', '')  # 板块 Atom / JSON Feed（/feeds/<id>.atom|.json）
+    FEEDS_DIR = os.environ.get('FEEDS_DIR', os.path.join(DATA_DIR, 'feeds'))  # 预生成 feed 文件目录
+    FEED_MAX_ITEMS = int(os.environ.get('FEED_MAX_ITEMS', '50'))  # 每个 feed 的最新条目数
+    FEED_DEBOUNCE_SECONDS = float(os.environ.get('FEED_DEBOUNCE_SECONDS', '2'))  # 合并短时间内多次提交后再重新生成
+    SUMMARY_COMPRESS_MIN_CHARS = int(os.environ.get('SUMMARY_COMPRESS_MIN_CHARS', '0'))  # 摘要全文不短于该长度时压缩存储，0 表示不压缩
+
+    # 近重复识别：URL 归一化 + 标题 MinHash/LSH（板块 config_json 可用 near_dedup=false 关闭）
+    DEDUP_NEAR_ENABLED = os.environ.get('DEDUP_NEAR_ENABLED', '1') not in ('0', 'false', 'False', '')
+    DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', '0.7'))  # 标题相似度（估计 Jaccard）阈值
+    DEDUP_WINDOW_HOURS = int(os.environ.get('DEDUP_WINDOW_HOURS', '72'))  # 只与该时间窗口内的条目比较
+
+    # 自适应轮询（板块 config_json 可用 adaptive / min_interval_minutes / max_interval_minutes 覆盖）
+    ADAPTIVE_POLLING = os.environ.get('ADAPTIVE_POLLING', '1') not in ('0', 'false', 'False', '')
+    ADAPTIVE_TARGET_NEW = float(os.environ.get('ADAPTIVE_TARGET_NEW', '3'))  # 期望每次轮询的新增条数
+    ADAPTIVE_MIN_FACTOR = float(os.environ.get('ADAPTIVE_MIN_FACTOR', '0.25'))  # 最短间隔 = 基础间隔 × 该系数
+    ADAPTIVE_MAX_FACTOR = float(os.environ.get('ADAPTIVE_MAX_FACTOR', '8'))  # 最长间隔 = 基础间隔 × 该系数
+    POLL_STATE_PATH = os.environ.get('POLL_STATE_PATH', os.path.join(DATA_DIR, 'poll_state.json'))  # 自适应轮询学习结果（多进程共享）
+    SCHEDULE_JITTER_RATIO = float(os.environ.get('SCHEDULE_JITTER_RATIO', '0.1'))  # 触发抖动占间隔的比例
+
+    # 采集任务截止时间与重叠控制（板块 config_json 可用 deadline_seconds 覆盖）
+    FETCH_DEADLINE_SECONDS = float(os.environ.get('FETCH_DEADLINE_SECONDS', '180'))
+    INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', '50'))  # 边采集边入库：每读到这么多条去重并提交一次
+    FETCH_MISFIRE_GRACE_SECONDS = int(os.environ.get('FETCH_MISFIRE_GRACE_SECONDS', '300'))
+
+    # 数据源熔断：连续失败达到阈值后打开，按指数退避后半开探测
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '3'))
+    CIRCUIT_BASE_BACKOFF_SECONDS = float(os.environ.get('CIRCUIT_BASE_BACKOFF_SECONDS', '300'))
+    CIRCUIT_MAX_BACKOFF_SECONDS = float(os.environ.get('CIRCUIT_MAX_BACKOFF_SECONDS', '21600'))
+    CIRCUIT_PROBE_TIMEOUT_SECONDS = float(os.environ.get('CIRCUIT_PROBE_TIMEOUT_SECONDS', '600'))  # 半开探测未报告结果时多久后重新放行
+    SOURCE_HEALTH_PATH = os.environ.get('SOURCE_HEALTH_PATH', os.path.join(DATA_DIR, 'source_health.json'))  # 熔断状态（多进程共享）
+
+    # 网页爬虫（fetch_method='crawler'，见 collectors/crawler_collector.py）
+    CRAWLER_CONCURRENCY = int(os.environ.get('CRAWLER_CONCURRENCY', '8'))  # 所有爬虫板块共享的最大并发请求数
+    CRAWLER_DOMAIN_DELAY_SECONDS = float(os.environ.get('CRAWLER_DOMAIN_DELAY_SECONDS', '1.0'))  # 同一域名两次请求的最小间隔
+    CRAWLER_MAX_CRAWL_DELAY_SECONDS = float(os.environ.get('CRAWLER_MAX_CRAWL_DELAY_SECONDS', '30'))  # robots.txt Crawl-delay 的上限
+    CRAWLER_ROBOTS_TTL_SECONDS = int(os.environ.get('CRAWLER_ROBOTS_TTL_SECONDS', '3600'))
+    CRAWLER_MAX_PAGE_BYTES = int(os.environ.get('CRAWLER_MAX_PAGE_BYTES', str(2 * 1024 * 1024)))  # 单页最多读取的字节数
+    CRAWLER_CACHE_ENTRIES = int(os.environ.get('CRAWLER_CACHE_ENTRIES', '5000'))  # ETag/Last-Modified 缓存的 URL 数
 
     # Gemini CLI
     GEMINI_CLI_CMD = os.environ.get('GEMINI_CLI_CMD', 'gemini')
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+    # 合并采集（默认关闭）：同时到期、CLI 配置相同的 gemini 板块合并为一次调用，板块 config_json 中 batch=false 可退出
+    GEMINI_BATCH_ENABLED = os.environ.get('GEMINI_BATCH_ENABLED', '0') not in ('0', 'false', 'False', '')
+    GEMINI_BATCH_WINDOW_SECONDS = float(os.environ.get('GEMINI_BATCH_WINDOW_SECONDS', '10'))  # 首个板块等待同组板块加入的时间
+    GEMINI_BATCH_MAX_SECTIONS = int(os.environ.get('GEMINI_BATCH_MAX_SECTIONS', '5'))  # 每次调用最多合并的板块数
+    GEMINI_BATCH_PULL_AHEAD = float(os.environ.get('GEMINI_BATCH_PULL_AHEAD', '0.5'))  # 下次运行在 该比例×间隔 内的同组板块提前并入，0 不提前
 
     # MyMemory API
     MYMEMORY_EMAIL = os.environ.get('MYMEMORY_EMAIL', '')
+    MYMEMORY_API_URL = os.environ.get('MYMEMORY_API_URL', 'https://api.mymemory.translated.net/get')
+
+    # Web 服务地址（MCP 等外部进程读取 /metrics 时使用）
+    DAILYNEWS_BASE_URL = os.environ.get('DAILYNEWS_BASE_URL', 'http://127.0.0.1:5000')
+
+    # 新条目/新译文 SSE 推送
+    EVENTS_POLL_SECONDS = float(os.environ.get('EVENTS_POLL_SECONDS', '3'))  # 发现其他进程写入的轮询间隔
+    EVENTS_KEEPALIVE_SECONDS = float(os.environ.get('EVENTS_KEEPALIVE_SECONDS', '15'))
+    EVENTS_MAX_STREAM_SECONDS = float(os.environ.get('EVENTS_MAX_STREAM_SECONDS', '300'))  # 单个连接最长时间，之后客户端自动重连
+    EVENTS_RETRY_MS = int(os.environ.get('EVENTS_RETRY_MS', '3000'))
+    EVENTS_RETENTION_HOURS = int(os.environ.get('EVENTS_RETENTION_HOURS', '48'))
+
+    # 请求/SQL 性能诊断（默认关闭；开启后提供计时响应头、慢请求/慢 SQL 日志和 /debug/profile）
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') not in ('0', 'false', 'False', '')
+    PROFILE_SLOW_REQUEST_MS = float(os.environ.get('PROFILE_SLOW_REQUEST_MS', '500'))
+    PROFILE_SLOW_SQL_MS = float(os.environ.get('PROFILE_SLOW_SQL_MS', '100'))
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '1.0'))  # 慢请求日志采样比例
+    PROFILE_EXPLAIN = os.environ.get('PROFILE_EXPLAIN', '1') not in ('0', 'false', 'False', '')
+
+    # 数据保留与归档（默认关闭，需显式开启；板块可在 config_json 中用 retention_days / retention_max_items 覆盖）
+    RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', '0'))  # 0 表示不按时间归档
+    RETENTION_MAX_ITEMS_PER_SECTION = int(os.environ.get('RETENTION_MAX_ITEMS_PER_SECTION', '0'))  # 0 表示不限
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join(DATA_DIR, 'archive'))
+    MAINTENANCE_REPORT_PATH = os.environ.get('MAINTENANCE_REPORT_PATH', os.path.join(DATA_DIR, 'maintenance_report.json'))
+    MAINTENANCE_INTERVAL_HOURS = int(os.environ.get('MAINTENANCE_INTERVAL_HOURS', '24'))  # 0 禁用定期归档/VACUUM
+
+    # 每日摘要快照：每天 DIGEST_HOUR:DIGEST_MINUTE（DIGEST_TIMEZONE）固化前一天各板块的重点条目
+    DIGEST_ENABLED = os.environ.get('DIGEST_ENABLED', '1') not in ('0', 'false', 'False', '')
+    DIGEST_TIMEZONE = os.environ.get('DIGEST_TIMEZONE', 'UTC')
+    DIGEST_HOUR = int(os.environ.get('DIGEST_HOUR', '0'))
+    DIGEST_MINUTE = int(os.environ.get('DIGEST_MINUTE', '15'))
+    DIGEST_ITEMS_PER_SECTION = int(os.environ.get('DIGEST_ITEMS_PER_SECTION', '10'))
+    DIGEST_BACKFILL_DAYS = int(os.environ.get('DIGEST_BACKFILL_DAYS', '7'))  # 停机错过的日期在下次运行时补齐
+    DIGESTS_DIR = os.environ.get('DIGESTS_DIR', os.path.join(DATA_DIR, 'digests'))  # 静态 HTML/JSON 导出目录
 
 class DevConfig(Config):
     DEBUG = True
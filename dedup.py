@@ -0,0 +1,211 @@
+"""
+跨来源/跨板块的近重复新闻识别
+
+- canonical_url：去掉跟踪参数、片段、www.、末尾斜杠，arXiv abs/pdf/版本号归一
+- 标题 MinHash 签名（字符 3-gram）+ LSH 分桶：相似度超过阈值的标题大概率落入同一桶；
+  桶键里带上标题中的数字，只差编号的模板化标题（"Paper 1"、"Paper 2"）不会挤进同一个桶
+- 候选再用签名估计 Jaccard 相似度复核，并要求标题中的数字（版本号、金额等）一致、
+  实词只允许单侧增删而不能互相替换（"Google cuts jobs" 与 "Meta cuts jobs" 不是同一新闻）
+
+只依赖标准库；签名与分桶键由 app.ingest_items 持久化，查询限定在时间窗口内。
+"""
+import hashlib
+import re
+import struct
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 阈值约 (1/BANDS) ** (1/ROWS) ≈ 0.5，命中后再按 threshold 复核
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 8  # 太短的标题不做近重复判断，只按 URL 去重
+
+_SIG = struct.Struct(f'<{NUM_PERM}I')
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'ref_src',
+    'ref_url', 'referrer', 'source', 'src', 'cmpid', 'ncid', 'ocid', 'spm', 'share', 'smid', 'sr_share',
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', 'feature', 'taid', 'mod', 'rss', 'output',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hsa_', 'at_', 'vero_', 'oly_')
+_ARXIV_ID = re.compile(r'^/(?:abs|pdf)/([^/]+?)(?:v\d+)?(?:\.pdf)?/?$')
+_SOURCE_SUFFIX = re.compile(r'\s+[-|–—:]\s+[^-|–—]{1,40}$')
+_NON_WORD = re.compile(r'[^\w\s]+', re.UNICODE)
+_WS = re.compile(r'\s+')
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)*')
+_LATIN_WORD = re.compile(r'^[a-z0-9]+$')
+# 不参与“实词替换”判断的词：虚词与转载时常加的修饰语
+STOPWORDS = frozenset('''
+a an the and or but of to in on at for with by from as into over after before about amid than via vs
+is are was were be been being it its this that these those new says said report reports exclusive
+breaking update updated live watch video analysis opinion sources source just now
+'''.split())
+
+
+def canonical_url(url: str | None) -> str:
+    """同一篇文章的不同 URL 写法归一为同一个字符串；无法解析时原样返回（去空白）"""
+    url = (url or '').strip()
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return url
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.startswith('m.') and host.count('.') >= 2:
+        host = host[2:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if host in ('arxiv.org', 'export.arxiv.org'):
+        host = 'arxiv.org'
+        m = _ARXIV_ID.match(path)
+        if m:
+            path = f'/abs/{m.group(1)}'
+    if len(path) > 1:
+        path = path.rstrip('/')
+        for index_page in ('/index.html', '/index.htm', '/index.php'):
+            if path.endswith(index_page):
+                path = path[:-len(index_page)] or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    query.sort()
+    # 协议统一为 https：同一文章的 http/https 链接视为相同
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def normalize_title(title: str | None) -> str:
+    """小写、全半角归一、去掉标点和 " - 来源名" 之类的后缀"""
+    text = unicodedata.normalize('NFKC', title or '').strip()
+    stripped = _SOURCE_SUFFIX.sub('', text)
+    # 只有后缀明显短于正文时才当作来源名去掉
+    if len(stripped) >= 2 * (len(text) - len(stripped)):
+        text = stripped
+    text = _NON_WORD.sub(' ', text.lower())
+    return _WS.sub(' ', text).strip()
+
+
+def title_numbers(title: str | None) -> tuple:
+    """标题中依次出现的数字（版本号、金额、年份），数字不同的标题不视为同一新闻"""
+    return tuple(_NUMBER.findall(unicodedata.normalize('NFKC', title or '')))
+
+
+def _features(title: str) -> tuple:
+    """(数字集合, 实词集合, 是否全为拉丁字母/数字词)"""
+    words = {w for w in normalize_title(title).split() if w not in STOPWORDS}
+    return title_numbers(title), words, all(_LATIN_WORD.match(w) for w in words)
+
+
+def _compatible_features(fa: tuple, fb: tuple) -> bool:
+    if fa[0] != fb[0]:
+        return False
+    if not (fa[2] and fb[2]):
+        return True  # 中日韩等不以空格分词的标题只看签名相似度
+    return not (fa[1] - fb[1] and fb[1] - fa[1])
+
+
+def compatible(title_a: str, title_b: str) -> bool:
+    """签名相似之外的复核：数字一致，且拉丁文字标题的实词只在一侧有增删"""
+    return _compatible_features(_features(title_a), _features(title_b))
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def minhash(shingle_set) -> list | None:
+    """NUM_PERM 个 32 位最小哈希值；shingle 太少时返回 None
+
+    每个 shingle 用一次 SHAKE-128 输出 NUM_PERM 个独立的 32 位哈希，按位置取最小值，
+    与进程、版本无关，签名可以持久化。
+    """
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+    rows = [_SIG.unpack(hashlib.shake_128(s.encode('utf-8')).digest(_SIG.size)) for s in shingle_set]
+    return [min(col) for col in zip(*rows)]
+
+
+def title_signature(title: str | None) -> list | None:
+    return minhash(shingles(normalize_title(title)))
+
+
+def band_keys(sig, title: str = '') -> list:
+    """每个 band 的桶键（有符号 63 位整数，便于存进 BIGINT 列），键中包含 band 序号与标题中的数字"""
+    salt = ' '.join(title_numbers(title)).encode('utf-8')
+    keys = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS]
+        raw = struct.pack(f'<H{ROWS}I', band, *chunk) + salt
+        keys.append(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), 'little') & ((1 << 63) - 1))
+    return keys
+
+
+def similarity(sig_a, sig_b) -> float:
+    """签名中相同位置取值相等的比例 ≈ 两个 shingle 集合的 Jaccard 相似度"""
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def pack(sig) -> bytes | None:
+    return _SIG.pack(*sig) if sig else None
+
+
+def unpack(blob: bytes | None) -> list | None:
+    if not blob or len(blob) != _SIG.size:
+        return None
+    return list(_SIG.unpack(blob))
+
+
+def is_near_duplicate(title_a: str, sig_a, title_b: str, sig_b, threshold: float) -> bool:
+    return similarity(sig_a, sig_b) >= threshold and compatible(title_a, title_b)
+
+
+class LSHIndex:
+    """内存中的 LSH 索引：同一批入库条目之间互查，也用于离线评测"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._entries = {}
+
+    def add(self, key, title: str, sig, bands=None):
+        if not sig:
+            return
+        self._entries[key] = (title, sig, None)
+        for b in bands or band_keys(sig, title):
+            self._buckets.setdefault(b, []).append(key)
+
+    def query(self, title: str, sig, threshold: float, bands=None):
+        """返回最相似的已有 key（没有超过阈值的则为 None）"""
+        if not sig:
+            return None
+        seen = set()
+        features = None
+        best, best_score = None, threshold
+        for b in bands or band_keys(sig, title):
+            for key in self._buckets.get(b, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                other_title, other_sig, other_features = self._entries[key]
+                score = similarity(sig, other_sig)
+                if score < best_score:
+                    continue
+                # 复核用的特征按需计算并缓存
+                features = features or _features(title)
+                if other_features is None:
+                    other_features = _features(other_title)
+                    self._entries[key] = (other_title, other_sig, other_features)
+                if _compatible_features(features, other_features):
+                    best, best_score = key, score
+        return best
+
+    def __len__(self):
+        return len(self._entries)
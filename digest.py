@@ -0,0 +1,100 @@
+"""
+每日摘要快照（daily digest）
+
+每晚把前一天（DIGEST_TIMEZONE 的自然日）各板块的重点条目连同译文固化到 daily_digests 表，
+并导出静态 HTML/JSON 到 DIGESTS_DIR。历史日期的浏览、API 与 MCP get_digest 只读快照，
+不再扫描不断增长的 news_items；条目之后被归档也不影响已生成的快照。
+
+重点条目的排序：跨板块转载次数（同簇条目数）多的在前，其次按发布时间从新到旧。
+"""
+import json
+import os
+import tempfile
+import zlib
+from datetime import date, datetime, time, timedelta, UTC
+from zoneinfo import ZoneInfo
+
+SCHEMA_VERSION = 1
+
+
+def parse_day(text: str | None) -> date | None:
+    try:
+        return date.fromisoformat((text or '').strip())
+    except ValueError:
+        return None
+
+
+def today(tz_name: str) -> date:
+    return datetime.now(ZoneInfo(tz_name)).date()
+
+
+def day_bounds(day: date, tz_name: str) -> tuple:
+    """该自然日在数据库中的时间范围 [start, end)（无时区的 UTC，与 created_at 一致）"""
+    tz = ZoneInfo(tz_name)
+    start = datetime.combine(day, time.min, tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+    return start, end
+
+
+def _iso(dt: datetime | None) -> str | None:
+    return dt.isoformat() if dt else None
+
+
+def rank_items(rows, cluster_sizes: dict, limit: int) -> list:
+    """rows 为一个板块当天的条目，返回排好序的前 limit 条（dict）"""
+    def size(r):
+        return cluster_sizes.get(r.cluster_id, 1) if r.cluster_id else 1
+
+    ranked = sorted(rows, key=lambda r: (size(r), r.published_at or r.created_at or datetime.min, r.id), reverse=True)
+    return [{
+        'id': r.id,
+        'title': r.title,
+        'title_translated': r.title_translated or '',
+        'url': r.url or '',
+        'summary': r.summary_preview or '',
+        'summary_translated': r.summary_translated_preview or '',
+        'published_at': _iso(r.published_at),
+        'created_at': _iso(r.created_at),
+        'coverage': size(r),
+    } for r in ranked[:limit]]
+
+
+def build_payload(day: date, tz_name: str, sections: list) -> dict:
+    """sections: [{'id', 'name', 'description', 'total', 'items'}]"""
+    return {
+        'schema': SCHEMA_VERSION,
+        'date': day.isoformat(),
+        'timezone': tz_name,
+        'generated_at': datetime.now(UTC).replace(microsecond=0).isoformat(),
+        'item_count': sum(s['total'] for s in sections),
+        'sections': sections,
+    }
+
+
+def encode(payload: dict) -> bytes:
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def decode(blob: bytes | None) -> dict | None:
+    if not blob:
+        return None
+    try:
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+    except (zlib.error, ValueError):
+        return None
+
+
+def export(directory: str, payload: dict, html: str):
+    """写出 <date>.json 与 <date>.html（原子替换，可直接交给静态文件服务器）"""
+    os.makedirs(directory, exist_ok=True)
+    day = payload['date']
+    files = {
+        f'{day}.json': json.dumps(payload, ensure_ascii=False, indent=1).encode('utf-8'),
+        f'{day}.html': html.encode('utf-8'),
+    }
+    for name, data in files.items():
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.digest.')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, os.path.join(directory, name))
@@ -0,0 +1,70 @@
+"""
+新条目 / 新译文事件推送（Server-Sent Events）
+
+事件持久化在 item_events 表（自增 id 即 SSE 的事件 id，断线后按 Last-Event-ID 续传）；
+本进程内的写入通过 EventBus.publish 立即唤醒等待中的连接，
+其他进程（MCP、独立 worker）的写入由共享轮询发现：无论多少连接，
+每个进程每 poll_seconds 最多查询一次 MAX(id)，空闲看板几乎没有开销。
+"""
+import json
+import threading
+import time
+
+
+class EventBus:
+    def __init__(self, poll_seconds: float = 3.0):
+        self.poll_seconds = poll_seconds
+        self.latest_id = 0
+        self._cond = threading.Condition()
+        self._poll_lock = threading.Lock()
+        self._last_poll = 0.0
+
+    def publish(self, event_id: int | None):
+        """记录最新事件 id 并唤醒所有等待者"""
+        if not event_id:
+            return
+        with self._cond:
+            if event_id > self.latest_id:
+                self.latest_id = event_id
+                self._cond.notify_all()
+
+    def _maybe_poll(self, poll_fn):
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_seconds or not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_poll = now
+            self.publish(poll_fn())
+        except Exception as e:
+            print(f"[Events] poll failed: {e}")
+        finally:
+            self._poll_lock.release()
+
+    def wait(self, last_id: int, timeout: float, poll_fn) -> int:
+        """阻塞到出现比 last_id 新的事件或超时，返回当前最新 id"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self.latest_id > last_id:
+                    return self.latest_id
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.latest_id
+            self._maybe_poll(poll_fn)
+            with self._cond:
+                if self.latest_id > last_id:
+                    return self.latest_id
+                self._cond.wait(min(self.poll_seconds, remaining))
+
+
+def format_sse(data, event: str | None = None, event_id: int | None = None, retry_ms: int | None = None) -> str:
+    lines = []
+    if retry_ms:
+        lines.append(f'retry: {int(retry_ms)}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    lines.extend(f'data: {line}' for line in payload.split('\n'))
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,213 @@
+"""
+按板块预生成的 Atom / JSON Feed
+
+入库、后台翻译、归档提交后把板块标记为待更新（FeedPublisher.mark），后台线程稍作合并后重新生成；
+每个板块四份：Atom / JSON Feed × 原文 / 译文（译文缺失时回退原文），连同 gzip 版本与
+ETag/Last-Modified 一起写在 FEEDS_DIR（默认 data/feeds）下。订阅请求只读文件，不查库也不渲染模板。
+内容未变化时不改写文件，ETag 与 Last-Modified 保持不变。
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, UTC
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from config import DevConfig
+
+FORMATS = {
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _rfc3339(dt: datetime | None) -> str:
+    """数据库中的时间按 UTC 存储（无时区），输出为 2025-01-01T00:00:00Z"""
+    dt = dt or _EPOCH
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None) - dt.utcoffset()
+    return dt.replace(microsecond=0).isoformat() + 'Z'
+
+
+def feed_name(section_id: int, fmt: str, translated: bool = False) -> str:
+    return f"{section_id}{'.translated' if translated else ''}.{fmt}"
+
+
+def _entry_fields(it: dict, translated: bool) -> tuple:
+    title, summary = it['title'], it['summary']
+    if translated:
+        title = it.get('title_translated') or title
+        summary = it.get('summary_translated') or summary
+    return title, summary
+
+
+def _updated(it: dict) -> datetime:
+    return max(d for d in (it.get('translated_at'), it.get('created_at'), _EPOCH) if d)
+
+
+def render_atom(meta: dict, items: list, translated: bool = False) -> bytes:
+    """meta: {id, title, description, html_url, self_url, language}；items 按新到旧排列"""
+    updated = max((_updated(it) for it in items), default=_EPOCH)
+    out = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        f'<feed xmlns="http://www.w3.org/2005/Atom" xml:lang={quoteattr(meta["language"])}>',
+        f'<id>{escape(meta["id"])}</id>',
+        f'<title>{escape(meta["title"])}</title>',
+        f'<subtitle>{escape(meta["description"])}</subtitle>',
+        f'<updated>{_rfc3339(updated)}</updated>',
+        f'<link rel="alternate" type="text/html" href={quoteattr(meta["html_url"])}/>',
+        f'<link rel="self" type="application/atom+xml" href={quoteattr(meta["self_url"])}/>',
+        '<generator>DailyNews</generator>',
+    ]
+    for it in items:
+        title, summary = _entry_fields(it, translated)
+        out.append('<entry>')
+        out.append(f'<id>{escape(it["url"] or meta["id"] + ":item:" + str(it["id"]))}</id>')
+        out.append(f'<title>{escape(title)}</title>')
+        if it['url']:
+            out.append(f'<link rel="alternate" href={quoteattr(it["url"])}/>')
+        out.append(f'<published>{_rfc3339(it.get("published_at") or it.get("created_at"))}</published>')
+        out.append(f'<updated>{_rfc3339(_updated(it))}</updated>')
+        if summary:
+            out.append(f'<summary type="text">{escape(summary)}</summary>')
+        out.append('</entry>')
+    out.append('</feed>')
+    return '\n'.join(out).encode('utf-8')
+
+
+def render_json(meta: dict, items: list, translated: bool = False) -> bytes:
+    """JSON Feed 1.1（https://jsonfeed.org/version/1.1）"""
+    entries = []
+    for it in items:
+        title, summary = _entry_fields(it, translated)
+        entry = {
+            'id': str(it['id']),
+            'url': it['url'] or None,
+            'title': title,
+            'content_text': summary or title,
+            'date_published': _rfc3339(it.get('published_at') or it.get('created_at')),
+            'date_modified': _rfc3339(_updated(it)),
+        }
+        if translated and it.get('title_translated'):
+            # 译文版同时保留原文标题，便于下游对照
+            entry['_dailynews'] = {'original_title': it['title']}
+        entries.append({k: v for k, v in entry.items() if v is not None})
+    doc = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': meta['title'],
+        'description': meta['description'],
+        'home_page_url': meta['html_url'],
+        'feed_url': meta['self_url'],
+        'language': meta['language'],
+        'items': entries,
+    }
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+RENDERERS = {'atom': render_atom, 'json': render_json}
+
+
+class FeedStore:
+    """预生成的 feed 文件：<name>、<name>.gz、<name>.meta（etag / last_modified）"""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or DevConfig.FEEDS_DIR
+
+    def _path(self, name: str, suffix: str = '') -> str:
+        return os.path.join(self.directory, name + suffix)
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.feed.')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)  # mkstemp 默认 0600，静态文件服务器（nginx 等）也要能读
+        os.replace(tmp, path)
+
+    def save(self, name: str, body: bytes) -> bool:
+        """写入一份 feed；内容与现有文件相同时跳过，返回是否有变化
+
+        Last-Modified 取实际改写的时间，条目被归档后也不会倒退。
+        """
+        etag = hashlib.sha1(body).hexdigest()
+        current = self.meta(name)
+        if current and current.get('etag') == etag:
+            return False
+        os.makedirs(self.directory, exist_ok=True)
+        self._atomic_write(self._path(name), body)
+        self._atomic_write(self._path(name, '.gz'), gzip.compress(body, compresslevel=6, mtime=0))
+        meta = {'etag': etag, 'last_modified': format_datetime(datetime.now(UTC).replace(microsecond=0), usegmt=True)}
+        # meta 最后写入：读取方看到新 etag 时正文已经就位
+        self._atomic_write(self._path(name, '.meta'), json.dumps(meta).encode('utf-8'))
+        return True
+
+    def meta(self, name: str) -> dict | None:
+        try:
+            with open(self._path(name, '.meta'), 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def read(self, name: str, gzipped: bool = False) -> bytes | None:
+        try:
+            with open(self._path(name, '.gz' if gzipped else ''), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def delete_section(self, section_id: int):
+        for fmt in FORMATS:
+            for translated in (False, True):
+                name = feed_name(section_id, fmt, translated)
+                for suffix in ('', '.gz', '.meta'):
+                    try:
+                        os.remove(self._path(name, suffix))
+                    except OSError:
+                        pass
+
+
+def publish_section(store: FeedStore, meta_for, section_id: int, items: list) -> int:
+    """生成并保存一个板块的全部 feed，返回有变化的文件数；meta_for(fmt, translated) 返回 feed 元信息"""
+    changed = 0
+    for fmt, render in RENDERERS.items():
+        for translated in (False, True):
+            body = render(meta_for(fmt, translated), items, translated)
+            changed += store.save(feed_name(section_id, fmt, translated), body)
+    return changed
+
+
+class FeedPublisher:
+    """合并短时间内的多次标记，在后台线程中逐个板块重新生成"""
+
+    def __init__(self, render_fn, delay: float = 2.0):
+        self.render_fn = render_fn  # render_fn(section_id)
+        self.delay = delay
+        self._pending = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def mark(self, section_id: int):
+        with self._cond:
+            self._pending.add(section_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='feed-publisher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.delay)  # 同一轮翻译/采集的多次提交合并为一次生成
+            with self._cond:
+                batch, self._pending = self._pending, set()
+            for section_id in sorted(batch):
+                try:
+                    self.render_fn(section_id)
+                except Exception as e:
+                    print(f"[Feeds] section {section_id}: render failed: {e}")
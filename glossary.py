@@ -0,0 +1,146 @@
+"""
+服务端术语表：翻译前保护/替换术语（Aho-Corasick 多模式匹配）
+
+- 术语表保存在 glossary_terms 表，编译成一个自动机，一次扫描找出文本中所有术语（最左最长、不重叠）
+- 译名为空的术语保持原文（产品名、项目名等），其余替换为指定译名
+- 整段文本只由术语、数字、标点与空白组成时直接离线给出译文，不调用翻译服务
+- 其他文本：MyMemory 调用前把术语换成 {{n}} 占位符、返回后还原为译名；Gemini 在提示词中附上命中的术语
+英文术语按单词边界匹配，默认不区分大小写。
+"""
+import re
+from collections import deque
+
+_WORD = re.compile(r'[0-9A-Za-z]')
+_FILLER = re.compile(r'^[\W\d_]*$')  # 术语之间只剩数字、标点、空白
+_SLOT = re.compile(r'\{\{\s*(\d+)\s*\}\}')
+
+
+def _fold(ch: str) -> str:
+    # 逐字符小写且保持长度不变，匹配位置可直接对应原文
+    low = ch.lower()
+    return low if len(low) == 1 else ch
+
+
+class Automaton:
+    """Aho-Corasick 自动机：patterns 为已小写的字符串列表，find() 返回 (start, end, 模式下标)"""
+
+    def __init__(self, patterns: list):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.lengths = [len(p) for p in patterns]
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(idx)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str):
+        state = 0
+        for i, ch in enumerate(text):
+            ch = _fold(ch)
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for idx in self.out[state]:
+                yield i + 1 - self.lengths[idx], i + 1, idx
+
+
+class Glossary:
+    def __init__(self, terms: list):
+        """terms: [(source, target, case_sensitive)]；target 为空表示保持原文"""
+        self.terms = [(s, t or '', bool(cs)) for s, t, cs in terms if s and s.strip()]
+        self._automaton = Automaton([''.join(_fold(c) for c in s) for s, _, _ in self.terms]) if self.terms else None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def matches(self, text: str) -> list:
+        """文本中命中的术语：[(start, end, source, target)]，最左最长且不重叠"""
+        if not self._automaton or not text:
+            return []
+        found = []
+        for start, end, idx in self._automaton.find(text):
+            source, target, case_sensitive = self.terms[idx]
+            if case_sensitive and text[start:end] != source:
+                continue
+            # 英文术语要求单词边界，避免 "AI" 命中 "SAID"
+            if _WORD.match(source[0]) and start > 0 and _WORD.match(text[start - 1]):
+                continue
+            if _WORD.match(source[-1]) and end < len(text) and _WORD.match(text[end]):
+                continue
+            found.append((start, end, source, target))
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        picked, pos = [], 0
+        for m in found:
+            if m[0] >= pos:
+                picked.append(m)
+                pos = m[1]
+        return picked
+
+    @staticmethod
+    def _render(text: str, matches: list, replace) -> str:
+        out, pos = [], 0
+        for i, (start, end, source, target) in enumerate(matches):
+            out.append(text[pos:start])
+            out.append(replace(i, text[start:end], target))
+            pos = end
+        out.append(text[pos:])
+        return ''.join(out)
+
+    def translate_fully(self, text: str) -> str | None:
+        """整段只由术语组成（其余为数字、标点、空白）时返回离线译文，否则 None"""
+        matches = self.matches(text)
+        if not matches:
+            return None
+        pos = 0
+        for start, end, _, _ in matches:
+            if not _FILLER.match(text[pos:start]):
+                return None
+            pos = end
+        if not _FILLER.match(text[pos:]):
+            return None
+        return self._render(text, matches, lambda _i, original, target: target or original)
+
+    def protect(self, text: str) -> tuple:
+        """把术语换成 {{n}} 占位符，返回 (处理后的文本, 各占位符还原用的文字)"""
+        matches = self.matches(text)
+        if not matches:
+            return text, []
+        slots = [target or text[start:end] for start, end, _, target in matches]
+        return self._render(text, matches, lambda i, _original, _target: '{{%d}}' % i), slots
+
+    @staticmethod
+    def restore(text: str, slots: list) -> str:
+        if not slots:
+            return text
+        return _SLOT.sub(lambda m: slots[int(m.group(1))] if int(m.group(1)) < len(slots) else m.group(0), text)
+
+    def hints(self, text: str) -> str:
+        """Gemini 提示词中的术语说明；没有命中时为空字符串"""
+        lines = []
+        for _, _, source, target in self.matches(text):
+            line = f"{source} -> {target}" if target else f"{source}（保持原文）"
+            if line not in lines:
+                lines.append(line)
+        return ('术语表（必须按此翻译）：\n' + '\n'.join(lines)) if lines else ''
+
+
+EMPTY = Glossary([])
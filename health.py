@@ -0,0 +1,263 @@
+"""
+数据源健康追踪与熔断器
+
+每个数据源（RSS 主机、爬虫站点、arXiv、Gemini CLI）一个熔断器：
+- closed：正常放行，连续失败达到阈值后 -> open
+- open：直接拒绝，退避时间到后 -> half_open
+- half_open：只放行一次探测请求，成功 -> closed，失败 -> open 且退避时间翻倍；
+  探测方既不报告成功也不报告失败（被取消等）时调用 release_probe()，超过 probe_timeout 未报告也会重新放行
+
+状态保存在 SOURCE_HEALTH_PATH（默认 data/source_health.json，statefile.SharedJsonFile）：每次变化只合并写入该数据源的键，
+读取前检查文件是否被其他进程修改过，Web 进程与 worker 看到同一份状态，界面上的重置也会被 worker 采纳。
+MCP 服务等其他进程可直接读取。
+"""
+import os
+import threading
+import time
+from datetime import datetime, UTC
+from urllib.parse import urlparse
+
+import statefile
+from config import DevConfig
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+HEALTH_PATH = DevConfig.SOURCE_HEALTH_PATH
+
+
+def rss_key(url: str) -> str:
+    return 'rss:' + (urlparse(url or '').netloc.lower() or (url or ''))
+
+
+def crawler_key(url: str) -> str:
+    return 'crawler:' + (urlparse(url or '').netloc.lower() or (url or ''))
+
+
+def arxiv_key() -> str:
+    return 'arxiv:export.arxiv.org'
+
+
+def gemini_key(config: dict | None = None) -> str:
+    cmd = (config or {}).get('cmd') or os.environ.get('GEMINI_CLI_CMD') or DevConfig.GEMINI_CLI_CMD or 'gemini'
+    return 'gemini:' + os.path.basename(str(cmd)).lower()
+
+
+def section_source_keys(fetch_method: str, config: dict | None) -> list:
+    """板块涉及的数据源键，用于在界面上展示健康状态"""
+    config = config or {}
+    if fetch_method == 'rss':
+        return sorted({rss_key(u) for u in config.get('rss_urls', []) or []})
+    if fetch_method == 'crawler':
+        urls = config.get('start_urls', []) or []
+        return sorted({crawler_key(u) for u in ([urls] if isinstance(urls, str) else urls)})
+    if fetch_method == 'arxiv':
+        return [arxiv_key()]
+    if fetch_method == 'gemini':
+        return [gemini_key(config)]
+    return []
+
+
+class CircuitBreaker:
+    def __init__(self, key: str, failure_threshold: int, base_backoff: float, max_backoff: float, on_change=None,
+                 probe_timeout: float = 600.0):
+        self.key = key
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0  # 连续失败次数
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected = 0
+        self.backoff = 0.0
+        self.open_until = 0.0  # time.time() 时间戳
+        self.last_error = ''
+        self.last_failure_at = None
+        self.last_success_at = None
+        self._probe_in_flight = False
+        self._probe_started = 0.0  # time.monotonic()
+        self._lock = threading.Lock()
+        self._on_change = on_change
+
+    def allow(self) -> bool:
+        """是否允许本次请求；open 状态到期后放行一次半开探测"""
+        changed = False
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() >= self.open_until:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                changed = True
+            if (self.state == HALF_OPEN and self._probe_in_flight
+                    and time.monotonic() - self._probe_started >= self.probe_timeout):
+                # 探测方一直没有报告结果（线程卡住、遗漏的退出路径），重新放行一次
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                allowed = True
+            else:
+                self.rejected += 1
+                allowed = False
+                changed = True  # 拒绝次数也写回共享文件，其他进程刷新时不会丢失
+        if changed:
+            self._changed()
+        return allowed
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.backoff = 0.0
+            self.open_until = 0.0
+            self._probe_in_flight = False
+            self.total_successes += 1
+            self.last_success_at = datetime.now(UTC).isoformat()
+        # 成功次数/时间同样写回，其他进程展示的是最新数据
+        self._changed()
+
+    def record_failure(self, error: str = ''):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self.last_error = str(error or '')[:300]
+            self.last_failure_at = datetime.now(UTC).isoformat()
+            if self.state == HALF_OPEN:
+                # 探测失败：重新打开并指数退避
+                self.backoff = min(self.max_backoff, max(self.base_backoff, self.backoff * 2))
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.backoff = self.base_backoff
+                self._open()
+        self._changed()
+
+    def release_probe(self):
+        """allow() 放行后既没有成功也没有失败（被取消、被 robots.txt 禁止、输出无法判断）：交还探测机会，状态不变"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.backoff = 0.0
+            self.open_until = 0.0
+            self._probe_in_flight = False
+        self._changed()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.time() + self.backoff
+        self._probe_in_flight = False
+        print(f"[Health] circuit open: {self.key}, backoff={self.backoff:.0f}s, error={self.last_error[:120]}")
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change(self)
+
+    def to_dict(self) -> dict:
+        return {
+            'key': self.key,
+            'state': self.state,
+            'failures': self.failures,
+            'total_failures': self.total_failures,
+            'total_successes': self.total_successes,
+            'rejected': self.rejected,
+            'backoff_seconds': self.backoff,
+            'open_until': datetime.fromtimestamp(self.open_until, UTC).isoformat() if self.open_until else None,
+            'last_error': self.last_error,
+            'last_failure_at': self.last_failure_at,
+            'last_success_at': self.last_success_at,
+        }
+
+    def load(self, d: dict, restart: bool = False):
+        """restart=True 表示进程启动时的首次加载；运行中同步其他进程的修改时为 False"""
+        self.state = d.get('state', CLOSED)
+        self.failures = int(d.get('failures', 0))
+        self.total_failures = int(d.get('total_failures', 0))
+        self.total_successes = int(d.get('total_successes', 0))
+        self.rejected = int(d.get('rejected', 0))
+        self.backoff = float(d.get('backoff_seconds', 0.0))
+        self.last_error = d.get('last_error', '')
+        self.last_failure_at = d.get('last_failure_at')
+        self.last_success_at = d.get('last_success_at')
+        try:
+            self.open_until = datetime.fromisoformat(d['open_until']).timestamp() if d.get('open_until') else 0.0
+        except Exception:
+            self.open_until = 0.0
+        if self.state == HALF_OPEN and (restart or not self._probe_in_flight):
+            # 重启时（或其他进程发出的）未完成的探测视为未发生
+            self.state = OPEN
+        if self.state != HALF_OPEN:
+            self._probe_in_flight = False
+
+
+class HealthRegistry:
+    def __init__(self, path: str = HEALTH_PATH):
+        self.path = path
+        self.store = statefile.SharedJsonFile(path)
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _new(self, key: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            key,
+            failure_threshold=DevConfig.CIRCUIT_FAILURE_THRESHOLD,
+            base_backoff=DevConfig.CIRCUIT_BASE_BACKOFF_SECONDS,
+            max_backoff=DevConfig.CIRCUIT_MAX_BACKOFF_SECONDS,
+            on_change=self.save,
+            probe_timeout=DevConfig.CIRCUIT_PROBE_TIMEOUT_SECONDS,
+        )
+
+    def _load(self):
+        for key, d in self.store.read().items():
+            b = self._new(key)
+            b.load(d, restart=True)
+            self._breakers[key] = b
+
+    def _refresh(self):
+        """其他进程修改过状态文件时，把变化的数据源同步到本进程的熔断器"""
+        if not self.store.changed():
+            return
+        data = self.store.read()
+        with self._lock:
+            for key, d in data.items():
+                b = self._breakers.get(key)
+                if b is None:
+                    b = self._breakers[key] = self._new(key)
+                if b.to_dict() != d:
+                    with b._lock:
+                        b.load(d)
+
+    def get(self, key: str) -> CircuitBreaker:
+        self._refresh()
+        with self._lock:
+            b = self._breakers.get(key)
+            if b is None:
+                b = self._breakers[key] = self._new(key)
+            return b
+
+    def snapshot(self) -> dict:
+        self._refresh()
+        with self._lock:
+            return {k: b.to_dict() for k, b in self._breakers.items()}
+
+    def save(self, breaker: CircuitBreaker):
+        """只写回这一个数据源的键，不覆盖其他进程写入的状态"""
+        try:
+            self.store.update({breaker.key: breaker.to_dict()})
+        except Exception as e:
+            print(f"[Health] failed to save state: {e}")
+
+
+def read_snapshot(path: str = HEALTH_PATH) -> dict:
+    """只读方式读取健康状态（供 MCP 等其他进程使用）"""
+    return statefile.SharedJsonFile(path).read()
+
+
+registry = HealthRegistry()
@@ -0,0 +1,85 @@
+"""
+轻量语言识别（入库时调用，不依赖外部库）
+
+- 先按文字系统判断：汉字为主 -> zh，含假名 -> ja，谚文 -> ko，西里尔 -> ru 等
+- 拉丁字母文本按常用虚词命中数在 en/de/fr/es/it/pt/nl 中取最高者
+- 判断不出时返回 'und'（已检测、结果未知），与从未检测过的空字符串区分
+汉字按字计数、拉丁文字按词计数，"OpenAI 发布 GPT-5 新模型" 这类中英混排标题仍判为中文。
+"""
+import re
+
+UNDETERMINED = 'und'
+_SAMPLE_CHARS = 2000
+_LATIN_WORD = re.compile(r"[A-Za-zÀ-ɏ]+(?:'[A-Za-z]+)?")
+
+# 各语言最常见的虚词；只用于区分拉丁字母语言，不追求覆盖率
+_STOPWORDS = {
+    'en': 'the of and to in is for on with that by from as are at this be has was will its an new how why what',
+    'de': 'der die das und ist nicht mit für auf ein eine den dem von zu im sich des wird auch bei',
+    'fr': 'le la les et des est une pour dans que sur pas du au aux qui avec par sont ce',
+    'es': 'el la los las y es del que en por con para una un se al más como sus',
+    'it': 'il lo gli le di che è per una un con della dei nel sono non del alla',
+    'pt': 'o os as e do da dos das que em para com um uma não por ao é no na',
+    'nl': 'de het een en van is dat op te in met voor niet zijn door ook bij',
+}
+_STOPWORDS = {lang: frozenset(words.split()) for lang, words in _STOPWORDS.items()}
+
+# (起, 止, 文字系统)
+_SCRIPTS = (
+    (0x3040, 0x30FF, 'kana'), (0x31F0, 0x31FF, 'kana'),
+    (0x3400, 0x4DBF, 'han'), (0x4E00, 0x9FFF, 'han'), (0xF900, 0xFAFF, 'han'),
+    (0x1100, 0x11FF, 'hangul'), (0x3130, 0x318F, 'hangul'), (0xAC00, 0xD7AF, 'hangul'),
+    (0x0400, 0x04FF, 'ru'), (0x0370, 0x03FF, 'el'), (0x0590, 0x05FF, 'he'),
+    (0x0600, 0x06FF, 'ar'), (0x0900, 0x097F, 'hi'), (0x0E00, 0x0E7F, 'th'),
+)
+
+
+def _script(ch: str) -> str | None:
+    cp = ord(ch)
+    for lo, hi, name in _SCRIPTS:
+        if lo <= cp <= hi:
+            return name
+    return None
+
+
+def detect(text: str) -> str:
+    """返回语言主标签（zh / en / ja ...），无法判断时返回 'und'"""
+    text = (text or '')[:_SAMPLE_CHARS]
+    counts = {}
+    for ch in text:
+        if ch.isalpha() and ord(ch) > 0x24F:
+            name = _script(ch)
+            if name:
+                counts[name] = counts.get(name, 0) + 1
+    words = [w.lower() for w in _LATIN_WORD.findall(text)]
+    # 假名混在汉字中是日文的特征
+    if counts.get('kana', 0) * 10 >= counts.get('han', 0) + counts.get('kana', 0) > 0:
+        counts['ja'] = counts.pop('kana') + counts.pop('han', 0)
+    else:
+        counts.pop('kana', None)
+    if 'han' in counts:
+        counts['zh'] = counts.pop('han')
+    if 'hangul' in counts:
+        counts['ko'] = counts.pop('hangul')
+    if counts:
+        lang, n = max(counts.items(), key=lambda kv: kv[1])
+        if n >= len(words):
+            return lang
+    if not words:
+        return UNDETERMINED
+    scores = {lang: sum(1 for w in words if w in stop) for lang, stop in _STOPWORDS.items()}
+    lang, best = max(scores.items(), key=lambda kv: kv[1])
+    if best == 0:
+        return UNDETERMINED
+    # 平手时偏向英文（采集源以英文为主）
+    return 'en' if scores['en'] == best else lang
+
+
+def primary(tag: str) -> str:
+    """'zh-CN' / 'zh_TW' -> 'zh'"""
+    return re.split(r'[-_]', (tag or '').strip().lower(), 1)[0]
+
+
+def is_target(lang: str, target_lang: str) -> bool:
+    """已检测的语言是否就是目标语言（此时无需翻译）"""
+    return bool(lang) and lang != UNDETERMINED and lang == primary(target_lang)
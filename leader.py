@@ -0,0 +1,96 @@
+"""
+基于数据库的租约（lease）：多个进程之间选出唯一的调度者，或互斥执行某个任务
+
+租约是 leader_leases 表中的一行 (name, holder, expires_at)：
+- acquire()：租约空闲、已过期或本来就由自己持有时占有/续期，返回是否持有
+- 持有者需在 ttl 内反复 acquire() 续期；进程崩溃后租约到期即可被其他进程接管
+- release()：主动释放（只释放自己持有的）
+
+写操作经由单写线程（storage.WriteQueue）提交，SQLite 与其他数据库通用。
+"""
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import IntegrityError
+
+
+def default_holder() -> str:
+    """主机名:pid:随机后缀，重启后的同一 pid 也不会误认旧租约"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class Lease:
+    def __init__(self, writer, model, name: str, ttl_seconds: float, holder: str | None = None):
+        self.writer = writer
+        self.model = model
+        self.name = name
+        self.ttl = float(ttl_seconds)
+        self.holder = holder or default_holder()
+        self.held = False
+        self._acquired_mono = 0.0
+
+    def acquire(self) -> bool:
+        """占有或续期；数据库异常时视为未持有"""
+        model, name, holder = self.model, self.name, self.holder
+
+        def _acquire(s):
+            now = datetime.utcnow()
+            values = {'holder': holder, 'expires_at': now + timedelta(seconds=self.ttl), 'renewed_at': now}
+            updated = s.execute(
+                update(model)
+                .where(model.name == name, or_(model.holder == holder, model.expires_at < now))
+                .values(acquired_at=case((model.holder == holder, model.acquired_at), else_=now), **values)
+            ).rowcount
+            if updated:
+                return True
+            if s.get(model, name) is None:
+                s.add(model(name=name, acquired_at=now, **values))
+                s.flush()
+                return True
+            return False
+
+        try:
+            self.held = bool(self.writer.write(_acquire))
+            self._acquired_mono = time.monotonic()
+        except IntegrityError:
+            # 两个进程同时创建同名租约，另一方先提交
+            self.held = False
+        except Exception as e:
+            print(f"[Lease] {name}: acquire failed: {e}")
+            self.held = False
+        return self.held
+
+    def renew_if_due(self) -> bool:
+        """长任务执行中调用：距上次续期超过 ttl/3 时续期"""
+        if self.held and time.monotonic() - self._acquired_mono < self.ttl / 3:
+            return True
+        return self.acquire()
+
+    def release(self):
+        if not self.held:
+            return
+        model, name, holder = self.model, self.name, self.holder
+        self.held = False
+        try:
+            self.writer.write(lambda s: s.execute(
+                update(model).where(model.name == name, model.holder == holder)
+                .values(expires_at=datetime.utcnow())))
+        except Exception as e:
+            print(f"[Lease] {name}: release failed: {e}")
+
+
+def lease_status(session, model) -> list:
+    """所有租约的当前状态（供状态接口展示）"""
+    now = datetime.utcnow()
+    return [{
+        'name': r.name,
+        'holder': r.holder,
+        'active': bool(r.expires_at and r.expires_at > now),
+        'acquired_at': r.acquired_at.isoformat() if r.acquired_at else None,
+        'renewed_at': r.renewed_at.isoformat() if r.renewed_at else None,
+        'expires_at': r.expires_at.isoformat() if r.expires_at else None,
+    } for r in session.query(model).order_by(model.name)]
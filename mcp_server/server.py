@@ -1,39 +1,35 @@
 import asyncio
+import json
+import os
+
 from mcp.server.fastmcp import FastMCP
-from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import func
+
 from config import DevConfig
-from flask import Flask
-import os
+import digest
+import health
+import models
+from models import DailyDigest, Section, NewsItem
+
+# 只读数据访问：不创建 Flask 应用，进程内共享一个带连接池的只读引擎；
+# requests、app.py 等较重的依赖只在用到的工具里导入
 
-# 复用与Flask一致的数据库配置
-app = Flask(__name__)
-app.config.from_object(DevConfig)
-db = SQLAlchemy(app)
-
-# 与app.py一致的模型定义（为避免循环依赖，重复定义）
-class Section(db.Model):
-    __tablename__ = 'sections'
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(80), unique=True, nullable=False)
-    description = db.Column(db.String(255), default='')
-    enabled = db.Column(db.Boolean, default=True)
-    fetch_method = db.Column(db.String(50), default='crawler')
-    update_interval_minutes = db.Column(db.Integer, default=60)
-    last_run_at = db.Column(db.DateTime, nullable=True)
-    config_json = db.Column(db.Text, default='{}')
-
-class NewsItem(db.Model):
-    __tablename__ = 'news_items'
-    id = db.Column(db.Integer, primary_key=True)
-    section_id = db.Column(db.Integer, db.ForeignKey('sections.id'), nullable=False)
-    title = db.Column(db.String(255), nullable=False)
-    summary = db.Column(db.Text, default='')
-    url = db.Column(db.String(512), default='')
-    published_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    section = db.relationship('Section', backref=db.backref('news_items', lazy=True, cascade="all, delete-orphan"))
+
+def read_session():
+    return models.readonly_session(DevConfig.SQLALCHEMY_DATABASE_URI, DevConfig.DB_BUSY_TIMEOUT_MS,
+                                   DevConfig.DB_READONLY_POOL_SIZE)
+
+
+def _item_dict(n: NewsItem, section_name: str) -> dict:
+    return {
+        'title': n.title,
+        'title_translated': n.title_translated or '',
+        'url': n.url,
+        'summary': n.full_summary,
+        'summary_translated': n.summary_translated or '',
+        'published_at': n.published_at.isoformat() if n.published_at else None,
+        'section': section_name,
+    }
 
 mcp = FastMCP(
     name="dailynews_mcp",
@@ -49,86 +45,112 @@ async def ping() -> str:
 @mcp.tool()
 async def get_sections() -> list:
     """获取所有板块名称列表"""
-    with app.app_context():
-        rows = Section.query.order_by(Section.name).all()
-        return [r.name for r in rows]
+    with read_session() as s:
+        return [name for (name,) in s.query(Section.name).order_by(Section.name)]
 
 @mcp.tool()
 async def get_latest(section: str, limit: int = 10) -> list:
-    """获取某板块最新消息，返回[{title, url, summary, published_at}]"""
-    with app.app_context():
-        sec = Section.query.filter_by(name=section).first()
+    """获取某板块最新消息，返回[{title, title_translated, url, summary, summary_translated, published_at}]"""
+    with read_session() as s:
+        sec = s.query(Section).filter_by(name=section).first()
         if not sec:
             return []
-        items = NewsItem.query.filter_by(section_id=sec.id).order_by(NewsItem.published_at.desc()).limit(limit).all()
-        def to_dict(n: NewsItem):
-            return {
-                'title': n.title,
-                'url': n.url,
-                'summary': n.summary,
-                'published_at': n.published_at.isoformat() if n.published_at else None,
-                'section': sec.name,
-            }
-        return [to_dict(n) for n in items]
+        items = s.query(NewsItem).filter_by(section_id=sec.id).order_by(NewsItem.published_at.desc()).limit(limit).all()
+        return [_item_dict(n, sec.name) for n in items]
 
 @mcp.tool()
 async def search_news(keyword: str, limit: int = 20) -> list:
     """根据关键词搜索新闻，返回匹配的消息列表"""
-    with app.app_context():
-        query = NewsItem.query.filter(
-            (NewsItem.title.contains(keyword)) | 
-            (NewsItem.summary.contains(keyword))
-        ).order_by(NewsItem.published_at.desc()).limit(limit)
-        items = query.all()
-        results = []
-        for n in items:
-            section_name = n.section.name if n.section else 'Unknown'
-            results.append({
-                'title': n.title,
-                'url': n.url,
-                'summary': n.summary,
-                'published_at': n.published_at.isoformat() if n.published_at else None,
-                'section': section_name,
-            })
-        return results
+    with read_session() as s:
+        rows = s.query(NewsItem, Section.name).outerjoin(Section, Section.id == NewsItem.section_id).filter(
+            (NewsItem.title.contains(keyword)) |
+            (NewsItem.summary.contains(keyword)) |
+            (NewsItem.summary_preview.contains(keyword)) |
+            (NewsItem.title_translated.contains(keyword))
+        ).order_by(NewsItem.published_at.desc()).limit(limit).all()
+        return [_item_dict(n, name or 'Unknown') for n, name in rows]
 
 @mcp.tool()
 async def trigger_fetch(section: str) -> dict:
     """手动触发某板块的内容采集"""
+    with read_session() as s:
+        sec = s.query(Section).filter_by(name=section).first()
+    if not sec:
+        return {'success': False, 'message': f'板块 "{section}" 不存在'}
+    # 采集需要完整的应用（采集器、写线程），只在这里才加载 app.py
     from app import run_section_fetch
-    with app.app_context():
-        sec = Section.query.filter_by(name=section).first()
-        if not sec:
-            return {'success': False, 'message': f'板块 "{section}" 不存在'}
-        try:
-            run_section_fetch(sec.id)
-            return {'success': True, 'message': f'板块 "{section}" 采集完成'}
-        except Exception as e:
-            return {'success': False, 'message': f'采集失败: {str(e)}'}
+    try:
+        await asyncio.to_thread(run_section_fetch, sec.id)
+        return {'success': True, 'message': f'板块 "{section}" 采集完成'}
+    except Exception as e:
+        return {'success': False, 'message': f'采集失败: {str(e)}'}
 
 @mcp.tool()
 async def get_section_stats() -> list:
-    """获取所有板块的统计信息：名称、状态、消息数量、最后更新时间"""
-    with app.app_context():
-        sections = Section.query.order_by(Section.name).all()
-        stats = []
-        for s in sections:
-            item_count = NewsItem.query.filter_by(section_id=s.id).count()
-            stats.append({
-                'name': s.name,
-                'description': s.description,
-                'enabled': s.enabled,
-                'fetch_method': s.fetch_method,
-                'update_interval_minutes': s.update_interval_minutes,
-                'item_count': item_count,
-                'last_run_at': s.last_run_at.isoformat() if s.last_run_at else None,
-            })
-        return stats
+    """获取所有板块的统计信息：名称、状态、消息数量、最后更新时间、数据源健康"""
+    source_health = health.read_snapshot()
+    with read_session() as s:
+        sections = s.query(Section).order_by(Section.name).all()
+        counts = dict(s.query(NewsItem.section_id, func.count(NewsItem.id)).group_by(NewsItem.section_id))
+    stats = []
+    for sec in sections:
+        try:
+            cfg = json.loads(sec.config_json or '{}')
+        except Exception:
+            cfg = {}
+        keys = health.section_source_keys(sec.fetch_method, cfg)
+        stats.append({
+            'name': sec.name,
+            'description': sec.description,
+            'enabled': sec.enabled,
+            'fetch_method': sec.fetch_method,
+            'update_interval_minutes': sec.update_interval_minutes,
+            'item_count': counts.get(sec.id, 0),
+            'last_run_at': sec.last_run_at.isoformat() if sec.last_run_at else None,
+            'sources': [source_health.get(k) or {'key': k, 'state': health.CLOSED} for k in keys],
+        })
+    return stats
+
+@mcp.tool()
+async def get_digest(date: str = '') -> dict:
+    """获取某天（YYYY-MM-DD，默认最近一天）的每日摘要快照：各板块重点条目及译文"""
+    with read_session() as s:
+        q = s.query(DailyDigest)
+        if date:
+            day = digest.parse_day(date)
+            if day is None:
+                return {'ok': False, 'error': 'date must be YYYY-MM-DD'}
+            row = q.get(day.isoformat())
+        else:
+            row = q.order_by(DailyDigest.day.desc()).first()
+        payload = digest.decode(row.payload) if row else None
+    if payload is None:
+        return {'ok': False, 'error': f'没有 {date or "任何日期"} 的每日摘要（每晚生成前一天的快照）'}
+    return {'ok': True, 'digest': payload}
+
+@mcp.tool()
+async def get_source_health() -> list:
+    """获取所有数据源的熔断器状态（closed/open/half_open、连续失败次数、最近错误）"""
+    return list(health.read_snapshot().values())
+
+@mcp.tool()
+async def get_metrics(prefix: str = '') -> dict:
+    """获取 Web 服务的运行指标（采集耗时/条目数、翻译调用/缓存命中/429、调度队列、数据库提交耗时），可按指标名前缀过滤"""
+    import requests
+    url = DevConfig.DAILYNEWS_BASE_URL.rstrip('/') + '/metrics'
+    try:
+        r = await asyncio.to_thread(requests.get, url, params={'format': 'json'}, timeout=5)
+        r.raise_for_status()
+        data = r.json().get('metrics', {})
+    except Exception as e:
+        return {'ok': False, 'error': f'无法读取 {url}: {e}'}
+    if prefix:
+        data = {k: v for k, v in data.items() if k.startswith(prefix)}
+    return {'ok': True, 'metrics': data}
 
 if __name__ == "__main__":
-    # 确保数据库可用
-    with app.app_context():
-        db.create_all()
+    # 确保数据库可用（首次运行时建表），之后只走只读连接
+    models.ensure_schema(DevConfig.SQLALCHEMY_DATABASE_URI)
     # 选择传输方式（默认stdio），可通过环境变量切换到sse
     transport = os.environ.get('FASTMCP_TRANSPORT', 'stdio').lower()
     if transport not in ('stdio', 'sse'):
@@ -0,0 +1,269 @@
+"""
+进程内指标注册表，输出 Prometheus 文本格式（/metrics）与 JSON 快照（MCP）
+
+只实现本项目用到的 Counter / Gauge / Histogram，不依赖 prometheus_client。
+独立 worker 进程不提供 HTTP：它定期把 snapshot() 写入数据库，Web 进程用 merge() 合并后再用
+render_snapshot() 输出，/metrics 因此包含采集、翻译等只在 worker 中发生的计数。
+"""
+import bisect
+import math
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(v) -> str:
+    return str(v).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _fmt_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs += [f'{k}="{_escape(v)}"' for k, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _fmt_value(v) -> str:
+    if v == math.inf:
+        return '+Inf'
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, '')) for n in self.label_names)
+
+    def header(self) -> list:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if amount <= 0:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f'{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}' for k, v in items]
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [{'labels': dict(zip(self.label_names, k)), 'value': v} for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """可直接 set，也可传入 callback 在抓取时计算（返回 {label_tuple: value} 或单个数值）"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labels=(), callback=None):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _items(self):
+        if self.callback:
+            try:
+                v = self.callback()
+            except Exception:
+                return []
+            if isinstance(v, dict):
+                return sorted((k if isinstance(k, tuple) else (k,), val) for k, val in v.items())
+            return [((), v)]
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> list:
+        return self.header() + [f'{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}' for k, v in self._items()]
+
+    def snapshot(self) -> list:
+        return [{'labels': dict(zip(self.label_names, k)), 'value': v} for k, v in self._items()]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                st = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                st['counts'][i] += 1
+            st['sum'] += value
+            st['count'] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, {'counts': list(v['counts']), 'sum': v['sum'], 'count': v['count']}) for k, v in self._values.items())
+        lines = self.header()
+        for k, st in items:
+            cumulative = 0
+            for le, c in zip(self.buckets, st['counts']):
+                cumulative += c
+                lines.append(f'{self.name}_bucket{_fmt_labels(self.label_names, k, [("le", _fmt_value(float(le)))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_fmt_labels(self.label_names, k, [("le", "+Inf")])} {st["count"]}')
+            lines.append(f'{self.name}_sum{_fmt_labels(self.label_names, k)} {_fmt_value(round(st["sum"], 6))}')
+            lines.append(f'{self.name}_count{_fmt_labels(self.label_names, k)} {st["count"]}')
+        return lines
+
+    def snapshot(self) -> list:
+        with self._lock:
+            out = []
+            for k, st in sorted(self._values.items()):
+                out.append({
+                    'labels': dict(zip(self.label_names, k)),
+                    'count': st['count'],
+                    'sum': round(st['sum'], 6),
+                    'avg': round(st['sum'] / st['count'], 6) if st['count'] else 0.0,
+                    'buckets': {_fmt_value(float(le)): c for le, c in zip(self.buckets, st['counts'])},
+                })
+            return out
+
+
+class _Timer:
+    def __init__(self, hist: Histogram, labels: dict):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self._t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self._t, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=(), callback=None) -> Gauge:
+        return self._register(Gauge(name, help_text, labels, callback))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.extend(m.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: {'type': m.kind, 'help': m.help, 'series': m.snapshot()} for m in metrics}
+
+
+def merge(snapshots: list) -> dict:
+    """合并多个进程的快照：同名同标签的序列相加（计数器、直方图，以及在途数/队列深度这类仪表）"""
+    merged = {}
+    for snap in snapshots:
+        for name, m in (snap or {}).items():
+            target = merged.setdefault(name, {'type': m['type'], 'help': m['help'], 'series': {}})
+            for s in m.get('series', []):
+                key = tuple(sorted(s['labels'].items()))
+                cur = target['series'].get(key)
+                if m['type'] != 'histogram':
+                    target['series'][key] = {'labels': s['labels'], 'value': (cur['value'] if cur else 0) + s['value']}
+                    continue
+                if cur is None:
+                    cur = target['series'][key] = {'labels': s['labels'], 'count': 0, 'sum': 0.0, 'buckets': {}}
+                cur['count'] += s['count']
+                cur['sum'] = round(cur['sum'] + s['sum'], 6)
+                for le, c in s['buckets'].items():
+                    cur['buckets'][le] = cur['buckets'].get(le, 0) + c
+    for m in merged.values():
+        m['series'] = [m['series'][k] for k in sorted(m['series'])]
+        if m['type'] == 'histogram':
+            for s in m['series']:
+                s['avg'] = round(s['sum'] / s['count'], 6) if s['count'] else 0.0
+    return merged
+
+
+def render_snapshot(snapshot: dict) -> str:
+    """把（合并后的）JSON 快照输出为 Prometheus 文本格式"""
+    lines = []
+    for name, m in snapshot.items():
+        lines += [f'# HELP {name} {m["help"]}', f'# TYPE {name} {m["type"]}']
+        for s in m['series']:
+            names, values = list(s['labels']), list(s['labels'].values())
+            if m['type'] != 'histogram':
+                lines.append(f'{name}{_fmt_labels(names, values)} {_fmt_value(s["value"])}')
+                continue
+            cumulative = 0
+            for le in sorted(s['buckets'], key=float):
+                cumulative += s['buckets'][le]
+                lines.append(f'{name}_bucket{_fmt_labels(names, values, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_bucket{_fmt_labels(names, values, [("le", "+Inf")])} {s["count"]}')
+            lines.append(f'{name}_sum{_fmt_labels(names, values)} {_fmt_value(s["sum"])}')
+            lines.append(f'{name}_count{_fmt_labels(names, values)} {s["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# 采集
+FETCH_DURATION = registry.histogram('dailynews_fetch_duration_seconds', '板块采集耗时（秒）', ('section', 'method'))
+FETCH_RUNS = registry.counter('dailynews_fetch_runs_total', '采集运行次数（按结果）', ('section', 'method', 'status'))
+ITEMS_FETCHED = registry.counter('dailynews_items_fetched_total', '采集器返回的条目数', ('section',))
+ITEMS_ADDED = registry.counter('dailynews_items_added_total', '去重后新增入库的条目数', ('section',))
+ITEMS_DEDUPED = registry.counter('dailynews_items_deduped_total', '因重复被丢弃的条目数', ('section',))
+ITEMS_CLUSTERED = registry.counter('dailynews_items_clustered_total', '作为其他板块已有新闻的近重复入库（复用译文）的条目数', ('section',))
+GEMINI_BATCH_CALLS = registry.counter('dailynews_gemini_batch_calls_total', 'Gemini 合并采集调用次数（ok=全部命中，partial=部分回退，failed=整体回退）', ('outcome',))
+GEMINI_BATCH_SECTIONS = registry.counter('dailynews_gemini_batch_sections_total', '参与合并采集的板块数（merged=由合并调用返回，fallback=回退为单独调用）', ('outcome',))
+
+# 翻译
+TRANSLATION_CALLS = registry.counter('dailynews_translation_calls_total', '翻译服务调用次数', ('provider', 'outcome'))
+TRANSLATION_CACHE_HITS = registry.counter('dailynews_translation_cache_hits_total', '直接使用已存译文的次数', ('provider',))
+TRANSLATION_RATE_LIMITED = registry.counter('dailynews_translation_rate_limited_total', '翻译服务返回 429 的次数', ('provider',))
+TRANSLATION_DURATION = registry.histogram('dailynews_translation_duration_seconds', '单次翻译调用耗时（秒）', ('provider',))
+
+# 数据库写入
+DB_COMMIT_DURATION = registry.histogram('dailynews_db_commit_duration_seconds', '单写线程批量事务提交耗时（秒）')
+DB_COMMIT_BATCH = registry.histogram('dailynews_db_commit_batch_size', '每个事务合并的写操作数', buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
@@ -6,6 +6,10 @@
 import sqlite3
 import os
 
+import dedup
+import language
+import sanitize
+
 def migrate_db():
     db_path = os.path.join(os.path.dirname(__file__), 'data', 'dailynews.db')
     print(f"Connecting to database: {db_path}")
@@ -43,6 +47,109 @@ def migrate_db():
         else:
             raise
     
+    # 归档任务按 (section_id, created_at) 扫描过期条目
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_news_items_section_created ON news_items (section_id, created_at);")
+    print("✓ Ensured ix_news_items_section_created index")
+    
+    # /api/items 按 (created_at, id) 键集分页
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_news_items_created_id ON news_items (created_at, id);")
+    print("✓ Ensured ix_news_items_created_id index")
+    
+    # /api/cached_translations 按 (translated_at, id) 游标增量同步
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_news_items_section_translated ON news_items (section_id, translated_at);")
+    print("✓ Ensured ix_news_items_section_translated index")
+    
+    # 摘要预览列与可选的压缩全文
+    for col, ddl in (('summary_preview', "TEXT DEFAULT ''"),
+                     ('summary_translated_preview', "TEXT DEFAULT ''"),
+                     ('summary_zip', 'BLOB')):
+        try:
+            cur.execute(f"ALTER TABLE news_items ADD COLUMN {col} {ddl};")
+            print(f"✓ Added {col} column")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"! {col} column already exists")
+            else:
+                raise
+    
+    # 回填：清洗已有摘要中的 HTML 并生成预览；两列预览各按自己的原文列判断，只有译文摘要的条目也要补
+    rows = cur.execute("SELECT id, summary FROM news_items "
+                       "WHERE summary_preview IS NULL OR (summary_preview = '' AND summary != '')").fetchall()
+    updates = []
+    for item_id, summary in rows:
+        text = sanitize.clean_html(summary)
+        updates.append((text, sanitize.preview(text), item_id))
+    cur.executemany("UPDATE news_items SET summary = ?, summary_preview = ? WHERE id = ?", updates)
+    print(f"✓ Backfilled summary previews for {len(updates)} rows")
+    rows = cur.execute("SELECT id, summary_translated FROM news_items WHERE summary_translated_preview IS NULL "
+                       "OR (summary_translated_preview = '' AND summary_translated != '')").fetchall()
+    cur.executemany("UPDATE news_items SET summary_translated_preview = ? WHERE id = ?",
+                    [(sanitize.preview(translated or ''), item_id) for item_id, translated in rows])
+    print(f"✓ Backfilled translated summary previews for {len(rows)} rows")
+    
+    # 近重复识别：归一化 URL、标题签名、簇 id，以及 LSH 分桶表
+    for col, ddl in (('canonical_url', "VARCHAR(512) DEFAULT ''"),
+                     ('title_sig', 'BLOB'),
+                     ('cluster_id', 'INTEGER')):
+        try:
+            cur.execute(f"ALTER TABLE news_items ADD COLUMN {col} {ddl};")
+            print(f"✓ Added {col} column")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print(f"! {col} column already exists")
+            else:
+                raise
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_news_items_canonical_url ON news_items (canonical_url);")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_news_items_cluster_id ON news_items (cluster_id);")
+    cur.execute("CREATE TABLE IF NOT EXISTS item_bands (band BIGINT NOT NULL, item_id INTEGER NOT NULL, "
+                "created_at DATETIME, PRIMARY KEY (band, item_id));")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_item_bands_created_at ON item_bands (created_at);")
+    print("✓ Ensured dedup indexes and item_bands table")
+    
+    # 回填：所有条目的 canonical_url；时间窗口内的条目再补上标题签名与分桶键
+    rows = cur.execute("SELECT id, url FROM news_items WHERE canonical_url IS NULL "
+                       "OR (canonical_url = '' AND url IS NOT NULL AND url != '')").fetchall()
+    cur.executemany("UPDATE news_items SET canonical_url = ? WHERE id = ?",
+                    [(dedup.canonical_url(url)[:512], item_id) for item_id, url in rows])
+    print(f"✓ Backfilled canonical_url for {len(rows)} rows")
+    window_hours = int(os.environ.get('DEDUP_WINDOW_HOURS', '72'))
+    rows = cur.execute("SELECT id, title, created_at FROM news_items WHERE title_sig IS NULL "
+                       "AND created_at >= datetime('now', ?)", (f'-{window_hours} hours',)).fetchall()
+    signed = 0
+    for item_id, title, created_at in rows:
+        sig = dedup.title_signature(title)
+        if not sig:
+            continue
+        cur.execute("UPDATE news_items SET title_sig = ? WHERE id = ?", (dedup.pack(sig), item_id))
+        cur.executemany("INSERT OR IGNORE INTO item_bands (band, item_id, created_at) VALUES (?, ?, ?)",
+                        [(b, item_id, created_at) for b in dedup.band_keys(sig, title)])
+        signed += 1
+    print(f"✓ Backfilled title signatures for {signed} recent rows")
+    
+    # 语言识别：已是目标语言的条目后台翻译直接跳过
+    try:
+        cur.execute("ALTER TABLE news_items ADD COLUMN lang VARCHAR(10) DEFAULT '';")
+        print("✓ Added lang column")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("! lang column already exists")
+        else:
+            raise
+    rows = cur.execute("SELECT id, title, summary_preview FROM news_items WHERE lang IS NULL OR lang = ''").fetchall()
+    cur.executemany("UPDATE news_items SET lang = ? WHERE id = ?",
+                    [(language.detect(f"{title or ''}\n{preview or ''}"), item_id) for item_id, title, preview in rows])
+    print(f"✓ Backfilled lang for {len(rows)} rows")
+    
+    # 无法识别语言的条目记录翻译轮数，译文始终与原文相同时不再无限重试
+    try:
+        cur.execute("ALTER TABLE news_items ADD COLUMN translate_attempts INTEGER DEFAULT 0;")
+        print("✓ Added translate_attempts column")
+    except sqlite3.OperationalError as e:
+        if "duplicate column name" in str(e):
+            print("! translate_attempts column already exists")
+        else:
+            raise
+    
     con.commit()
     con.close()
     print("✓ Database migration completed")
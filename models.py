@@ -0,0 +1,184 @@
+"""
+数据模型与只读数据访问（不依赖 Flask）
+
+- 模型只在这里定义一次：app.py 把 Base.metadata 交给 Flask-SQLAlchemy 并挂上 Model.query，
+  写线程（storage.WriteQueue）和脚本直接用普通 SQLAlchemy 会话
+- MCP 服务等只读进程用 readonly_session() 取会话：进程内共享一个带连接池的只读引擎，
+  不必加载 Flask / app.py
+"""
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import (BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text,
+                        create_engine)
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import backref, declarative_base, relationship, sessionmaker
+
+import sanitize
+import storage
+from config import BASE_DIR
+
+Base = declarative_base()
+
+
+class Section(Base):
+    __tablename__ = 'sections'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(80), unique=True, nullable=False)
+    description = Column(String(255), default='')
+    enabled = Column(Boolean, default=True)
+    fetch_method = Column(String(50), default='crawler')  # crawler | gemini | manual | arxiv | rss
+    update_interval_minutes = Column(Integer, default=60)
+    last_run_at = Column(DateTime, nullable=True)
+    config_json = Column(Text, default='{}')  # 保存该板块自定义配置
+
+
+class NewsItem(Base):
+    __tablename__ = 'news_items'
+    id = Column(Integer, primary_key=True)
+    section_id = Column(Integer, ForeignKey('sections.id'), nullable=False)
+    title = Column(String(255), nullable=False)
+    summary = Column(Text, default='')
+    url = Column(String(512), default='')
+    published_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # 新增：译文字段
+    title_translated = Column(Text, default='')
+    summary_translated = Column(Text, default='')
+    translated_at = Column(DateTime, nullable=True)  # 翻译时间戳
+    # 入库时生成的纯文本预览（列表页只读这两列，不加载全文）
+    summary_preview = Column(Text, default='')
+    summary_translated_preview = Column(Text, default='')
+    summary_zip = Column(LargeBinary, nullable=True)  # 开启压缩时的摘要全文（zlib），此时 summary 为空
+    # 近重复识别：归一化 URL、标题 MinHash 签名、所属簇（簇代表条目的 id）
+    canonical_url = Column(String(512), default='', index=True)
+    title_sig = Column(LargeBinary, nullable=True)
+    cluster_id = Column(Integer, nullable=True, index=True)
+    # 入库时识别的语言主标签（zh / en ...），'und' 表示无法判断，空字符串表示尚未识别
+    lang = Column(String(10), default='')
+    # 'und' 条目的翻译轮数：译文与原文相同（或翻译失败）时加一，达到 UND_TRANSLATE_MAX_ATTEMPTS 后不再进入待翻译队列
+    translate_attempts = Column(Integer, default=0)
+
+    section = relationship('Section', backref=backref('news_items', lazy=True, cascade="all, delete-orphan"))
+
+    @property
+    def full_summary(self) -> str:
+        """摘要全文（兼容压缩存储）"""
+        return sanitize.decompress(self.summary_zip) if self.summary_zip else (self.summary or '')
+
+    __table_args__ = (
+        Index('ix_news_items_section_created', 'section_id', 'created_at'),
+        Index('ix_news_items_created_id', 'created_at', 'id'),
+        Index('ix_news_items_section_translated', 'section_id', 'translated_at'),
+    )
+
+
+class ItemBand(Base):
+    """标题签名的 LSH 分桶键，只保留 DEDUP_WINDOW_HOURS 内的条目"""
+    __tablename__ = 'item_bands'
+    band = Column(BigInteger, primary_key=True, autoincrement=False)
+    item_id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class LeaderLease(Base):
+    """跨进程租约：scheduler 租约的持有者负责全部定时任务（见 leader.py / worker.py）"""
+    __tablename__ = 'leader_leases'
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(128), default='')
+    acquired_at = Column(DateTime, nullable=True)
+    renewed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+
+
+class MetricSnapshot(Base):
+    """独立 worker 进程的指标快照（见 metrics.merge），Web 进程的 /metrics 合并后输出"""
+    __tablename__ = 'metric_snapshots'
+    process = Column(String(128), primary_key=True)  # 与租约 holder 相同：主机名:pid:随机后缀
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+    payload = Column(Text, default='{}')  # metrics.registry.snapshot() 的 JSON
+
+
+class FetchRun(Base):
+    __tablename__ = 'fetch_runs'
+    id = Column(Integer, primary_key=True)
+    section_id = Column(Integer, nullable=False)
+    trigger = Column(String(20), default='schedule')  # schedule | manual
+    status = Column(String(20), nullable=False)  # ok | error | timeout | skipped
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, default=0)
+    fetched = Column(Integer, default=0)
+    added = Column(Integer, default=0)
+    error = Column(Text, default='')
+
+    __table_args__ = (
+        Index('ix_fetch_runs_section_started', 'section_id', 'started_at'),
+    )
+
+
+class ItemEvent(Base):
+    """新条目/新译文事件，自增 id 用作 SSE 事件 id"""
+    __tablename__ = 'item_events'
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)  # items | translation
+    section_id = Column(Integer, nullable=False)
+    item_ids = Column(Text, default='[]')  # JSON 数组
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+def resolve_uri(uri: str) -> str:
+    """与 Flask-SQLAlchemy 一致：SQLite 相对路径相对于应用的 instance 目录，保证各进程打开同一个文件"""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:') \
+            or url.database.startswith('file:') or os.path.isabs(url.database):
+        return uri
+    return url.set(database=os.path.join(BASE_DIR, 'instance', url.database)).render_as_string(hide_password=False)
+
+
+class DailyDigest(Base):
+    """每日摘要快照（见 digest.py），payload 为 zlib 压缩的 JSON"""
+    __tablename__ = 'daily_digests'
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD（DIGEST_TIMEZONE 的自然日）
+    generated_at = Column(DateTime, default=datetime.utcnow)
+    item_count = Column(Integer, default=0)
+    section_count = Column(Integer, default=0)
+    payload = Column(LargeBinary, nullable=False)
+
+
+class GlossaryTerm(Base):
+    """服务端术语表（见 glossary.py）：翻译前保护或替换这些术语"""
+    __tablename__ = 'glossary_terms'
+    id = Column(Integer, primary_key=True)
+    source = Column(String(200), unique=True, nullable=False)
+    target = Column(String(200), default='')  # 为空表示保持原文
+    case_sensitive = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# 只读会话工厂按数据库 URI 缓存，同一进程内的所有调用共用一个连接池
+_readonly_factories = {}
+_readonly_lock = threading.Lock()
+
+
+def readonly_session(uri: str, busy_timeout_ms: int = 5000, pool_size: int = 4):
+    """返回只读会话（用法：with readonly_session(uri) as s: ...）"""
+    factory = _readonly_factories.get(uri)
+    if factory is None:
+        with _readonly_lock:
+            factory = _readonly_factories.get(uri)
+            if factory is None:
+                engine = storage.create_readonly_engine(resolve_uri(uri), busy_timeout_ms, pool_size)
+                factory = sessionmaker(bind=engine, expire_on_commit=False)
+                _readonly_factories[uri] = factory
+    return factory()
+
+
+def ensure_schema(uri: str):
+    """数据库还不存在时建表（只建缺失的表，已有表的新增列仍由 migrate_db.py 负责）"""
+    engine = storage.configure_engine(create_engine(resolve_uri(uri)))
+    try:
+        Base.metadata.create_all(engine)
+    finally:
+        engine.dispose()
@@ -0,0 +1,180 @@
+"""
+自适应轮询：根据每次采集的新增条数动态调整板块的轮询间隔
+
+- 新增条数按 EWMA 平滑，高于目标值则缩短间隔，长期为 0 则逐步拉长
+- 间隔始终限制在 [min_interval, max_interval] 内（默认为基础间隔的 1/4 ~ 8 倍）
+- 配合触发器抖动（jitter），避免同时创建的任务在同一时刻触发
+- 重启时按 last_run_at 续排：未到期的照常等待，已过期的只补跑一次，并在补跑窗口内错开
+- 学习结果保存在 POLL_STATE_PATH（默认 data/poll_state.json）：调度者换到其他进程后接着用，Web 进程（worker 模式）也能展示
+"""
+import random
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, UTC
+
+import statefile
+from config import DevConfig
+
+POLL_STATE_PATH = DevConfig.POLL_STATE_PATH
+
+
+@dataclass
+class PollState:
+    base_minutes: int
+    interval_minutes: float
+    ewma_new: float = 0.0
+    polls: int = 0
+    empty_polls: int = 0
+    last_added: int = 0
+    updated_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+
+def spread_catchup(keys, window_seconds: float, now: datetime | None = None) -> dict:
+    """把过期任务均匀分散到 [now, now + window) 内，按传入顺序（最早过期的在前）分配"""
+    now = now or datetime.now(UTC)
+    keys = list(keys)
+    if not keys:
+        return {}
+    step = max(0.0, float(window_seconds)) / len(keys)
+    # 加 1 秒，保证排程时间晚于当前时间
+    return {k: now + timedelta(seconds=1 + i * step + random.uniform(0, step * 0.5)) for i, k in enumerate(keys)}
+
+
+class AdaptivePoller:
+    def __init__(self, alpha: float = 0.4, target_new: float | None = None,
+                 min_factor: float | None = None, max_factor: float | None = None,
+                 jitter_ratio: float | None = None, path: str | None = None):
+        self.alpha = alpha
+        self.target_new = DevConfig.ADAPTIVE_TARGET_NEW if target_new is None else target_new
+        self.min_factor = DevConfig.ADAPTIVE_MIN_FACTOR if min_factor is None else min_factor
+        self.max_factor = DevConfig.ADAPTIVE_MAX_FACTOR if max_factor is None else max_factor
+        self.jitter_ratio = DevConfig.SCHEDULE_JITTER_RATIO if jitter_ratio is None else jitter_ratio
+        self._states = {}
+        self._lock = threading.Lock()
+        # path 为空时只保存在内存中（测试、脚本）
+        self.store = statefile.SharedJsonFile(path) if path else None
+
+    def _stored(self, section_id: int) -> PollState | None:
+        d = self.store.read().get(str(section_id)) if self.store else None
+        if not d:
+            return None
+        try:
+            return PollState(base_minutes=int(d['base_minutes']), interval_minutes=float(d['interval_minutes']),
+                             ewma_new=float(d.get('ewma_new', 0.0)), polls=int(d.get('polls', 0)),
+                             empty_polls=int(d.get('empty_polls', 0)), last_added=int(d.get('last_added', 0)),
+                             updated_at=datetime.fromisoformat(d['updated_at']))
+        except Exception:
+            return None
+
+    def _persist(self, section_id: int, st: PollState):
+        if not self.store:
+            return
+        d = asdict(st)
+        d['updated_at'] = st.updated_at.isoformat()
+        try:
+            self.store.update({str(section_id): d})
+        except Exception as e:
+            print(f"[Polling] failed to save state: {e}")
+
+    def bounds(self, base_minutes: int, cfg: dict | None = None):
+        """返回 (最小, 最大) 间隔（分钟），板块 config_json 可覆盖"""
+        cfg = cfg or {}
+        lo = float(cfg.get('min_interval_minutes') or max(1.0, base_minutes * self.min_factor))
+        hi = float(cfg.get('max_interval_minutes') or max(lo, base_minutes * self.max_factor))
+        return lo, max(lo, hi)
+
+    def state(self, section_id: int, base_minutes: int) -> PollState:
+        with self._lock:
+            st = self._states.get(section_id)
+            if st is None:
+                # 其他进程（上一任调度者）学到的结果
+                st = self._stored(section_id)
+                if st is not None:
+                    self._states[section_id] = st
+            if st is None or st.base_minutes != base_minutes:
+                # 基础间隔被修改后重新开始学习
+                st = PollState(base_minutes=base_minutes, interval_minutes=float(base_minutes))
+                self._states[section_id] = st
+            return st
+
+    def current_interval(self, section_id: int, base_minutes: int) -> float:
+        return self.state(section_id, base_minutes).interval_minutes
+
+    def observe(self, section_id: int, base_minutes: int, added: int, cfg: dict | None = None) -> float:
+        """记录一次采集结果，返回新的间隔（分钟）"""
+        st = self.state(section_id, base_minutes)
+        lo, hi = self.bounds(base_minutes, cfg)
+        with self._lock:
+            added = max(0, int(added or 0))
+            st.ewma_new = added if st.polls == 0 else self.alpha * added + (1 - self.alpha) * st.ewma_new
+            st.polls += 1
+            st.last_added = added
+            if added == 0:
+                st.empty_polls += 1
+            # 新增接近目标值时保持不变；单次调整幅度限制在 0.5x ~ 1.5x
+            ratio = self.target_new / max(st.ewma_new, 0.1)
+            factor = min(1.5, max(0.5, ratio))
+            if 0.8 <= ratio <= 1.25:
+                factor = 1.0
+            st.interval_minutes = round(min(hi, max(lo, st.interval_minutes * factor)), 2)
+            st.updated_at = datetime.now(UTC)
+        self._persist(section_id, st)
+        return st.interval_minutes
+
+    def jitter_seconds(self, interval_minutes: float) -> int:
+        """触发抖动：间隔的一定比例，最多 10 分钟"""
+        return int(min(600, interval_minutes * 60 * self.jitter_ratio))
+
+    def first_run_time(self, interval_minutes: float, now: datetime | None = None) -> datetime:
+        """首次运行时间：一个间隔后再随机错开一段，避免同时创建的任务一起触发"""
+        now = now or datetime.now(UTC)
+        spread = interval_minutes * 60 * max(self.jitter_ratio, 0.0)
+        return now + timedelta(seconds=interval_minutes * 60 + random.uniform(0, spread))
+
+    def restore(self, section_id: int, base_minutes: int, interval_minutes: float, cfg: dict | None = None):
+        """用持久化任务里的间隔恢复学习结果（仅在本进程尚未观察过该板块时）"""
+        st = self.state(section_id, base_minutes)
+        lo, hi = self.bounds(base_minutes, cfg)
+        with self._lock:
+            if st.polls != 0:
+                return
+            st.interval_minutes = round(min(hi, max(lo, float(interval_minutes))), 2)
+        self._persist(section_id, st)
+
+    def next_due(self, last_run_at: datetime | None, interval_minutes: float,
+                 now: datetime | None = None) -> datetime | None:
+        """按上次运行时间计算下次运行；从未运行返回首次运行时间，已过期返回 None（交给补跑排程）"""
+        now = now or datetime.now(UTC)
+        if last_run_at is None:
+            return self.first_run_time(interval_minutes, now)
+        if last_run_at.tzinfo is None:
+            last_run_at = last_run_at.replace(tzinfo=UTC)
+        due = last_run_at + timedelta(minutes=interval_minutes)
+        return due if due > now else None
+
+    def forget(self, section_id: int):
+        with self._lock:
+            self._states.pop(section_id, None)
+        if self.store and str(section_id) in self.store.read():
+            try:
+                self.store.update(removed=[str(section_id)])
+            except Exception as e:
+                print(f"[Polling] failed to save state: {e}")
+
+    def snapshot(self) -> dict:
+        if self.store:
+            # 以共享文件为准：worker 模式下学习发生在 worker 进程中
+            return {int(k): {**v, 'ewma_new': round(float(v.get('ewma_new', 0.0)), 3)} for k, v in self.store.read().items()}
+        with self._lock:
+            return {
+                sid: {
+                    'base_minutes': st.base_minutes,
+                    'interval_minutes': st.interval_minutes,
+                    'ewma_new': round(st.ewma_new, 3),
+                    'polls': st.polls,
+                    'empty_polls': st.empty_polls,
+                    'last_added': st.last_added,
+                    'updated_at': st.updated_at.isoformat(),
+                }
+                for sid, st in self._states.items()
+            }
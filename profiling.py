@@ -0,0 +1,166 @@
+"""
+可选的请求/SQL 性能诊断（默认关闭，PROFILING_ENABLED=1 开启）
+
+- 每个请求返回 X-Response-Time-ms / X-DB-Time-ms / X-DB-Queries 响应头
+- 慢请求按采样率打印日志；慢 SQL 通过引擎事件记录语句、绑定参数及 EXPLAIN QUERY PLAN
+- /debug/profile/<path> 在 cProfile 下执行一次该路径的 GET 请求并返回统计摘要
+- /debug/slow 返回最近的慢请求与慢 SQL
+
+关闭时不注册任何钩子和事件，对请求路径没有额外开销。
+"""
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+
+from flask import g, jsonify, request
+from sqlalchemy import event
+
+_local = threading.local()
+_LOCAL_FIELDS = ('active', 'db_ms', 'queries', 'path')
+_recent_requests = deque(maxlen=100)
+_recent_queries = deque(maxlen=100)
+
+
+def _short(v, limit: int = 300) -> str:
+    s = repr(v)
+    return s if len(s) <= limit else s[:limit] + '...'
+
+
+def _explain(cursor, statement, parameters) -> list:
+    """在同一连接上执行 EXPLAIN QUERY PLAN（仅 SQLite 的单条 SELECT）"""
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return []
+    try:
+        cur = cursor.connection.cursor()
+        try:
+            cur.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+            return [row[-1] for row in cur.fetchall()]
+        finally:
+            cur.close()
+    except Exception as e:
+        return [f'EXPLAIN 失败: {e}']
+
+
+def instrument_engine(engine, slow_sql_ms: float, explain: bool = True):
+    """为引擎注册计时事件：累加当前线程的 DB 时间，记录慢 SQL"""
+    sqlite = engine.url.get_backend_name() == 'sqlite'
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiling_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('profiling_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if getattr(_local, 'active', False):
+            _local.db_ms += elapsed_ms
+            _local.queries += 1
+        if elapsed_ms < slow_sql_ms:
+            return
+        entry = {
+            'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'ms': round(elapsed_ms, 2),
+            'statement': ' '.join(statement.split())[:2000],
+            'parameters': _short(parameters),
+            'path': getattr(_local, 'path', None),
+            'plan': _explain(cursor, statement, parameters) if (explain and sqlite and not executemany) else [],
+        }
+        _recent_queries.append(entry)
+        print(f"[Profile] slow SQL {entry['ms']}ms: {entry['statement'][:300]} params={entry['parameters']}")
+        for line in entry['plan']:
+            print(f"[Profile]   plan: {line}")
+
+
+def install(app, engines, config):
+    """根据配置为 Flask 应用和数据库引擎注册诊断钩子"""
+    slow_request_ms = float(config.PROFILE_SLOW_REQUEST_MS)
+    sample_rate = float(config.PROFILE_SAMPLE_RATE)
+    for engine in engines:
+        instrument_engine(engine, float(config.PROFILE_SLOW_SQL_MS), config.PROFILE_EXPLAIN)
+
+    @app.before_request
+    def _start_timer():
+        _local.active = True
+        _local.db_ms = 0.0
+        _local.queries = 0
+        _local.path = request.path
+        g.profiling_start = time.perf_counter()
+
+    @app.after_request
+    def _add_timing_headers(response):
+        start = g.get('profiling_start')
+        if start is None:
+            return response
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = getattr(_local, 'db_ms', 0.0)
+        queries = getattr(_local, 'queries', 0)
+        _local.active = False
+        response.headers['X-Response-Time-ms'] = f'{wall_ms:.1f}'
+        response.headers['X-DB-Time-ms'] = f'{db_ms:.1f}'
+        response.headers['X-DB-Queries'] = str(queries)
+        if wall_ms >= slow_request_ms and random.random() < sample_rate:
+            entry = {
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'status': response.status_code,
+                'wall_ms': round(wall_ms, 1),
+                'db_ms': round(db_ms, 1),
+                'queries': queries,
+            }
+            _recent_requests.append(entry)
+            print(f"[Profile] slow request {entry['method']} {entry['path']} {entry['status']} "
+                  f"wall={entry['wall_ms']}ms db={entry['db_ms']}ms queries={queries}")
+        return response
+
+    @app.route('/debug/profile/', defaults={'target': ''})
+    @app.route('/debug/profile/<path:target>')
+    def debug_profile(target):
+        """在 cProfile 下执行一次 GET /<target>，返回按 sort 排序的前 limit 行统计"""
+        sort = request.args.get('sort', 'cumulative')
+        limit = request.args.get('limit', 40, type=int)
+        query = {k: v for k, v in request.args.items(multi=True) if k not in ('sort', 'limit')}
+        client = app.test_client()
+        profiler = cProfile.Profile()
+        # 内层请求在同一线程上运行，其钩子会重置 _local：先保存外层请求的计时状态，结束后恢复
+        saved = {k: getattr(_local, k) for k in _LOCAL_FIELDS if hasattr(_local, k)}
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            resp = client.get('/' + target, query_string=query)
+        finally:
+            profiler.disable()
+            for k in _LOCAL_FIELDS:
+                if k in saved:
+                    setattr(_local, k, saved[k])
+                elif hasattr(_local, k):
+                    delattr(_local, k)
+        wall_ms = (time.perf_counter() - start) * 1000
+        out = io.StringIO()
+        try:
+            pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        except KeyError:
+            return jsonify({'ok': False, 'error': f'不支持的排序字段: {sort}'}), 400
+        header = (f"GET /{target} -> {resp.status_code}, wall={wall_ms:.1f}ms, "
+                  f"db={resp.headers.get('X-DB-Time-ms', '?')}ms, queries={resp.headers.get('X-DB-Queries', '?')}\n\n")
+        return app.response_class(header + out.getvalue(), content_type='text/plain; charset=utf-8')
+
+    @app.route('/debug/slow')
+    def debug_slow():
+        """最近的慢请求与慢 SQL"""
+        return jsonify({
+            'ok': True,
+            'slow_request_ms': slow_request_ms,
+            'slow_sql_ms': float(config.PROFILE_SLOW_SQL_MS),
+            'requests': list(_recent_requests)[::-1],
+            'queries': list(_recent_queries)[::-1],
+        })
+
+    print(f"[Profile] enabled: slow_request={slow_request_ms}ms, slow_sql={config.PROFILE_SLOW_SQL_MS}ms, sample={sample_rate}")
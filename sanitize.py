@@ -0,0 +1,89 @@
+"""
+入库时的摘要规范化：去除 HTML、解码实体、压缩空白，生成列表用的预览，可选压缩全文
+
+只依赖标准库，采集线程里每条摘要只处理一次。
+"""
+import re
+import zlib
+from html import unescape
+from html.parser import HTMLParser
+
+# 预览比显示长度多存 1 个字符，前端据此判断是否需要“展开”（与原先 >500 的判断一致）
+PREVIEW_DISPLAY_CHARS = 500
+PREVIEW_CHARS = PREVIEW_DISPLAY_CHARS + 1
+
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'iframe', 'object'}
+_BLOCK_TAGS = {'p', 'br', 'div', 'li', 'ul', 'ol', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+               'blockquote', 'pre', 'section', 'article', 'figcaption', 'hr'}
+_WS = re.compile(r'\s+')
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def clean_html(text: str | None) -> str:
+    """HTML 摘要 -> 纯文本（单行，空白已压缩）"""
+    if not text:
+        return ''
+    if '<' not in text:
+        return _WS.sub(' ', unescape(text) if '&' in text else text).strip()
+    parser = _TextExtractor()
+    try:
+        parser.feed(text)
+        parser.close()
+        out = ''.join(parser.parts)
+    except Exception:
+        out = re.sub(r'<[^>]+>', ' ', text)
+        out = unescape(out)
+    return _WS.sub(' ', out).strip()
+
+
+def preview(text: str | None) -> str:
+    return (text or '')[:PREVIEW_CHARS]
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8'), 6)
+
+
+def decompress(blob: bytes | None) -> str:
+    if not blob:
+        return ''
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def normalize_summary(raw: str | None, compress_min_chars: int = 0) -> dict:
+    """返回 NewsItem 的摘要相关列：summary / summary_preview / summary_zip
+
+    compress_min_chars > 0 且全文不短于该值时，全文只以 zlib 压缩形式保存在 summary_zip，summary 置空。
+    """
+    text = clean_html(raw)
+    values = {'summary': text, 'summary_preview': preview(text), 'summary_zip': None}
+    if compress_min_chars and len(text) >= compress_min_chars and len(text) > PREVIEW_CHARS:
+        values['summary'] = ''
+        values['summary_zip'] = compress(text)
+    return values
@@ -0,0 +1,94 @@
+"""
+多进程共享的 JSON 状态文件（熔断器、自适应轮询等）
+
+SCHEDULER_MODE=worker 时同一份状态会被 Web 进程和 worker 同时读写：
+- update() 在文件锁内重新读取文件，只合并本次修改的键再原子替换，不会覆盖其他进程写入的键
+- read() 按 (mtime, size) 缓存，文件被其他进程修改后下一次读取即可看到
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path: str):
+    """跨进程互斥：锁住旁边的 .lock 文件"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.lock', 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _load(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+class SharedJsonFile:
+    def __init__(self, path: str):
+        self.path = path
+        self._stamp = None
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _current_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        """文件自上次 read()/update() 以来是否被修改过"""
+        return self._current_stamp() != self._stamp
+
+    def read(self) -> dict:
+        with self._lock:
+            stamp = self._current_stamp()
+            if stamp != self._stamp:
+                self._data = _load(self.path)
+                self._stamp = stamp
+            return dict(self._data)
+
+    def update(self, changes: dict | None = None, removed=()):
+        """按键合并写入：changes 中的键覆盖，removed 中的键删除，其余键保持文件中的现值"""
+        with self._lock, _file_lock(self.path):
+            data = _load(self.path)
+            data.update(changes or {})
+            for key in removed:
+                data.pop(key, None)
+            d = os.path.dirname(self.path) or '.'
+            fd, tmp = tempfile.mkstemp(dir=d, prefix='.' + os.path.basename(self.path) + '.')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, self.path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            self._data = data
+            self._stamp = self._current_stamp()
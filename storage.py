@@ -0,0 +1,201 @@
+"""
+存储层：SQLite WAL 模式 + 读写分离引擎 + 单写线程批量提交
+
+- 读：Flask 请求线程继续使用 db.session（读引擎），WAL 模式下读不阻塞写
+- 写：调度线程（采集、后台翻译、归档）把写操作提交到 WriteQueue，
+  由唯一的写线程合并为批量事务提交，避免 "database is locked"
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+
+def is_sqlite(engine) -> bool:
+    return engine.url.get_backend_name() == 'sqlite'
+
+
+def configure_engine(engine, busy_timeout_ms: int = 5000):
+    """为 SQLite 引擎开启 WAL 并设置 busy_timeout；其他数据库不做处理"""
+    if not is_sqlite(engine) or engine.url.database in (None, '', ':memory:'):
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute('PRAGMA journal_mode=WAL')
+        cur.execute('PRAGMA synchronous=NORMAL')
+        cur.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cur.close()
+
+    return engine
+
+
+def create_writer_engine(uri: str, busy_timeout_ms: int = 5000):
+    """写引擎：只给写线程使用，单连接即可"""
+    engine = create_engine(uri, pool_size=1, max_overflow=0, pool_pre_ping=True)
+    return configure_engine(engine, busy_timeout_ms)
+
+
+def create_jobstore_engine(uri, busy_timeout_ms: int = 5000):
+    """APScheduler 持久化任务表使用的引擎：只有调度线程读写，连接数很少"""
+    engine = create_engine(uri, pool_size=2, max_overflow=2, pool_pre_ping=True)
+    return configure_engine(engine, busy_timeout_ms)
+
+
+def create_readonly_engine(uri, busy_timeout_ms: int = 5000, pool_size: int = 4):
+    """只读引擎：连接池复用连接，SQLite 连接开启 query_only，误写会直接报错"""
+    engine = create_engine(uri, pool_size=pool_size, max_overflow=pool_size, pool_pre_ping=True)
+    if not is_sqlite(engine) or engine.url.database in (None, '', ':memory:'):
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cur.execute('PRAGMA query_only=ON')
+        cur.close()
+
+    return engine
+
+
+class _Task:
+    __slots__ = ('fn', 'future', 'raw')
+
+    def __init__(self, fn, raw=False):
+        self.fn = fn
+        self.future = Future()
+        self.raw = raw
+
+
+class WriteQueue:
+    """单写线程队列：把多个小写操作合并进一个事务提交
+
+    submit(fn) 中的 fn 接收一个 Session，返回值通过 Future 返回；
+    批量事务失败时逐个重试，保证单个坏任务不会拖垮同批其他写入。
+    """
+
+    def __init__(self, engine, max_batch: int = 200, max_wait: float = 0.05):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._q = queue.Queue()
+        self._pending_raw = None  # 收批时遇到的事务外任务，当前批次提交后立即执行（保持 FIFO）
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.stats = {
+            'tasks': 0,
+            'batches': 0,
+            'failed': 0,
+            'retried': 0,
+            'max_batch': 0,
+            'last_commit_ms': 0.0,
+            'total_commit_ms': 0.0,
+        }
+        # 每次提交后回调 (batch_size, commit_seconds)，便于外部统计
+        self.commit_listeners = []
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, fn) -> Future:
+        """异步提交写操作"""
+        task = _Task(fn)
+        self._ensure_started()
+        self._q.put(task)
+        return task.future
+
+    def write(self, fn, timeout: float | None = None):
+        """同步写：等待批次提交完成并返回 fn 的结果"""
+        return self.submit(fn).result(timeout)
+
+    def call(self, fn, timeout: float | None = None):
+        """在写线程上以事务外方式执行 fn(engine)，如 VACUUM"""
+        task = _Task(fn, raw=True)
+        self._ensure_started()
+        self._q.put(task)
+        return task.future.result(timeout)
+
+    def depth(self) -> int:
+        return self._q.qsize()
+
+    def flush(self, timeout: float | None = None):
+        """等待此前提交的写操作全部完成"""
+        return self.write(lambda s: None, timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                task = self._q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if task.raw:
+                # 事务外任务单独执行：先提交当前批次，再紧接着执行它（不能放回队尾，否则排在后来的写操作之后）
+                self._pending_raw = task
+                break
+            batch.append(task)
+        return batch
+
+    def _run(self):
+        while True:
+            task = self._q.get()
+            if task.raw:
+                self._run_raw(task)
+                continue
+            self._commit_batch(self._collect(task))
+            if self._pending_raw is not None:
+                task, self._pending_raw = self._pending_raw, None
+                self._run_raw(task)
+
+    def _run_raw(self, task):
+        try:
+            task.future.set_result(task.fn(self.engine))
+        except Exception as e:
+            task.future.set_exception(e)
+
+    def _commit_batch(self, batch):
+        results = []
+        started = time.perf_counter()
+        try:
+            with Session(self.engine, expire_on_commit=False) as session:
+                for t in batch:
+                    results.append(t.fn(session))
+                session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self.stats['failed'] += 1
+                batch[0].future.set_exception(e)
+                return
+            # 批量失败：逐个重试以隔离错误任务
+            print(f"[Storage] 批量提交失败，逐个重试 {len(batch)} 个写操作: {e}")
+            self.stats['retried'] += len(batch)
+            for t in batch:
+                self._commit_batch([t])
+            return
+        elapsed = time.perf_counter() - started
+        self.stats['tasks'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+        self.stats['last_commit_ms'] = round(elapsed * 1000, 3)
+        self.stats['total_commit_ms'] += elapsed * 1000
+        for listener in list(self.commit_listeners):
+            try:
+                listener(len(batch), elapsed)
+            except Exception:
+                pass
+        for t, r in zip(batch, results):
+            t.future.set_result(r)
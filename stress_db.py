@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+数据库并发压力测试：模拟采集写入 + 后台翻译写入 + 页面读取同时进行
+
+用法：python stress_db.py [--seconds 20] [--fetchers 4] [--translators 2] [--readers 8]
+默认使用临时 SQLite 文件和临时 feed/日报目录，不会触碰 data/ 下的文件；出现 "database is locked" 时退出码为 1。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DailyNews DB stress test')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--fetchers', type=int, default=4)
+    parser.add_argument('--translators', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--sections', type=int, default=6)
+    parser.add_argument('--items-per-fetch', type=int, default=30)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='dn_stress_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmpdir, 'stress.db')}"
+    # 入库后会重建 feed 文件、导出日报，一并指向临时目录，不触碰 data/feeds、data/digests
+    os.environ['FEEDS_DIR'] = os.path.join(tmpdir, 'feeds')
+    os.environ['DIGESTS_DIR'] = os.path.join(tmpdir, 'digests')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app import app, db, Section, NewsItem, ingest_items, save_translation, writer
+    from collectors.base import CollectorItem
+
+    with app.app_context():
+        db.create_all()
+        for i in range(args.sections):
+            db.session.add(Section(name=f'stress-{i}', fetch_method='rss'))
+        db.session.commit()
+        section_ids = [s.id for s in Section.query.all()]
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {'fetch_runs': 0, 'items_added': 0, 'translations': 0, 'page_loads': 0,
+             'locked_errors': 0, 'other_errors': 0}
+    errors = []
+
+    def record_error(e):
+        with lock:
+            if 'database is locked' in str(e):
+                stats['locked_errors'] += 1
+            else:
+                stats['other_errors'] += 1
+            if len(errors) < 10:
+                errors.append(repr(e))
+
+    def fetcher(n):
+        rnd = random.Random(n)
+        seq = 0
+        while not stop.is_set():
+            sid = rnd.choice(section_ids)
+            items = []
+            for _ in range(args.items_per_fetch):
+                seq += 1
+                # 约一半是重复条目，覆盖去重路径
+                k = rnd.randint(0, seq)
+                items.append(CollectorItem(title=f'f{n}-item-{k}', url=f'https://example.com/{n}/{k}',
+                                           summary='lorem ipsum ' * 20))
+            try:
+                with app.app_context():
+                    added = ingest_items(sid, items)
+                with lock:
+                    stats['fetch_runs'] += 1
+                    stats['items_added'] += added
+            except Exception as e:
+                record_error(e)
+
+    def translator(n):
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    ids = [i for (i,) in db.session.query(NewsItem.id)
+                           .filter((NewsItem.title_translated == '') | NewsItem.title_translated.is_(None))
+                           .order_by(NewsItem.created_at.desc()).limit(20)]
+                if not ids:
+                    time.sleep(0.05)
+                    continue
+                # 与 run_background_translation 一致：逐条异步提交，统一等待
+                futures = [save_translation(i, {'title_translated': f'译文-{i}', 'summary_translated': '摘要'}) for i in ids]
+                for f in futures:
+                    f.result()
+                with lock:
+                    stats['translations'] += len(futures)
+            except Exception as e:
+                record_error(e)
+
+    def reader(n):
+        client = app.test_client()
+        while not stop.is_set():
+            try:
+                r = client.get('/')
+                if r.status_code != 200:
+                    raise RuntimeError(f'GET / -> {r.status_code}')
+                r = client.get(f'/api/cached_translations?section_id={random.choice(section_ids)}')
+                if r.status_code != 200:
+                    raise RuntimeError(f'GET /api/cached_translations -> {r.status_code}')
+                with lock:
+                    stats['page_loads'] += 1
+            except Exception as e:
+                record_error(e)
+
+    threads = ([threading.Thread(target=fetcher, args=(i,)) for i in range(args.fetchers)] +
+               [threading.Thread(target=translator, args=(i,)) for i in range(args.translators)] +
+               [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)])
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    writer.flush()
+    elapsed = time.perf_counter() - started
+
+    ws = writer.stats
+    print(f"运行时长: {elapsed:.1f}s")
+    print(f"采集写入: {stats['fetch_runs']} 次, 新增 {stats['items_added']} 条")
+    print(f"译文写入: {stats['translations']} 条")
+    print(f"页面读取: {stats['page_loads']} 次 ({stats['page_loads'] / elapsed:.1f}/s)")
+    print(f"写线程: {ws['tasks']} 个写操作 / {ws['batches']} 个事务, 最大批 {ws['max_batch']}, "
+          f"平均提交 {ws['total_commit_ms'] / max(ws['batches'], 1):.2f}ms")
+    print(f"错误: locked={stats['locked_errors']}, other={stats['other_errors']}")
+    for e in errors:
+        print(f"  {e}")
+    ok = stats['locked_errors'] == 0 and stats['other_errors'] == 0
+    print(f"\n测试结果: {'通过' if ok else '失败'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""熔断器半开探测：探测方没有报告结果时不能一直拒绝该数据源"""
+import health
+
+
+def _opened_breaker(**kw):
+    # 阈值 1、退避 0：一次失败即打开，下一次 allow() 立即进入半开
+    b = health.CircuitBreaker('test:probe', failure_threshold=1, base_backoff=0, max_backoff=0, **kw)
+    b.record_failure('boom')
+    assert b.state == health.OPEN
+    return b
+
+
+def test_half_open_allows_single_probe():
+    b = _opened_breaker()
+    assert b.allow()
+    assert b.state == health.HALF_OPEN
+    assert not b.allow()
+
+
+def test_cancelled_probe_is_handed_out_again():
+    b = _opened_breaker()
+    assert b.allow()
+    b.release_probe()  # 探测被取消：既不算成功也不算失败
+    assert b.state == health.HALF_OPEN
+    assert b.allow()
+    b.record_success()
+    assert b.state == health.CLOSED
+    assert b.allow()
+
+
+def test_unreported_probe_expires():
+    b = _opened_breaker(probe_timeout=0)
+    assert b.allow()
+    assert b.allow()  # 超过 probe_timeout 未报告，重新放行
+
+
+def test_release_probe_keeps_closed_and_open_state():
+    b = health.CircuitBreaker('test:closed', failure_threshold=2, base_backoff=60, max_backoff=60)
+    b.release_probe()
+    assert b.state == health.CLOSED and b.allow()
+    b.record_failure('a')
+    b.record_failure('b')
+    b.release_probe()
+    assert b.state == health.OPEN and not b.allow()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+独立调度进程：负责全部定时任务（板块采集、后台翻译、归档维护）
+
+  python worker.py                 # 配合 SCHEDULER_MODE=worker，Web 进程只处理请求
+
+多个 worker（或内嵌模式下的多个 Web 进程）通过 leader_leases 表中的 scheduler 租约选出唯一调度者：
+持有者每 LEADER_LEASE_SECONDS/3 续期一次并运行调度器；失去租约时立即暂停调度器，
+其他进程在租约到期后接管（任务状态保存在 apscheduler_jobs 表，见 SCHEDULER_JOBSTORE）。
+持有期间每 WORKER_SYNC_SECONDS 同步一次板块配置，Web 进程中新建/启停/修改的板块由此生效。
+worker 不提供 HTTP：独立运行时每 WORKER_METRICS_SECONDS 把指标快照写入数据库，由 Web 进程的 /metrics 合并输出。
+"""
+import signal
+import threading
+import time
+
+import leader
+from config import DevConfig
+
+
+class SchedulerWorker:
+    def __init__(self, dn, lease_seconds: float | None = None, sync_seconds: float | None = None,
+                 publish_metrics: bool = False):
+        self.dn = dn
+        self.publish_metrics = publish_metrics
+        self._last_publish = 0.0
+        self.lease = leader.Lease(dn.writer, dn.LeaderLease, dn.SCHEDULER_LEASE,
+                                  lease_seconds or DevConfig.LEADER_LEASE_SECONDS)
+        self.sync_seconds = sync_seconds or DevConfig.WORKER_SYNC_SECONDS
+        self.leading = False
+        self._fingerprints = {}
+        self._last_sync = 0.0
+
+    def _section_fingerprints(self) -> dict:
+        with self.dn.app.app_context():
+            return {s.id: (s.enabled, s.update_interval_minutes, s.config_json or '{}')
+                    for s in self.dn.Section.query.all()}
+
+    def _start_jobs(self):
+        dn = self.dn
+        dn.scheduler_lease_held.set()
+        # 先以暂停状态启动并重新排程，再恢复执行：持久化表里已过期的任务不会在续排前一拥而上
+        if not dn.scheduler.running:
+            dn.scheduler.start(paused=True)
+        dn.schedule_all_jobs()
+        dn.scheduler.resume()
+        self._fingerprints = self._section_fingerprints()
+        print(f"[Worker] leader: {self.lease.holder}, {len(dn.scheduler.get_jobs())} jobs scheduled")
+
+    def _stop_jobs(self, reason: str):
+        dn = self.dn
+        dn.scheduler_lease_held.clear()
+        if dn.scheduler.running:
+            dn.scheduler.pause()
+        print(f"[Worker] not leading ({reason}), scheduler paused")
+
+    def sync_sections(self):
+        """重新排程配置有变化的板块，移除已删除板块的任务"""
+        dn = self.dn
+        current = self._section_fingerprints()
+        changed = [sid for sid, fp in current.items() if self._fingerprints.get(sid) != fp]
+        removed = [sid for sid in self._fingerprints if sid not in current]
+        if changed:
+            with dn.app.app_context():
+                for section in dn.Section.query.filter(dn.Section.id.in_(changed)):
+                    dn.schedule_section(section)
+        for sid in removed:
+            dn._remove_job(f"section_{sid}")
+        if changed or removed:
+            print(f"[Worker] synced sections: changed={changed}, removed={removed}")
+        self._fingerprints = current
+
+    def tick(self):
+        """一次选举/续期；持有租约时按需同步板块"""
+        held = self.lease.acquire()
+        if held and not self.leading:
+            self.leading = True
+            self._start_jobs()
+            self._last_sync = 0.0
+        elif not held and self.leading:
+            self.leading = False
+            self._stop_jobs('lease lost')
+        if self.leading:
+            now = time.monotonic()
+            if now - self._last_sync >= self.sync_seconds:
+                if self._last_sync:
+                    self.sync_sections()
+                self._last_sync = now
+        if self.publish_metrics and time.monotonic() - self._last_publish >= DevConfig.WORKER_METRICS_SECONDS:
+            self._last_publish = time.monotonic()
+            try:
+                self.dn.publish_metrics(self.lease.holder)
+            except Exception as e:
+                print(f"[Worker] publish metrics failed: {e}")
+
+    def run(self, stop: threading.Event):
+        print(f"[Worker] started: holder={self.lease.holder}, lease={self.lease.ttl:g}s")
+        try:
+            while not stop.is_set():
+                try:
+                    self.tick()
+                except Exception as e:
+                    print(f"[Worker] tick failed: {e}")
+                wait = self.lease.ttl / 3
+                if self.publish_metrics:
+                    wait = min(wait, DevConfig.WORKER_METRICS_SECONDS)
+                stop.wait(wait)
+        finally:
+            if self.leading:
+                self.leading = False
+                self._stop_jobs('shutting down')
+            self.lease.release()
+            print("[Worker] stopped")
+
+
+def start_background(dn):
+    """内嵌模式：在 Web 进程中起一个守护线程参与选举（dn 为已加载的 app 模块）"""
+    stop = threading.Event()
+    w = SchedulerWorker(dn)
+    threading.Thread(target=w.run, args=(stop,), name='scheduler-worker', daemon=True).start()
+    return w, stop
+
+
+def main():
+    import app as dn
+    dn.ensure_db()
+    stop = threading.Event()
+
+    def _stop(signum, _frame):
+        print(f"[Worker] signal {signum}, stopping")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    # 独立进程：指标经数据库交给 Web 进程输出（内嵌模式下指标本来就在 Web 进程中）
+    w = SchedulerWorker(dn, publish_metrics=True)
+    try:
+        w.run(stop)
+    finally:
+        if dn.scheduler.running:
+            dn.scheduler.shutdown(wait=False)
+        dn.writer.flush(timeout=10)
+
+
+if __name__ == '__main__':
+    main()